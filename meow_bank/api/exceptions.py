@@ -15,6 +15,13 @@ class ValidationError(HTTPException):
         super().__init__(status_code=400, detail=detail)
 
 
+class ConflictError(HTTPException):
+    """Raised when a request conflicts with concurrent changes."""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=409, detail=detail)
+
+
 class BusinessLogicError(HTTPException):
     """Raised when there is a business logic error."""
 
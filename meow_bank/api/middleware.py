@@ -0,0 +1,102 @@
+"""Per-request timing and SQL instrumentation."""
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from meow_bank.core.metrics import metrics
+from meow_bank.db.database import QueryStats, track_queries
+
+http_requests = metrics.counter(
+    "meow_bank_http_requests_total",
+    "HTTP requests served, by route and status code",
+    labels=("method", "route", "status"),
+)
+http_request_duration = metrics.histogram(
+    "meow_bank_http_request_duration_seconds",
+    "Wall time spent serving each HTTP request",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    labels=("method", "route"),
+)
+http_request_queries = metrics.histogram(
+    "meow_bank_http_request_sql_queries",
+    "SQL statements executed while serving each HTTP request",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500),
+    labels=("method", "route"),
+)
+http_request_db_duration = metrics.histogram(
+    "meow_bank_http_request_db_seconds",
+    "Time spent in SQL statements while serving each HTTP request",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5),
+    labels=("method", "route"),
+)
+
+
+def _route_name(scope: Scope) -> str:
+    """The request path with its path parameters named, e.g. ``/api/accounts/{id}``.
+
+    Labelling by template rather than raw path keeps ids out of the metrics.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Routes of an included router may carry only their own part of the path,
+    # without the prefixes added around them. Those prefixes are literal, so
+    # they are whatever the request path has before the template's segments.
+    path_segments = scope["path"].split("/")
+    template_segments = route.path.split("/")
+    prefix = path_segments[: len(path_segments) - len(template_segments) + 1]
+    return "/".join(prefix) + route.path
+
+
+class RequestMetricsMiddleware:
+    """Time each request and count the SQL statements it runs.
+
+    Totals are recorded per route once the response is complete. The
+    ``Server-Timing`` header reports them as of when the response starts, so a
+    streamed body is not included there.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status = 500
+
+        with track_queries() as queries:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if self.server_timing:
+                        MutableHeaders(scope=message).append(
+                            "Server-Timing", self._server_timing(started_at, queries)
+                        )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                labels = {"method": scope["method"], "route": _route_name(scope)}
+                http_requests.inc(**labels, status=str(status))
+                http_request_duration.observe(
+                    time.perf_counter() - started_at, **labels
+                )
+                http_request_queries.observe(queries.count, **labels)
+                http_request_db_duration.observe(queries.seconds, **labels)
+
+    @staticmethod
+    def _server_timing(started_at: float, queries: QueryStats) -> str:
+        app_ms = (time.perf_counter() - started_at) * 1000
+        db_ms = queries.seconds * 1000
+        return (
+            f'app;dur={app_ms:.2f}, db;dur={db_ms:.2f};desc="{queries.count} queries"'
+        )
@@ -1,28 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
-from meow_bank.api.exceptions import BusinessLogicError, ResourceNotFoundError
+from meow_bank.api.exceptions import (
+    BusinessLogicError,
+    ConflictError,
+    ResourceNotFoundError,
+)
+from meow_bank.core.config import settings
 from meow_bank.core.constants import UUIDStr
-from meow_bank.db.database import get_db
+from meow_bank.db.database import DBSession, get_db
 from meow_bank.schemas import (
+    AccountBatchCreate,
     AccountCreate,
     AccountResponse,
     AccountWithTransfers,
 )
-from meow_bank.services import AccountService
+from meow_bank.services import AsyncAccountService, AsyncLedgerService
+from meow_bank.services.events import (
+    EVENT_STREAM_MEDIA_TYPE,
+    account_channel,
+    encode_account_events,
+    event_hub,
+)
+from meow_bank.services.ledger import LEDGER_MEDIA_TYPES, LedgerFormat, encode_ledger
 
 router = APIRouter(prefix="/accounts", tags=["accounts"])
 
 
 @router.post("/", response_model=AccountResponse)
-def create_account(
+async def create_account(
     account_data: AccountCreate,
-    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Retries with the same key return the original response",
+    ),
+    db: DBSession = Depends(get_db),
 ) -> AccountResponse:
     """Create a new account with an initial deposit."""
     try:
-        account_service = AccountService(db)
-        return account_service.create_account(account_data)
+        account_service = AsyncAccountService(db)
+        return await account_service.create_account(account_data, idempotency_key)
+    except ResourceNotFoundError as err:
+        raise HTTPException(status_code=404, detail=str(err)) from err
+    except BusinessLogicError as err:
+        raise HTTPException(status_code=400, detail=str(err)) from err
+    except ConflictError as err:
+        raise HTTPException(status_code=409, detail=str(err)) from err
+
+
+@router.post("/batch", response_model=list[AccountResponse])
+async def create_accounts_batch(
+    batch_data: AccountBatchCreate,
+    db: DBSession = Depends(get_db),
+) -> list[AccountResponse]:
+    """Open many accounts with their initial deposits; all or none are created."""
+    if len(batch_data.accounts) > settings.ACCOUNT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Batch exceeds the maximum of "
+                f"{settings.ACCOUNT_BATCH_MAX_SIZE} accounts"
+            ),
+        )
+    try:
+        account_service = AsyncAccountService(db)
+        return await account_service.create_accounts_batch(batch_data.accounts)
     except ResourceNotFoundError as err:
         raise HTTPException(status_code=404, detail=str(err)) from err
     except BusinessLogicError as err:
@@ -30,26 +74,85 @@ def create_account(
 
 
 @router.get("/{account_id}", response_model=AccountResponse)
-def get_account_by_id(
+async def get_account_by_id(
     account_id: UUIDStr,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
 ) -> AccountResponse:
     """Get account details with current balance."""
-    account_service = AccountService(db)
-    account = account_service.get_account_by_id(account_id)
+    account_service = AsyncAccountService(db)
+    account = await account_service.get_account_by_id(account_id)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return account
 
 
 @router.get("/{account_id}/transfers", response_model=AccountWithTransfers)
-def get_account_with_transfers_by_id(
+async def get_account_with_transfers_by_id(
     account_id: UUIDStr,
-    db: Session = Depends(get_db),
+    limit: int = Query(
+        settings.TRANSFER_HISTORY_PAGE_SIZE,
+        ge=1,
+        le=settings.TRANSFER_HISTORY_MAX_PAGE_SIZE,
+    ),
+    cursor: UUIDStr | None = Query(
+        None, description="`next_cursor` from the previous page"
+    ),
+    db: DBSession = Depends(get_db),
 ) -> AccountWithTransfers:
-    """Get account details with transfer history."""
-    account_service = AccountService(db)
-    account = account_service.get_account_with_transfers_by_id(account_id)
+    """Get account details with a page of transfer history, newest first."""
+    account_service = AsyncAccountService(db)
+    account = await account_service.get_account_with_transfers_by_id(
+        account_id, limit, cursor
+    )
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return account
+
+
+@router.get("/{account_id}/ledger", response_class=StreamingResponse)
+async def export_account_ledger(
+    account_id: UUIDStr,
+    format: LedgerFormat = Query("ndjson"),
+    db: DBSession = Depends(get_db),
+) -> StreamingResponse:
+    """Stream the full transfer history, in ledger order, with a running balance."""
+    account_service = AsyncAccountService(db)
+    if not await account_service.get_account_by_id(account_id):
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    entries = AsyncLedgerService(db).iter_ledger(account_id)
+    return StreamingResponse(
+        encode_ledger(entries, format),
+        media_type=LEDGER_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="ledger-{account_id}.{format}"'
+            )
+        },
+    )
+
+
+@router.get("/{account_id}/events", response_class=StreamingResponse)
+async def stream_account_events(
+    account_id: UUIDStr,
+    db: DBSession = Depends(get_db),
+) -> StreamingResponse:
+    """Push the account's new transfers and balance as server-sent events."""
+    # Subscribe before reading the account so no transfer falls in between.
+    subscription = event_hub.subscribe([account_channel(account_id)])
+    account_service = AsyncAccountService(db)
+    try:
+        account = await account_service.get_account_by_id(account_id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+        # The stream can stay open for hours without needing the database.
+        await account_service.close()
+    except BaseException:
+        subscription.close()
+        raise
+
+    return StreamingResponse(
+        encode_account_events(subscription, account),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
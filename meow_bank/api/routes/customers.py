@@ -1,63 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
 
+from meow_bank.core.config import settings
 from meow_bank.core.constants import UUIDStr
-from meow_bank.db.database import get_db
+from meow_bank.db.database import DBSession, get_db
 from meow_bank.schemas import (
     CustomerCreate,
     CustomerResponse,
     CustomerWithAccountIds,
     CustomerWithAccounts,
 )
-from meow_bank.services import AccountService, CustomerService
+from meow_bank.services import AsyncCustomerService
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
 
 @router.post("/", response_model=CustomerResponse, status_code=201)
-def create_customer(
+async def create_customer(
     customer_data: CustomerCreate,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
 ) -> CustomerResponse:
     """Create a new customer."""
-    customer_service = CustomerService(db)
+    customer_service = AsyncCustomerService(db)
     try:
-        return customer_service.create_customer(customer_data)
+        return await customer_service.create_customer(customer_data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
+@router.get("/", response_model=list[CustomerWithAccounts])
+async def get_customers_with_accounts(
+    ids: list[UUIDStr] = Query(
+        ...,
+        min_length=1,
+        max_length=settings.CUSTOMER_BATCH_MAX_SIZE,
+        description="Customer ids; repeat the parameter for each one",
+    ),
+    db: DBSession = Depends(get_db),
+) -> list[CustomerWithAccounts]:
+    """Get many customers with their accounts. Unknown ids are left out."""
+    customer_service = AsyncCustomerService(db)
+    return await customer_service.get_customers_with_accounts(ids)
+
+
 @router.get("/{customer_id}", response_model=CustomerWithAccountIds)
-def get_customer(
+async def get_customer(
     customer_id: UUIDStr,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
 ) -> CustomerWithAccountIds:
     """Get customer details by ID."""
-    customer_service = CustomerService(db)
-    customer = customer_service.get_customer(customer_id)
+    customer_service = AsyncCustomerService(db)
+    customer = await customer_service.get_customer(customer_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     return customer
 
 
 @router.get("/{customer_id}/accounts", response_model=CustomerWithAccounts)
-def get_customer_with_accounts(
+async def get_customer_with_accounts(
     customer_id: UUIDStr,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
 ) -> CustomerWithAccounts:
     """Get customer details with their accounts."""
-    customer_service = CustomerService(db)
-    customer = customer_service.get_customer(customer_id)
+    customer_service = AsyncCustomerService(db)
+    customer = await customer_service.get_customer_with_accounts(customer_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-
-    account_service = AccountService(db)
-
-    accounts = account_service.get_accounts_by_ids(customer.account_ids)
-
-    return CustomerWithAccounts(
-        id=customer.id,
-        name=customer.name,
-        created_at=customer.created_at,
-        accounts=accounts,
-    )
+    return customer
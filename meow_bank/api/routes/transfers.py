@@ -1,42 +1,102 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 
 from meow_bank.api.exceptions import (
     BusinessLogicError,
+    ConflictError,
     ResourceNotFoundError,
     ValidationError,
 )
+from meow_bank.core.config import settings
 from meow_bank.core.constants import UUIDStr
-from meow_bank.db.database import get_db
-from meow_bank.schemas import TransferCreate, TransferResponse
-from meow_bank.services import TransferService
+from meow_bank.db.database import DBSession, get_db
+from meow_bank.schemas import (
+    TransferBatchCreate,
+    TransferBatchResponse,
+    TransferCreate,
+    TransferFeed,
+    TransferResponse,
+)
+from meow_bank.services import AsyncTransferService
 
 router = APIRouter(prefix="/transfers", tags=["transfers"])
 
 
 @router.post("/", response_model=TransferResponse)
-def create_transfer(
+async def create_transfer(
+    request: Request,
     transfer_data: TransferCreate,
-    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Retries with the same key return the original response",
+    ),
+    db: DBSession = Depends(get_db),
 ) -> TransferResponse:
     """Create a new transfer between accounts."""
+    committer = getattr(request.app.state, "transfer_committer", None)
     try:
-        transfer_service = TransferService(db)
-        return transfer_service.create_transfer(transfer_data)
+        # Idempotent requests take the direct path, which stores their key.
+        if committer is not None and idempotency_key is None:
+            return await committer.submit(transfer_data)
+        transfer_service = AsyncTransferService(db)
+        return await transfer_service.create_transfer(transfer_data, idempotency_key)
     except ResourceNotFoundError as err:
         raise HTTPException(status_code=404, detail=str(err)) from err
     except (ValidationError, BusinessLogicError) as err:
         raise HTTPException(status_code=400, detail=str(err)) from err
+    except ConflictError as err:
+        raise HTTPException(status_code=409, detail=str(err)) from err
+
+
+@router.post("/batch", response_model=TransferBatchResponse)
+async def create_transfers_batch(
+    batch_data: TransferBatchCreate,
+    db: DBSession = Depends(get_db),
+) -> TransferBatchResponse:
+    """Apply many transfers in order, reporting success or failure per item."""
+    if len(batch_data.transfers) > settings.TRANSFER_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Batch exceeds the maximum of "
+                f"{settings.TRANSFER_BATCH_MAX_SIZE} transfers"
+            ),
+        )
+    try:
+        transfer_service = AsyncTransferService(db)
+        return await transfer_service.create_transfers_batch(batch_data.transfers)
+    except BusinessLogicError as err:
+        raise HTTPException(status_code=400, detail=str(err)) from err
+    except ConflictError as err:
+        raise HTTPException(status_code=409, detail=str(err)) from err
+
+
+@router.get("/", response_model=TransferFeed)
+async def get_transfers_after(
+    after_seq: int = Query(
+        0, ge=0, description="`last_seq` from the previous page (0 to start)"
+    ),
+    limit: int = Query(
+        settings.TRANSFER_FEED_PAGE_SIZE,
+        ge=1,
+        le=settings.TRANSFER_FEED_MAX_PAGE_SIZE,
+    ),
+    db: DBSession = Depends(get_db),
+) -> TransferFeed:
+    """Read the ledger in order, from the transfer after sequence number N."""
+    transfer_service = AsyncTransferService(db)
+    return await transfer_service.get_transfers_after(after_seq, limit)
 
 
 @router.get("/{transfer_id}", response_model=TransferResponse)
-def get_transfer_by_id(
+async def get_transfer_by_id(
     transfer_id: UUIDStr,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
 ) -> TransferResponse:
     """Get transfer details by ID."""
-    transfer_service = TransferService(db)
-    transfer = transfer_service.get_transfer_by_id(transfer_id)
+    transfer_service = AsyncTransferService(db)
+    transfer = await transfer_service.get_transfer_by_id(transfer_id)
     if not transfer:
         raise HTTPException(status_code=404, detail="Transfer not found")
     return transfer
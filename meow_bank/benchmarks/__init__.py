@@ -0,0 +1,4 @@
+"""Load-test and benchmark harness for the banking endpoints.
+
+Usage: ``python -m meow_bank.benchmarks --help``
+"""
@@ -0,0 +1,184 @@
+"""Seed a database, benchmark the banking endpoints and check for regressions.
+
+Usage: ``python -m meow_bank.benchmarks [--mode http] [--save FILE] [--compare FILE]``
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from sqlalchemy.orm import sessionmaker
+
+from meow_bank.benchmarks.baseline import (
+    describe_storage_changes,
+    find_regressions,
+    load_baseline,
+    save_baseline,
+)
+from meow_bank.benchmarks.runner import (
+    IN_PROCESS_ONLY_SCENARIOS,
+    SCENARIOS,
+    run_http,
+    run_in_process,
+)
+from meow_bank.benchmarks.seed import load_dataset, seed_database
+from meow_bank.benchmarks.storage import relation_sizes
+from meow_bank.core.config import settings
+from meow_bank.core.logging import log
+from meow_bank.db.database import create_db_engine
+from meow_bank.db.migrations import run_migrations
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--database-url",
+        default=settings.DATABASE_URL,
+        help="database to seed and, in-process, to query (defaults to DATABASE_URL)",
+    )
+    parser.add_argument("--customers", type=int, default=1_000)
+    parser.add_argument("--accounts", type=int, default=3_000)
+    parser.add_argument("--transfers", type=int, default=100_000)
+    parser.add_argument(
+        "--exponent",
+        type=float,
+        default=1.1,
+        help="power-law exponent for how activity is spread across rows",
+    )
+    parser.add_argument(
+        "--no-seed",
+        action="store_true",
+        help="benchmark the rows already in the database instead of seeding",
+    )
+    parser.add_argument("--mode", choices=("in-process", "http"), default="in-process")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--api-key", default=settings.MEOW_BANK_API_KEY)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=SCENARIOS,
+        help="scenario to run (repeatable, defaults to all)",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="seconds per scenario"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--save", type=Path, help="write the results to this file")
+    parser.add_argument(
+        "--compare", type=Path, help="fail if slower than this baseline file"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed slowdown against the baseline, as a fraction",
+    )
+    return parser.parse_args(argv)
+
+
+def compare_with_baseline(
+    baseline: dict,
+    config: dict,
+    results: dict[str, dict],
+    storage: dict[str, int],
+    tolerance: float,
+) -> bool:
+    """Log how this run compares with ``baseline``; False if it regressed."""
+    for key in ("mode", "database", "concurrency"):
+        if baseline["config"].get(key) != config[key]:
+            log.warning(
+                f"Baseline {key} was {baseline['config'].get(key)!r}, "
+                f"this run used {config[key]!r}"
+            )
+    for change in describe_storage_changes(baseline, storage):
+        log.info(f"Storage: {change}")
+    regressions = find_regressions(baseline, results, tolerance)
+    for regression in regressions:
+        log.error(f"Regression: {regression}")
+    return not regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    engine = create_db_engine(args.database_url)
+    engine.echo = False  # SQL logging would dominate the timings
+    run_migrations(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    with session_factory() as db:
+        if args.no_seed:
+            dataset = load_dataset(db, args.exponent, args.seed)
+        else:
+            log.info(
+                f"Seeding {args.customers} customers, {args.accounts} accounts "
+                f"and {args.transfers} transfers..."
+            )
+            dataset = seed_database(
+                db,
+                args.customers,
+                args.accounts,
+                args.transfers,
+                exponent=args.exponent,
+                seed=args.seed,
+            )
+
+    with engine.connect() as connection:
+        storage = relation_sizes(connection)
+    for name, size in storage.items():
+        log.info(f"{name}: {size / 2**20:.1f} MiB")
+
+    results = {}
+    for scenario in args.scenario or SCENARIOS:
+        if args.mode == "http" and scenario in IN_PROCESS_ONLY_SCENARIOS:
+            log.info(f"Skipping {scenario}: it has no endpoint to call over HTTP")
+            continue
+        log.info(f"Running {scenario} ({args.mode}) for {args.duration}s...")
+        if args.mode == "http":
+            timings = run_http(
+                args.url,
+                dataset,
+                scenario,
+                api_key=args.api_key,
+                concurrency=args.concurrency,
+                duration=args.duration,
+                seed=args.seed,
+            )
+        else:
+            timings = run_in_process(
+                session_factory,
+                dataset,
+                scenario,
+                concurrency=args.concurrency,
+                duration=args.duration,
+                seed=args.seed,
+            )
+        results[scenario] = timings.summary()
+        log.info(f"{scenario}: {results[scenario]}")
+
+    print(json.dumps(results, indent=2))
+
+    config = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("api_key", "save", "compare")
+    }
+    config["database"] = engine.dialect.name
+    config["database_url"] = engine.url.render_as_string(hide_password=True)
+    if args.save:
+        save_baseline(args.save, config, results, storage)
+        log.info(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        if not compare_with_baseline(
+            baseline, config, results, storage, args.tolerance
+        ):
+            return 1
+        log.info(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
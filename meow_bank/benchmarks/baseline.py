@@ -0,0 +1,65 @@
+"""Save benchmark results as JSON baselines and compare later runs against them."""
+
+import json
+from pathlib import Path
+
+
+def save_baseline(
+    path: Path,
+    config: dict,
+    results: dict[str, dict],
+    storage: dict[str, int] | None = None,
+) -> None:
+    baseline = {"config": config, "results": results, "storage": storage or {}}
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def load_baseline(path: Path) -> dict:
+    return json.loads(path.read_text())
+
+
+def find_regressions(
+    baseline: dict, results: dict[str, dict], tolerance: float
+) -> list[str]:
+    """Describe every scenario that got slower than the baseline allows.
+
+    A scenario regresses when its throughput falls, or its p95 or p99 latency
+    rises, by more than ``tolerance`` (a fraction, e.g. 0.2 for 20%).
+    Scenarios missing from either side are not compared.
+    """
+    regressions = []
+    for scenario, current in results.items():
+        previous = baseline["results"].get(scenario)
+        if previous is None:
+            continue
+
+        floor = previous["throughput"] * (1 - tolerance)
+        if current["throughput"] < floor:
+            regressions.append(
+                f"{scenario}: throughput {current['throughput']}/s "
+                f"< {floor:.1f}/s (baseline {previous['throughput']}/s)"
+            )
+        for key in ("p95_ms", "p99_ms"):
+            ceiling = previous[key] * (1 + tolerance)
+            if current[key] > ceiling:
+                regressions.append(
+                    f"{scenario}: {key} {current[key]} > {ceiling:.3f} "
+                    f"(baseline {previous[key]})"
+                )
+    return regressions
+
+
+def describe_storage_changes(baseline: dict, storage: dict[str, int]) -> list[str]:
+    """Size of each table and index against the baseline, for the log.
+
+    Sizes follow the seeded data, so a change is reported rather than failed.
+    """
+    changes = []
+    for name, size in storage.items():
+        previous = baseline.get("storage", {}).get(name)
+        if previous:
+            changes.append(
+                f"{name}: {size / 2**20:.1f} MiB "
+                f"({size / previous - 1:+.0%} against {previous / 2**20:.1f} MiB)"
+            )
+    return changes
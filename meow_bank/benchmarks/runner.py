@@ -0,0 +1,222 @@
+"""Drive the benchmark scenarios in-process or over HTTP and time each call."""
+
+import asyncio
+import math
+import random
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from meow_bank.api.security import API_KEY_NAME
+from meow_bank.benchmarks.seed import MAX_TRANSFER_AMOUNT, Dataset
+from meow_bank.core.money import from_minor_units
+from meow_bank.schemas import TransferCreate
+from meow_bank.services.account import AccountService
+from meow_bank.services.balance import BalanceService
+from meow_bank.services.customer import CustomerService
+from meow_bank.services.transfer import TransferService
+
+SCENARIOS = (
+    "create_transfer",
+    "get_account_by_id",
+    "get_account_with_transfers_by_id",
+    "get_customer_with_accounts",
+    "get_ledger_balances",
+)
+# Service calls with no endpoint of their own, benchmarked in-process only.
+IN_PROCESS_ONLY_SCENARIOS = ("get_ledger_balances",)
+
+# Transfers made while benchmarking are small so hot accounts stay funded.
+_BENCHMARK_TRANSFER_AMOUNT = MAX_TRANSFER_AMOUNT // 100
+
+
+def _transfer_amount(rng: random.Random) -> Decimal:
+    return from_minor_units(rng.randint(1, _BENCHMARK_TRANSFER_AMOUNT))
+
+
+def _service_call(
+    scenario: str, dataset: Dataset, rng: random.Random
+) -> Callable[[Session], object]:
+    """The service method a request for ``scenario`` would run."""
+    if scenario == "create_transfer":
+        from_account_id, to_account_id = dataset.pick_transfer_pair(rng)
+        transfer = TransferCreate(
+            from_account_id=from_account_id,
+            to_account_id=to_account_id,
+            amount=_transfer_amount(rng),
+        )
+        return lambda db: TransferService(db).create_transfer(transfer)
+    if scenario == "get_account_by_id":
+        account_id = dataset.pick_account(rng)
+        return lambda db: AccountService(db).get_account_by_id(account_id)
+    if scenario == "get_account_with_transfers_by_id":
+        account_id = dataset.pick_account(rng)
+        return lambda db: AccountService(db).get_account_with_transfers_by_id(
+            account_id
+        )
+    if scenario == "get_customer_with_accounts":
+        customer_id = dataset.pick_customer(rng)
+        return lambda db: CustomerService(db).get_customer_with_accounts(customer_id)
+    if scenario == "get_ledger_balances":
+        account_id = dataset.pick_account(rng)
+        return lambda db: BalanceService(db).get_ledger_balances([account_id])
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def _http_request(
+    scenario: str, dataset: Dataset, rng: random.Random
+) -> tuple[str, str, dict | None]:
+    """Method, path and JSON body of an API request for ``scenario``."""
+    if scenario == "create_transfer":
+        from_account_id, to_account_id = dataset.pick_transfer_pair(rng)
+        body = {
+            "from_account_id": from_account_id,
+            "to_account_id": to_account_id,
+            "amount": float(_transfer_amount(rng)),
+        }
+        return "POST", "/api/transfers/", body
+    if scenario == "get_account_by_id":
+        return "GET", f"/api/accounts/{dataset.pick_account(rng)}", None
+    if scenario == "get_account_with_transfers_by_id":
+        return "GET", f"/api/accounts/{dataset.pick_account(rng)}/transfers", None
+    if scenario == "get_customer_with_accounts":
+        return "GET", f"/api/customers/{dataset.pick_customer(rng)}/accounts", None
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+class Timings:
+    """Latencies of the calls made during one scenario run."""
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def summary(self) -> dict:
+        """Throughput and latency percentiles (in milliseconds)."""
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            rank = max(math.ceil(p / 100 * len(latencies)) - 1, 0)
+            return round(latencies[rank] * 1000, 3)
+
+        return {
+            "operations": len(latencies),
+            "errors": self.errors,
+            "seconds": round(self.elapsed, 3),
+            "throughput": (
+                round(len(latencies) / self.elapsed, 1) if self.elapsed else 0.0
+            ),
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+        }
+
+
+def run_in_process(  # noqa: PLR0913
+    session_factory: Callable[[], Session],
+    dataset: Dataset,
+    scenario: str,
+    *,
+    concurrency: int,
+    duration: float,
+    seed: int = 0,
+) -> Timings:
+    """Call the service layer from ``concurrency`` threads for ``duration`` seconds.
+
+    Each call gets its own session, like a request served from the threadpool.
+    """
+    timings = Timings()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_seed: int) -> int:
+        rng = random.Random(worker_seed)
+        errors = 0
+        while time.perf_counter() < deadline:
+            call = _service_call(scenario, dataset, rng)
+            start = time.perf_counter()
+            try:
+                with session_factory() as db:
+                    call(db)
+            except Exception:
+                errors += 1
+            timings.latencies.append(time.perf_counter() - start)
+        return errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        timings.errors = sum(pool.map(worker, range(seed, seed + concurrency)))
+    timings.elapsed = time.perf_counter() - start
+    return timings
+
+
+async def _run_http(  # noqa: PLR0913
+    base_url: str,
+    dataset: Dataset,
+    scenario: str,
+    *,
+    api_key: str,
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> Timings:
+    import httpx  # noqa: PLC0415
+
+    timings = Timings()
+    deadline = time.perf_counter() + duration
+
+    async def worker(client: httpx.AsyncClient, worker_seed: int) -> None:
+        rng = random.Random(worker_seed)
+        while time.perf_counter() < deadline:
+            method, path, body = _http_request(scenario, dataset, rng)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                if response.is_error:
+                    timings.errors += 1
+            except httpx.HTTPError:
+                timings.errors += 1
+            timings.latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={API_KEY_NAME: api_key}, limits=limits
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(worker(client, s) for s in range(seed, seed + concurrency))
+        )
+        timings.elapsed = time.perf_counter() - start
+    return timings
+
+
+def run_http(  # noqa: PLR0913
+    base_url: str,
+    dataset: Dataset,
+    scenario: str,
+    *,
+    api_key: str,
+    concurrency: int,
+    duration: float,
+    seed: int = 0,
+) -> Timings:
+    """Send API requests over ``concurrency`` connections for ``duration`` seconds.
+
+    Needs httpx and a server running against the seeded database.
+    """
+    return asyncio.run(
+        _run_http(
+            base_url,
+            dataset,
+            scenario,
+            api_key=api_key,
+            concurrency=concurrency,
+            duration=duration,
+            seed=seed,
+        )
+    )
@@ -0,0 +1,187 @@
+"""Seed a database with a synthetic population of customers, accounts and transfers.
+
+Activity follows a power law, as it does in a real ledger: a few customers hold
+many accounts and a few accounts take part in most transfers.
+"""
+
+import random
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from meow_bank.db.models import Account, Customer, Transfer, assign_ledger_seqs
+
+# Minor units credited to every account before the synthetic transfers, on top
+# of what it goes on to send, so seeded debits never overdraw an account.
+OPENING_BALANCE = 1_000_000_00
+MAX_TRANSFER_AMOUNT = 10_000_00
+
+
+def power_law_weights(count: int, exponent: float) -> list[float]:
+    """Cumulative Zipf weights for ``random.choices(..., cum_weights=...)``."""
+    return list(accumulate(1 / rank**exponent for rank in range(1, count + 1)))
+
+
+@dataclass
+class Dataset:
+    """Ids of the seeded rows, with cumulative weights for picking them."""
+
+    customer_ids: list[str]
+    account_ids: list[str]
+    exponent: float = 1.1
+
+    def __post_init__(self):
+        self.customer_weights = power_law_weights(len(self.customer_ids), self.exponent)
+        self.account_weights = power_law_weights(len(self.account_ids), self.exponent)
+
+    def pick_customer(self, rng: random.Random) -> str:
+        return rng.choices(self.customer_ids, cum_weights=self.customer_weights)[0]
+
+    def pick_account(self, rng: random.Random) -> str:
+        return rng.choices(self.account_ids, cum_weights=self.account_weights)[0]
+
+    def pick_transfer_pair(self, rng: random.Random) -> tuple[str, str]:
+        """Two distinct accounts, both drawn from the power law."""
+        from_account_id = self.pick_account(rng)
+        to_account_id = self.pick_account(rng)
+        while to_account_id == from_account_id:
+            to_account_id = self.pick_account(rng)
+        return from_account_id, to_account_id
+
+
+def _insert_rows(db: Session, model, rows: list[dict], batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(model), rows[start : start + batch_size])
+
+
+def _pick_transfers(
+    rng: random.Random, dataset: Dataset, count: int
+) -> Iterator[tuple[str, str, int]]:
+    for _ in range(count):
+        from_account_id, to_account_id = dataset.pick_transfer_pair(rng)
+        yield from_account_id, to_account_id, rng.randint(1, MAX_TRANSFER_AMOUNT)
+
+
+def seed_database(  # noqa: PLR0913
+    db: Session,
+    customers: int,
+    accounts: int,
+    transfers: int,
+    *,
+    exponent: float = 1.1,
+    seed: int = 0,
+    batch_size: int = 10_000,
+) -> Dataset:
+    """Insert the population and commit it; stored balances match the ledger.
+
+    Every customer gets one account and the rest are dealt out by the power law.
+    """
+    if customers < 1 or accounts < customers:
+        raise ValueError("Need at least one customer and one account per customer")
+    if transfers and accounts < 2:  # noqa: PLR2004
+        raise ValueError("Transfers need at least two accounts")
+
+    rng = random.Random(seed)
+    started_at = datetime.now(timezone.utc) - timedelta(days=365)
+
+    customer_ids = [str(uuid.uuid4()) for _ in range(customers)]
+    owners = customer_ids + rng.choices(
+        customer_ids,
+        cum_weights=power_law_weights(customers, exponent),
+        k=accounts - customers,
+    )
+    account_ids = [str(uuid.uuid4()) for _ in range(accounts)]
+    # Spread the busiest accounts across customers rather than the first ones.
+    ranked_account_ids = rng.sample(account_ids, len(account_ids))
+    dataset = Dataset(customer_ids, ranked_account_ids, exponent)
+
+    # The transfers are drawn twice from the same random state: once to total
+    # each account's flows, which its funding and balance need up front, then
+    # again to insert them in batches, so they never all sit in memory.
+    transfers_state = rng.getstate()
+    sent = dict.fromkeys(account_ids, 0)
+    received = dict.fromkeys(account_ids, 0)
+    for from_account_id, to_account_id, amount in _pick_transfers(
+        rng, dataset, transfers
+    ):
+        sent[from_account_id] += amount
+        received[to_account_id] += amount
+
+    funding_rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "from_account_id": None,
+            "to_account_id": account_id,
+            "amount": OPENING_BALANCE + sent[account_id],
+            "created_at": started_at,
+        }
+        for account_id in account_ids
+    ]
+
+    _insert_rows(
+        db,
+        Customer,
+        [
+            {"id": customer_id, "name": f"Customer {index}", "created_at": started_at}
+            for index, customer_id in enumerate(customer_ids)
+        ],
+        batch_size,
+    )
+    _insert_rows(
+        db,
+        Account,
+        [
+            {
+                "id": account_id,
+                "customer_id": owner,
+                "balance": OPENING_BALANCE + received[account_id],
+                "created_at": started_at,
+            }
+            for account_id, owner in zip(account_ids, owners, strict=True)
+        ],
+        batch_size,
+    )
+    assign_ledger_seqs(db.connection(), funding_rows)
+    _insert_rows(db, Transfer, funding_rows, batch_size)
+
+    rng.setstate(transfers_state)
+    transfer_rows = (
+        {
+            "id": str(uuid.uuid4()),
+            "from_account_id": from_account_id,
+            "to_account_id": to_account_id,
+            "amount": amount,
+            "created_at": started_at + timedelta(seconds=1, microseconds=index),
+        }
+        for index, (from_account_id, to_account_id, amount) in enumerate(
+            _pick_transfers(rng, dataset, transfers)
+        )
+    )
+    while batch := list(islice(transfer_rows, batch_size)):
+        assign_ledger_seqs(db.connection(), batch)
+        db.execute(insert(Transfer), batch)
+    db.commit()
+
+    # Give the query planner statistics for the new data.
+    db.execute(text("ANALYZE"))
+    db.commit()
+    return dataset
+
+
+def load_dataset(db: Session, exponent: float = 1.1, seed: int = 0) -> Dataset:
+    """Build a Dataset over the customers and accounts already in the database."""
+    rng = random.Random(seed)
+    customer_ids = list(db.execute(select(Customer.id).order_by(Customer.id)).scalars())
+    account_ids = list(db.execute(select(Account.id).order_by(Account.id)).scalars())
+    if not account_ids:
+        raise ValueError("The database has no accounts to benchmark against")
+    return Dataset(
+        rng.sample(customer_ids, len(customer_ids)),
+        rng.sample(account_ids, len(account_ids)),
+        exponent,
+    )
@@ -0,0 +1,34 @@
+"""Measure the space each table and index of the benchmark database takes up."""
+
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import OperationalError
+
+POSTGRES_RELATION_SIZES = text("""
+    SELECT c.relname, pg_relation_size(c.oid)
+    FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'i')
+    ORDER BY 2 DESC
+    """)
+
+# Needs SQLite built with SQLITE_ENABLE_DBSTAT_VTAB, as Python's usually is.
+SQLITE_RELATION_SIZES = text(
+    "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY 2 DESC"
+)
+
+
+def relation_sizes(connection: Connection) -> dict[str, int]:
+    """Bytes used by each table and index, largest first.
+
+    Empty when the backend can't report them.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        query = POSTGRES_RELATION_SIZES
+    elif dialect == "sqlite":
+        query = SQLITE_RELATION_SIZES
+    else:
+        return {}
+    try:
+        return {name: int(size) for name, size in connection.execute(query)}
+    except OperationalError:
+        return {}
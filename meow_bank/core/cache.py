@@ -0,0 +1,108 @@
+"""Small in-process caches shared by the services.
+
+Caches are thread-safe, so services can use them from the threadpool or the
+event loop alike. They are per process: every worker keeps its own copy.
+Anything implementing ``CacheBackend`` (for example a client for a cache
+shared between processes) can stand in for ``TTLCache`` where a backend is
+pluggable.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable, Mapping
+from threading import Lock
+from typing import Generic, Protocol, TypeVar
+
+from meow_bank.core.metrics import metrics
+
+V = TypeVar("V")
+
+cache_evictions = metrics.counter(
+    "meow_bank_cache_evictions_total",
+    "Entries dropped from an in-process cache before being read again",
+    labels=("cache", "reason"),
+)
+
+
+class CacheBackend(Protocol[V]):
+    """Batch key-value interface the services cache through."""
+
+    def get_many(self, keys: Iterable[Hashable]) -> dict[Hashable, V]: ...
+
+    def set_many(self, items: Mapping[Hashable, V]) -> None: ...
+
+    def delete_many(self, keys: Iterable[Hashable]) -> None: ...
+
+
+class TTLCache(Generic[V]):
+    """Least-recently-used cache whose entries also expire after ``ttl_seconds``.
+
+    A ``maxsize`` of 0 disables the cache: nothing is stored and every lookup
+    misses. Evictions are counted under ``name``.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, name: str = ""):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self._entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self._lock = Lock()
+
+    def _get(self, key: Hashable, now: float) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            cache_evictions.inc(cache=self.name, reason="expired")
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: Hashable, value: V, now: float) -> None:
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            cache_evictions.inc(cache=self.name, reason="capacity")
+
+    def get(self, key: Hashable) -> V | None:
+        with self._lock:
+            return self._get(key, time.monotonic())
+
+    def set(self, key: Hashable, value: V) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._set(key, value, time.monotonic())
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_many(self, keys: Iterable[Hashable]) -> dict[Hashable, V]:
+        now = time.monotonic()
+        with self._lock:
+            found = {key: self._get(key, now) for key in keys}
+        return {key: value for key, value in found.items() if value is not None}
+
+    def set_many(self, items: Mapping[Hashable, V]) -> None:
+        if self.maxsize <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key, value in items.items():
+                self._set(key, value, now)
+
+    def delete_many(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,5 +1,12 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
 
 class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
@@ -8,9 +15,106 @@ class Settings(BaseSettings):
     API_PORT: int = 8000
 
     DATABASE_URL: str = "sqlite:///./meow_bank.db"
+    # Serve requests from an AsyncEngine instead of the threadpool
+    ASYNC_DB: bool = False
+
+    # Connection pool (ignored for in-memory SQLite, which uses a single connection)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_PRE_PING: bool = True
+
+    # PRAGMAs applied to every new SQLite connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE: int = -64000  # negative values are KiB, so 64 MiB
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
 
     MEOW_BANK_API_KEY: str = "test_api_key"
 
+    # How concurrent debits of the same account are kept consistent:
+    # "optimistic" compares-and-swaps the account version and retries on conflict,
+    # "pessimistic" locks both account rows with SELECT ... FOR UPDATE,
+    # "guarded" skips the read and debits with UPDATE ... WHERE balance >= amount.
+    # Batches treat "guarded" like "optimistic".
+    TRANSFER_CONCURRENCY_MODE: Literal["optimistic", "pessimistic", "guarded"] = (
+        "optimistic"
+    )
+    TRANSFER_MAX_RETRIES: int = 5
+
+    # Largest number of transfers accepted by POST /api/transfers/batch
+    TRANSFER_BATCH_MAX_SIZE: int = 10_000
+    # Largest number of accounts accepted by POST /api/accounts/batch
+    ACCOUNT_BATCH_MAX_SIZE: int = 10_000
+
+    # Queue POST /api/transfers and commit them in micro-batches (group commit).
+    # A batch is written once it holds MAX_BATCH_SIZE transfers or its first
+    # transfer has waited MAX_DELAY_MS.
+    TRANSFER_GROUP_COMMIT: bool = False
+    TRANSFER_GROUP_COMMIT_MAX_BATCH_SIZE: int = 500
+    TRANSFER_GROUP_COMMIT_MAX_DELAY_MS: float = 2
+
+    # Most customers fetched at once by GET /api/customers?ids=...
+    CUSTOMER_BATCH_MAX_SIZE: int = 100
+
+    # Page sizes for GET /api/accounts/{id}/transfers
+    TRANSFER_HISTORY_PAGE_SIZE: int = 50
+    TRANSFER_HISTORY_MAX_PAGE_SIZE: int = 500
+
+    # Page sizes for GET /api/transfers?after_seq=N
+    TRANSFER_FEED_PAGE_SIZE: int = 1000
+    TRANSFER_FEED_MAX_PAGE_SIZE: int = 10_000
+
+    # Rows fetched per round trip when streaming GET /api/accounts/{id}/ledger
+    LEDGER_EXPORT_BATCH_SIZE: int = 1000
+
+    # Seconds between balance checkpoint roll-forwards (0 disables the job)
+    BALANCE_CHECKPOINT_INTERVAL_SECONDS: int = 300
+
+    # Read-through cache of account balances (0 disables it). Entries are
+    # invalidated when a transfer commits; the TTL bounds how long another
+    # process, or a read racing the commit, can serve a stale balance.
+    BALANCE_CACHE_SIZE: int = 0
+    BALANCE_CACHE_TTL_SECONDS: float = 5
+    # "module:factory" returning a shared CacheBackend to use instead
+    BALANCE_CACHE_BACKEND: str | None = None
+
+    # Server-sent events of new transfers (GET /api/accounts/{id}/events).
+    # Events reach subscribers of this process only, unless EVENTS_BACKEND
+    # names a "module:factory" returning an EventBackend shared by all workers.
+    EVENTS_BACKEND: str | None = None
+    # Events buffered per subscriber before a slow one is disconnected
+    EVENTS_QUEUE_SIZE: int = 1000
+    # Seconds between keep-alive comments on an idle event stream
+    EVENTS_KEEPALIVE_SECONDS: float = 15
+
+    # How long an Idempotency-Key replays its stored response
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 24 * 60 * 60
+    # Recently stored responses kept in memory (0 disables the cache)
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    # Seconds between purges of expired idempotency keys (0 disables the job)
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 3600
+
+    # Log SQL statements slower than this to the slow-query log (0 disables),
+    # with the backend's EXPLAIN output at most once per interval per statement
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: int = 300
+
+    # Report each request's app and SQL time in a Server-Timing response header
+    SERVER_TIMING_HEADER: bool = True
+
+    # Log levels per sink; the stderr level defaults to LOG_LEVEL
+    LOG_STDERR_LEVEL: str | None = None
+    LOG_FILE_LEVEL: str = "DEBUG"
+    # Log records are queued for a background writer and written in batches of
+    # up to LOG_BATCH_SIZE, at least every LOG_FLUSH_INTERVAL_MS. Records
+    # arriving while a sink's queue is full are dropped and counted.
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_BATCH_SIZE: int = 500
+    LOG_FLUSH_INTERVAL_MS: int = 100
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -26,5 +130,12 @@ class Settings(BaseSettings):
     def LOG_LEVEL(self) -> str:  # noqa: N802
         return "DEBUG" if self.DEBUG else "INFO"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:  # noqa: N802
+        """DATABASE_URL rewritten to use the backend's asyncio driver."""
+        scheme, _, rest = self.DATABASE_URL.partition("://")
+        backend = scheme.split("+")[0]
+        return f"{ASYNC_DRIVERS.get(backend, scheme)}://{rest}"
+
 
 settings = Settings()
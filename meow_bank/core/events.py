@@ -0,0 +1,168 @@
+"""In-process publish/subscribe hub for pushing events to connected clients.
+
+Publishers may run on any thread; subscribers are consumed from the event
+loop that created them. On its own the hub only reaches subscribers in the
+same process. Anything implementing ``EventBackend`` (for example a client
+for a message broker's pub/sub) can carry events between worker processes
+instead.
+"""
+
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable, Iterable
+from threading import Lock
+from typing import Protocol
+
+from meow_bank.core.metrics import metrics
+
+dropped_subscriptions = metrics.counter(
+    "meow_bank_event_subscriptions_dropped_total",
+    "Event subscribers disconnected because they fell too far behind",
+)
+
+Deliver = Callable[[str, str], None]
+
+
+class EventBackend(Protocol):
+    """Transport between the processes' hubs.
+
+    ``publish`` sends a message to a channel; every hub started against the
+    backend then has its ``deliver(channel, message)`` called with it,
+    including the hub that published it.
+    """
+
+    def start(self, deliver: Deliver) -> None: ...
+
+    def publish(self, channel: str, message: str) -> None: ...
+
+    def stop(self) -> None: ...
+
+
+class LocalEventBackend:
+    """Delivers published messages straight back to the hub of this process."""
+
+    def __init__(self):
+        self._deliver: Deliver | None = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, channel: str, message: str) -> None:
+        if self._deliver is not None:
+            self._deliver(channel, message)
+
+    def stop(self) -> None:
+        self._deliver = None
+
+
+class Subscription:
+    """Messages published to a set of channels, in the order they arrived.
+
+    Iterate it from the event loop that created it. At most ``maxsize``
+    messages are buffered; a subscriber that falls further behind is closed
+    rather than slowing publishers down, and iteration then stops.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, hub: "EventHub", channels: frozenset[str], maxsize: int):
+        self.channels = channels
+        self.overflowed = False
+        self._hub = hub
+        self._loop = asyncio.get_running_loop()
+        # Unbounded so closing never blocks; _put enforces maxsize.
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._maxsize = maxsize
+
+    def _put(self, message: str) -> None:
+        if self.overflowed:
+            return
+        if self._queue.qsize() < self._maxsize:
+            self._queue.put_nowait(message)
+        else:
+            self.overflowed = True
+            dropped_subscriptions.inc()
+            self._queue.put_nowait(self._CLOSED)
+
+    def deliver(self, message: str) -> None:
+        """Queue a message; safe to call from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:  # the subscriber's event loop has shut down
+            self._hub._unsubscribe(self)
+
+    async def get(self, timeout: float | None = None) -> str | None:
+        """Next message, or None if ``timeout`` seconds pass without one.
+
+        Raises StopAsyncIteration once the subscription is closed.
+        """
+        try:
+            message = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if message is self._CLOSED:
+            self._queue.put_nowait(message)
+            raise StopAsyncIteration
+        return message
+
+    def close(self) -> None:
+        self._hub._unsubscribe(self)
+        self._queue.put_nowait(self._CLOSED)
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self
+
+    async def __anext__(self) -> str:
+        return await self.get()
+
+
+class EventHub:
+    """Fans published messages out to the subscribers of each channel."""
+
+    def __init__(self, backend: EventBackend | None = None, queue_size: int = 1000):
+        self.backend = backend if backend is not None else LocalEventBackend()
+        self.queue_size = queue_size
+        self._subscriptions: dict[str, set[Subscription]] = defaultdict(set)
+        self._lock = Lock()
+        self.backend.start(self._deliver)
+
+    @property
+    def is_local(self) -> bool:
+        return isinstance(self.backend, LocalEventBackend)
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        """Start receiving the channels' messages; call from the event loop."""
+        subscription = Subscription(self, frozenset(channels), self.queue_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def has_subscribers(self, channels: Iterable[str]) -> bool:
+        """Whether publishing to any of the channels could reach a subscriber.
+
+        Always true with a shared backend, whose subscribers may be elsewhere.
+        """
+        if not self.is_local:
+            return True
+        with self._lock:
+            return any(channel in self._subscriptions for channel in channels)
+
+    def publish(self, channel: str, message: str) -> None:
+        """Send a message to the channel's subscribers; safe from any thread."""
+        self.backend.publish(channel, message)
+
+    def _deliver(self, channel: str, message: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
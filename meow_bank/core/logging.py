@@ -1,32 +1,208 @@
+import copy
+import json
+import queue
 import sys
+import threading
+import time
+from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
 
 from loguru import logger
 
 from .config import settings
+from .metrics import metrics
 
 log_dir = Path(__file__).parent.parent.parent / "logs"
 log_dir.mkdir(exist_ok=True)
 
 log_file = log_dir / f"meow_bank_{datetime.now().strftime('%Y%m%d')}.log"
+slow_query_log_file = (
+    log_dir / f"meow_bank_slow_queries_{datetime.now().strftime('%Y%m%d')}.log"
+)
+
+dropped_log_records = metrics.counter(
+    "meow_bank_log_records_dropped_total",
+    "Log records discarded because a sink's queue was full",
+    labels=("sink",),
+)
+
+
+def serialize_record(text: str, record: dict) -> str:
+    """One JSON line in the same shape as loguru's ``serialize=True`` output."""
+    exception = record["exception"]
+    if exception is not None:
+        exception = {
+            "type": None if exception.type is None else exception.type.__name__,
+            "value": exception.value,
+            "traceback": bool(exception.traceback),
+        }
+
+    serializable = {
+        "text": text,
+        "record": {
+            "elapsed": {
+                "repr": record["elapsed"],
+                "seconds": record["elapsed"].total_seconds(),
+            },
+            "exception": exception,
+            "extra": record["extra"],
+            "file": {"name": record["file"].name, "path": record["file"].path},
+            "function": record["function"],
+            "level": {
+                "icon": record["level"].icon,
+                "name": record["level"].name,
+                "no": record["level"].no,
+            },
+            "line": record["line"],
+            "message": record["message"],
+            "module": record["module"],
+            "name": record["name"],
+            "process": {"id": record["process"].id, "name": record["process"].name},
+            "thread": {"id": record["thread"].id, "name": record["thread"].name},
+            "time": {"repr": record["time"], "timestamp": record["time"].timestamp()},
+        },
+    }
+    return json.dumps(serializable, default=str, ensure_ascii=False) + "\n"
+
+
+class BufferedSink:
+    """Loguru sink that writes from a background thread, in batches.
+
+    Logging a message only puts it on a bounded queue, so callers never wait
+    on the disk, the terminal or on rendering the line. The writer thread
+    renders and writes up to ``batch_size`` queued messages at a time, at
+    least every ``flush_interval`` seconds. When the queue is full new
+    messages are dropped and counted in ``meow_bank_log_records_dropped_total``
+    rather than blocking the caller.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[str], None],
+        *,
+        maxsize: int = settings.LOG_QUEUE_SIZE,
+        batch_size: int = settings.LOG_BATCH_SIZE,
+        flush_interval: float = settings.LOG_FLUSH_INTERVAL_MS / 1000,
+    ):
+        self.name = name
+        self._write = write
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._thread = threading.Thread(
+            target=self._run, name=f"log-sink-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, message) -> None:
+        try:
+            self._queue.put_nowait((str(message), message.record))
+        except queue.Full:
+            dropped_log_records.inc(sink=self.name)
+
+    def stop(self) -> None:
+        """Write out everything queued so far, then end the writer thread."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def render(self, text: str, record: dict) -> str:
+        """Final text for one record; runs on the writer thread."""
+        return text
+
+    def _next_batch(self) -> tuple[list[tuple[str, dict]], bool]:
+        first = self._queue.get()
+        if first is self._STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=max(timeout, 0))
+            except queue.Empty:
+                break
+            if item is self._STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self._write("".join(self.render(*item) for item in batch))
+            except Exception as e:
+                # Logging can't report its own failure, so go straight to stderr.
+                _write_stderr(f"Failed to write {len(batch)} log records: {e!r}\n")
+
+
+class SerializedSink(BufferedSink):
+    """BufferedSink that writes records as JSON lines, like ``serialize=True``."""
+
+    def render(self, text: str, record: dict) -> str:
+        return serialize_record(text, record)
+
+
+def _write_stderr(text: str) -> None:
+    sys.stderr.write(text)
+    sys.stderr.flush()
+
+
+def _rotating_file_writer(path: Path):
+    """Independent logger that owns a rotating file.
+
+    It only ever receives pre-rendered batches from a buffered sink.
+    """
+    writer = copy.deepcopy(logger)
+    writer.add(
+        path,
+        format="{message}",
+        rotation="1 day",
+        retention="30 days",
+        compression="zip",
+    )
+    return lambda text: writer.opt(raw=True).info(text)
+
+
+def _is_slow_query(record: dict) -> bool:
+    return "slow_query" in record["extra"]
+
 
 logger.remove()
 
+_write_log_file = _rotating_file_writer(log_file)
+_write_slow_query_file = _rotating_file_writer(slow_query_log_file)
+
 logger.add(
-    sys.stderr,
+    BufferedSink("stderr", _write_stderr),
     format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",  # noqa: E501
-    level=settings.LOG_LEVEL,
+    level=settings.LOG_STDERR_LEVEL or settings.LOG_LEVEL,
+    colorize=sys.stderr.isatty(),
+    diagnose=settings.DEBUG,
+)
+
+logger.add(
+    SerializedSink("file", _write_log_file),
+    format="{message}",
+    level=settings.LOG_FILE_LEVEL,
+    filter=lambda record: not _is_slow_query(record),
+    diagnose=settings.DEBUG,
 )
 
+# Slow queries, with their parameters and plans, get a file of their own.
 logger.add(
-    log_file,
+    SerializedSink("slow_query", _write_slow_query_file),
     format="{message}",
-    level="DEBUG",
-    rotation="1 day",
-    retention="30 days",
-    compression="zip",
-    serialize=True,
+    filter=_is_slow_query,
 )
 
 log = logger
+slow_query_log = logger.bind(slow_query=True)
@@ -0,0 +1,165 @@
+"""In-process metrics shared by the services.
+
+Counters and histograms are thread-safe and keyed by label values, so services
+can record events from the threadpool or the event loop alike. The registry
+renders them in the Prometheus text format for ``GET /metrics``.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = defaultdict(float)
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self) -> list[tuple[dict[str, str], float]]:
+        with self._lock:
+            return [
+                (dict(zip(self.labels, key, strict=True)), value)
+                for key, value in self._values.items()
+            ]
+
+    def exposition(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(labels)} {value}"
+            for labels, value in self.samples()
+        ]
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, split by labels."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: tuple[float, ...],
+        labels: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.labels = labels
+        # Per label key: count per bucket (plus +Inf), sum of observations.
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(labels.get(label, "") for label in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            counts, _ = self._values.get(key, ([0], [0.0]))
+            return sum(counts)
+
+    def sum(self, **labels: str) -> float:
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            _, total = self._values.get(key, ([0], [0.0]))
+            return total[0]
+
+    def exposition(self) -> list[str]:
+        with self._lock:
+            values = [
+                (key, list(counts), total[0])
+                for key, (counts, total) in self._values.items()
+            ]
+
+        lines = []
+        for key, counts, total in values:
+            labels = dict(zip(self.labels, key, strict=True))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+                cumulative += count
+                bucket_labels = _format_labels({**labels, "le": str(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = Lock()
+
+    def counter(
+        self, name: str, description: str, labels: tuple[str, ...] = ()
+    ) -> Counter:
+        """Return the counter called ``name``, creating it on first use."""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, description, labels)
+            return self._metrics[name]
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        buckets: tuple[float, ...],
+        labels: tuple[str, ...] = (),
+    ) -> Histogram:
+        """Return the histogram called ``name``, creating it on first use."""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, description, buckets, labels)
+            return self._metrics[name]
+
+    def collect(self) -> list[Counter | Histogram]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.exposition())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,33 @@
+"""Money is stored and summed as integer minor units (cents).
+
+Amounts only become decimals at the API edge: request schemas parse them into
+``Decimal`` values with at most two decimal places, services convert them with
+``to_minor_units`` and convert results back with ``from_minor_units``.
+"""
+
+from decimal import Decimal
+from typing import Annotated
+
+from pydantic import Field, PlainSerializer
+
+MINOR_UNIT_EXPONENT = 2
+MINOR_UNITS_PER_UNIT = 10**MINOR_UNIT_EXPONENT
+
+# Serialized as a JSON number so the API contract is unchanged.
+Money = Annotated[
+    Decimal,
+    Field(decimal_places=MINOR_UNIT_EXPONENT),
+    PlainSerializer(float, return_type=float, when_used="json"),
+]
+PositiveMoney = Annotated[Money, Field(gt=0)]
+NonNegativeMoney = Annotated[Money, Field(ge=0)]
+
+
+def to_minor_units(amount: Decimal | int) -> int:
+    """Convert an amount in currency units to integer minor units."""
+    return int(Decimal(amount).scaleb(MINOR_UNIT_EXPONENT).to_integral_exact())
+
+
+def from_minor_units(amount: int) -> Decimal:
+    """Convert integer minor units to an amount in currency units."""
+    return Decimal(int(amount)).scaleb(-MINOR_UNIT_EXPONENT)
@@ -0,0 +1,59 @@
+"""Maintain the balance checkpoints used to replay the ledger incrementally.
+
+Usage: ``python -m meow_bank.db.checkpoints [--rebuild]``
+"""
+
+import argparse
+import asyncio
+
+from fastapi.concurrency import run_in_threadpool
+
+from meow_bank.core.logging import log
+from meow_bank.services.balance import BalanceService
+
+from .database import SessionLocal
+
+
+def roll_forward_checkpoints() -> int:
+    """Advance checkpoints over newly settled transfers."""
+    with SessionLocal() as db:
+        count = BalanceService(db).roll_forward_checkpoints()
+        db.commit()
+    return count
+
+
+def rebuild_checkpoints() -> int:
+    """Recreate every checkpoint from the full ledger."""
+    with SessionLocal() as db:
+        count = BalanceService(db).rebuild_checkpoints()
+        db.commit()
+    return count
+
+
+async def run_checkpoint_job(interval_seconds: int) -> None:
+    """Roll checkpoints forward every ``interval_seconds`` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            count = await run_in_threadpool(roll_forward_checkpoints)
+            log.debug(f"Rolled forward {count} balance checkpoint(s)")
+        except Exception:
+            log.exception("Balance checkpoint roll-forward failed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="discard all checkpoints and rebuild them from the full ledger",
+    )
+    args = parser.parse_args()
+
+    if args.rebuild:
+        log.info("Rebuilding balance checkpoints...")
+        count = rebuild_checkpoints()
+    else:
+        log.info("Rolling balance checkpoints forward...")
+        count = roll_forward_checkpoints()
+    log.info(f"Wrote {count} balance checkpoint(s)")
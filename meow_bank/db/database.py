@@ -1,24 +1,250 @@
-from collections.abc import Generator
+import time
+from collections.abc import AsyncGenerator, Callable, Generator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, Engine, create_engine, event, make_url
+from sqlalchemy.exc import OperationalError, StatementError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from meow_bank.core.config import settings
+from meow_bank.db.slow_queries import report_slow_query
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=settings.DEBUG,
-)
+# Postgres serialization failure and deadlock.
+TRANSIENT_SQLSTATES = frozenset({"40001", "40P01"})
+# SQLITE_BUSY and SQLITE_LOCKED, for drivers that only give the message.
+TRANSIENT_SQLITE_MESSAGES = ("database is locked", "database table is locked")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Let SQLite readers proceed alongside a writer and wait on lock contention."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
+def _disable_driver_transactions(dbapi_connection, connection_record) -> None:
+    """Stop the SQLite driver from opening transactions on its own.
+
+    It would only open one right before the first write, leaving the reads
+    before it outside the transaction; _begin_sqlite_transaction opens them
+    instead.
+    """
+    dbapi_connection.isolation_level = None
+
+
+def _begin_sqlite_transaction(connection: Connection) -> None:
+    """Open a SQLite transaction, ``BEGIN IMMEDIATE`` if the connection asks.
+
+    A deferred transaction that reads before it writes fails with "database
+    is locked" if another writer commits in between. Transactions that lock
+    what they read should take the write lock up front, by acquiring their
+    connection with ``execution_options={"sqlite_begin": "IMMEDIATE"}``.
+    """
+    mode = connection.get_execution_options().get("sqlite_begin", "DEFERRED")
+    connection.exec_driver_sql(f"BEGIN {mode}")
+
+
+def _listen_for_sqlite_transactions(db_engine: Engine) -> None:
+    event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    event.listen(db_engine, "connect", _disable_driver_transactions)
+    event.listen(db_engine, "begin", _begin_sqlite_transaction)
+
+
+def is_transient_error(error: StatementError) -> bool:
+    """Whether a database error only means the transaction lost a race.
+
+    Covers SQLite's busy and locked errors and Postgres serialization
+    failures and deadlocks. The whole transaction should be rolled back
+    and retried.
+    """
+    orig = error.orig
+    if isinstance(orig, StatementError):
+        # Raised from a column default, such as Transfer.seq's.
+        return is_transient_error(orig)
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate in TRANSIENT_SQLSTATES:
+        return True
+    if not isinstance(error, OperationalError):
+        return False
+    if hasattr(orig, "sqlite_errorname"):  # Python 3.11+
+        return orig.sqlite_errorname.startswith(("SQLITE_BUSY", "SQLITE_LOCKED"))
+    return str(orig).startswith(TRANSIENT_SQLITE_MESSAGES)
+
+
+def _engine_options(database_url: str, is_async: bool = False) -> dict:
+    """Pool and driver options for an engine on ``database_url``."""
+    url = make_url(database_url)
+    options = {
+        "echo": settings.DEBUG,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "sqlite":
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases live on one shared connection, not a pool.
+            return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    return options
+
+
+def create_db_engine(database_url: str) -> Engine:
+    """Build a sync engine with the configured pool and SQLite tuning."""
+    db_engine = create_engine(database_url, **_engine_options(database_url))
+    if db_engine.dialect.name == "sqlite":
+        _listen_for_sqlite_transactions(db_engine)
+    return db_engine
+
+
+def create_async_db_engine(database_url: str) -> AsyncEngine:
+    """Build an async engine with the configured pool and SQLite tuning."""
+    db_engine = create_async_engine(
+        database_url, **_engine_options(database_url, is_async=True)
+    )
+    if db_engine.dialect.name == "sqlite":
+        _listen_for_sqlite_transactions(db_engine.sync_engine)
+    return db_engine
+
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The async engine needs the backend's asyncio driver (aiosqlite, asyncpg), so it
+# is only built when the async path is enabled.
+async_engine = (
+    create_async_db_engine(settings.ASYNC_DATABASE_URL) if settings.ASYNC_DB else None
+)
+
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False) if async_engine else None
+)
+
+# Either kind of session can back the services; see services.base.AsyncService.
+DBSession = Session | AsyncSession
+
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+def on_commit(session: Session, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the session's outermost transaction commits.
+
+    Callbacks are dropped if the transaction, or the savepoint they were
+    registered in, rolls back instead.
+    """
+    savepoint = session.get_nested_transaction()
+    session.info.setdefault("on_commit", []).append((savepoint, callback))
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_callbacks(session: Session) -> None:
+    savepoint = session.get_nested_transaction()
+    callbacks = session.info.get("on_commit", [])
+    if savepoint is None:
+        session.info.pop("on_commit", None)
+        for _, callback in callbacks:
+            callback()
+        return
+
+    # A released savepoint hands its callbacks to the enclosing transaction.
+    parent = savepoint.parent if savepoint.parent.nested else None
+    session.info["on_commit"] = [
+        (parent if owner is savepoint else owner, callback)
+        for owner, callback in callbacks
+    ]
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_commit_callbacks(session: Session) -> None:
+    savepoint = session.get_nested_transaction()
+    if savepoint is None:
+        session.info.pop("on_commit", None)
+        return
+    session.info["on_commit"] = [
+        (owner, callback)
+        for owner, callback in session.info.get("on_commit", [])
+        if owner is not savepoint
+    ]
+
+
+@dataclass
+class QueryStats:
+    """SQL statements executed while tracking, and the time spent in them."""
+
+    count: int = 0
+    seconds: float = 0.0
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements run from the current context inside the block.
+
+    The stats object is shared with threads and tasks started from this
+    context, so work handed to the threadpool is counted too.
+    """
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, *_) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query_time(  # noqa: PLR0913, PLR0917
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    started_at = conn.info.get("query_started_at")
+    if not started_at:
+        return
+    seconds = time.perf_counter() - started_at.pop()
+
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += seconds
+
+    threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold_ms > 0 and seconds * 1000 >= threshold_ms:
+        report_slow_query(conn, statement, parameters, executemany, seconds)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+def get_sync_db() -> Generator[Session, None, None]:
     """Get database session."""
     db = SessionLocal()
     try:
@@ -27,5 +253,17 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get an asyncio database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_db = get_async_db if settings.ASYNC_DB else get_sync_db
+
+
 def init_db() -> None:
-    Base.metadata.create_all(bind=engine)
+    """Create the schema, or migrate an existing one to the current models."""
+    from meow_bank.db.migrations import run_migrations  # noqa: PLC0415
+
+    run_migrations(engine)
@@ -0,0 +1,41 @@
+"""Purge expired idempotency keys.
+
+Usage: ``python -m meow_bank.db.idempotency_keys``
+"""
+
+import argparse
+import asyncio
+
+from fastapi.concurrency import run_in_threadpool
+
+from meow_bank.core.logging import log
+from meow_bank.services.idempotency import IdempotencyService
+
+from .database import SessionLocal
+
+
+def purge_expired_keys() -> int:
+    """Delete every expired idempotency key."""
+    with SessionLocal() as db:
+        count = IdempotencyService(db).purge_expired()
+        db.commit()
+    return count
+
+
+async def run_purge_job(interval_seconds: int) -> None:
+    """Purge expired idempotency keys every ``interval_seconds`` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            count = await run_in_threadpool(purge_expired_keys)
+            log.debug(f"Purged {count} expired idempotency key(s)")
+        except Exception:
+            log.exception("Idempotency key purge failed")
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__).parse_args()
+
+    log.info("Purging expired idempotency keys...")
+    count = purge_expired_keys()
+    log.info(f"Purged {count} idempotency key(s)")
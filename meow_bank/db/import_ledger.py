@@ -0,0 +1,318 @@
+"""Bulk-load historical transfers from a CSV or Parquet file.
+
+Usage: ``python -m meow_bank.db.import_ledger FILE [--start-row N] [--skip-invalid]``
+
+The file needs ``to_account_id``, ``amount`` (in currency units) and
+``created_at`` columns, plus optional ``id`` and ``from_account_id`` (empty for
+deposits). Rows that would overdraw their sender are rejected like any other
+invalid row. Rows are streamed in chunks and each chunk is committed together
+with its accounts' balance changes, so an interrupted import can be resumed
+with ``--start-row`` set to the offset from the last progress line. Imported
+transfers are numbered after everything already in the ledger, so existing
+balance checkpoints stay valid throughout and are rolled forward at the end.
+"""
+
+import argparse
+import csv
+import itertools
+import sys
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Container, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from meow_bank.core.logging import log
+from meow_bank.core.money import MINOR_UNIT_EXPONENT
+from meow_bank.db.models import Account, Transfer, assign_ledger_seqs
+from meow_bank.services.balance import BalanceService
+
+from .database import SessionLocal, engine
+
+COLUMNS = ("id", "from_account_id", "to_account_id", "amount", "created_at")
+COPY_COLUMNS = (*COLUMNS, "seq")
+
+DEFAULT_BATCH_SIZE = 10_000
+
+
+@dataclass
+class ImportResult:
+    """Rows read past the start offset, and what became of them."""
+
+    imported: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.imported + self.skipped
+
+
+def _read_csv(path: Path) -> Iterator[dict]:
+    with path.open(newline="", encoding="utf-8") as file:
+        yield from csv.DictReader(file)
+
+
+def _read_parquet(path: Path, batch_size: int) -> Iterator[dict]:
+    try:
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError as e:
+        raise RuntimeError(
+            "Importing Parquet needs pyarrow: pip install 'meow-bank[parquet]'"
+        ) from e
+
+    parquet_file = pq.ParquetFile(path)
+    columns = [name for name in COLUMNS if name in parquet_file.schema_arrow.names]
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        yield from batch.to_pylist()
+
+
+def read_rows(
+    path: Path, fmt: str | None = None, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[dict]:
+    """Stream the rows of a CSV or Parquet file as dicts.
+
+    The format is taken from the file extension unless ``fmt`` is given.
+    """
+    fmt = fmt or path.suffix.lstrip(".").lower()
+    if fmt == "csv":
+        return _read_csv(path)
+    if fmt == "parquet":
+        return _read_parquet(path, batch_size)
+    raise ValueError(f"Unsupported ledger file format: {fmt!r}")
+
+
+def _parse_amount(value) -> int:
+    try:
+        minor_units = Decimal(str(value).strip()).scaleb(MINOR_UNIT_EXPONENT)
+    except InvalidOperation:
+        raise ValueError(f"invalid amount {value!r}") from None
+    if not minor_units.is_finite() or minor_units != minor_units.to_integral_value():
+        raise ValueError(f"invalid amount {value!r}")
+    if minor_units <= 0:
+        raise ValueError(f"amount must be positive, got {value!r}")
+    return int(minor_units)
+
+
+def _parse_created_at(value) -> datetime:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"invalid created_at {value!r}") from None
+    if not isinstance(value, datetime):
+        raise ValueError(f"invalid created_at {value!r}")
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _parse_id(value, column: str) -> str:
+    try:
+        return str(uuid.UUID(str(value).strip()))
+    except ValueError:
+        raise ValueError(f"invalid {column} {value}") from None
+
+
+def parse_row(row: dict, account_ids: Container[str]) -> dict:
+    """Validate one input row and turn it into a ``transfers`` row.
+
+    Ids are normalized to canonical UUID strings, so they match the stored
+    ones however the file spells them. Raises ValueError naming the first
+    problem found.
+    """
+    from_account_id = row.get("from_account_id") or None
+    to_account_id = row.get("to_account_id") or None
+    if to_account_id is None:
+        raise ValueError("missing to_account_id")
+    to_account_id = _parse_id(to_account_id, "to_account_id")
+    if to_account_id not in account_ids:
+        raise ValueError(f"unknown to_account_id {to_account_id}")
+    if from_account_id is not None:
+        from_account_id = _parse_id(from_account_id, "from_account_id")
+        if from_account_id not in account_ids:
+            raise ValueError(f"unknown from_account_id {from_account_id}")
+    if from_account_id == to_account_id:
+        raise ValueError("from_account_id and to_account_id are the same")
+    if row.get("amount") in (None, ""):
+        raise ValueError("missing amount")
+    if row.get("created_at") in (None, ""):
+        raise ValueError("missing created_at")
+    transfer_id = row.get("id") or None
+    if transfer_id is not None:
+        transfer_id = _parse_id(transfer_id, "id")
+
+    return {
+        "id": transfer_id or str(uuid.uuid4()),
+        "from_account_id": from_account_id,
+        "to_account_id": to_account_id,
+        "amount": _parse_amount(row["amount"]),
+        "created_at": _parse_created_at(row["created_at"]),
+    }
+
+
+def apply_to_balances(transfer: dict, balances: dict[str, int]) -> None:
+    """Move a parsed transfer's amount between the running ``balances``.
+
+    Raises ValueError, leaving them untouched, if the sender can't cover it.
+    """
+    from_account_id = transfer["from_account_id"]
+    amount = transfer["amount"]
+    if from_account_id is not None:
+        if balances[from_account_id] < amount:
+            raise ValueError(f"insufficient funds in from_account_id {from_account_id}")
+        balances[from_account_id] -= amount
+    balances[transfer["to_account_id"]] += amount
+
+
+def _copy_transfers(db: Session, rows: list[dict]) -> None:
+    """Stream rows into ``transfers`` with Postgres COPY (psycopg 3)."""
+    cursor = db.connection().connection.driver_connection.cursor()
+    columns = ", ".join(COPY_COLUMNS)
+    with cursor.copy(f"COPY transfers ({columns}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row([row[column] for column in COPY_COLUMNS])
+
+
+def insert_transfers(db: Session, rows: list[dict]) -> None:
+    """Insert a chunk of transfers with the backend's fastest bulk path.
+
+    Postgres on psycopg 3 uses COPY; everything else, SQLite included, gets
+    one executemany of the whole chunk.
+    """
+    assign_ledger_seqs(db.connection(), rows)
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg":
+        _copy_transfers(db, rows)
+    else:
+        db.execute(insert(Transfer.__table__), rows)
+
+
+def _balance_deltas(rows: Iterable[dict]) -> dict[str, int]:
+    deltas: dict[str, int] = defaultdict(int)
+    for row in rows:
+        if row["from_account_id"] is not None:
+            deltas[row["from_account_id"]] -= row["amount"]
+        deltas[row["to_account_id"]] += row["amount"]
+    return deltas
+
+
+def import_ledger(
+    db: Session,
+    rows: Iterable[dict],
+    *,
+    start_row: int = 0,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    skip_invalid: bool = False,
+) -> ImportResult:
+    """Load transfers from ``rows``, skipping the first ``start_row`` of them.
+
+    Every chunk of ``batch_size`` rows is inserted and committed together
+    with the balance changes it causes. An invalid row, including one whose
+    sender can't cover it at that point of the file, raises ValueError,
+    leaving the chunks before it committed, unless ``skip_invalid`` is set;
+    so does a chunk that clashes with existing transfers, e.g. on ``id``.
+    Balance checkpoints are rolled forward once every row is in.
+    """
+    # Running balances, so rows that would overdraw their sender are rejected
+    # like any other invalid row.
+    balances = dict(db.execute(select(Account.id, Account.balance)).all())
+    balance_service = BalanceService(db)
+
+    result = ImportResult()
+    started = time.perf_counter()
+    row_number = start_row
+    remaining = itertools.islice(rows, start_row, None)
+    while chunk := list(itertools.islice(remaining, batch_size)):
+        transfers = []
+        for row in chunk:
+            row_number += 1
+            try:
+                transfer = parse_row(row, balances)
+                apply_to_balances(transfer, balances)
+            except ValueError as e:
+                if not skip_invalid:
+                    raise ValueError(f"Row {row_number}: {e}") from None
+                log.warning(f"Skipping row {row_number}: {e}")
+                result.skipped += 1
+            else:
+                transfers.append(transfer)
+
+        if transfers:
+            try:
+                insert_transfers(db, transfers)
+            except IntegrityError as e:
+                db.rollback()
+                raise ValueError(
+                    f"Rows {row_number - len(chunk) + 1}-{row_number}: {e.orig}"
+                ) from None
+            balance_service.apply_balance_deltas(_balance_deltas(transfers))
+        db.commit()
+
+        result.imported += len(transfers)
+        result.seconds = time.perf_counter() - started
+        log.info(
+            f"Imported {result.imported} transfers "
+            f"({result.rows / result.seconds:,.0f} rows/s); "
+            f"resume with --start-row {row_number}"
+        )
+
+    log.info("Rolling balance checkpoints forward...")
+    balance_service.roll_forward_checkpoints()
+    db.commit()
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file", type=Path, help="CSV or Parquet file to import")
+    parser.add_argument(
+        "--format",
+        choices=("csv", "parquet"),
+        help="file format (defaults to the file extension)",
+    )
+    parser.add_argument(
+        "--start-row",
+        type=int,
+        default=0,
+        help="number of data rows to skip, to resume an interrupted import",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="rows inserted and committed per chunk",
+    )
+    parser.add_argument(
+        "--skip-invalid",
+        action="store_true",
+        help="log and skip invalid rows instead of stopping at the first one",
+    )
+    args = parser.parse_args()
+
+    engine.echo = False  # echoing every chunk would dominate the import
+    log.info(f"Importing transfers from {args.file}...")
+    with SessionLocal() as db:
+        try:
+            result = import_ledger(
+                db,
+                read_rows(args.file, args.format, args.batch_size),
+                start_row=args.start_row,
+                batch_size=args.batch_size,
+                skip_invalid=args.skip_invalid,
+            )
+        except (RuntimeError, ValueError) as e:
+            log.error(f"Import stopped: {e}")
+            sys.exit(1)
+    log.info(
+        f"Imported {result.imported} transfers and skipped {result.skipped} rows "
+        f"in {result.seconds:.1f}s ({result.rows / result.seconds:,.0f} rows/s)"
+    )
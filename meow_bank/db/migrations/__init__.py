@@ -0,0 +1,89 @@
+"""Schema migrations for databases created by an older version of the models.
+
+Fresh databases are built straight from the models and stamped as fully
+migrated. Existing databases get each pending migration applied in order, and
+any tables that are new since then are created afterwards.
+
+Each migration module exposes ``VERSION``, ``DESCRIPTION`` and
+``upgrade(connection)``. Migrations use plain SQL rather than the ORM models so
+they keep working as the models evolve.
+"""
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Engine,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    inspect,
+    select,
+)
+
+from meow_bank.core.logging import log
+from meow_bank.db import models  # noqa: F401  (registers the tables on Base)
+from meow_bank.db.database import Base
+from meow_bank.db.migrations import (
+    m0001_account_balance,
+    m0002_minor_unit_amounts,
+    m0003_account_version,
+    m0004_transfer_history_indexes,
+    m0005_covering_transfer_indexes,
+    m0006_transfer_sequence,
+    m0007_binary_uuid_keys,
+    m0008_concurrent_ledger_sequence,
+    m0009_sequence_keyed_checkpoints,
+)
+
+MIGRATIONS = [
+    m0001_account_balance,
+    m0002_minor_unit_amounts,
+    m0003_account_version,
+    m0004_transfer_history_indexes,
+    m0005_covering_transfer_indexes,
+    m0006_transfer_sequence,
+    m0007_binary_uuid_keys,
+    m0008_concurrent_ledger_sequence,
+    m0009_sequence_keyed_checkpoints,
+]
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """Bring the schema up to date and return the versions that were applied."""
+    applied_now = []
+    with engine.begin() as connection:
+        is_fresh = not inspect(connection).has_table("transfers")
+        schema_migrations.create(connection, checkfirst=True)
+        applied = set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+        for migration in MIGRATIONS:
+            if migration.VERSION in applied:
+                continue
+            if not is_fresh:
+                log.info(
+                    f"Applying migration {migration.VERSION:04d}: "
+                    f"{migration.DESCRIPTION}"
+                )
+                migration.upgrade(connection)
+                applied_now.append(migration.VERSION)
+            connection.execute(
+                insert(schema_migrations).values(
+                    version=migration.VERSION,
+                    description=migration.DESCRIPTION,
+                )
+            )
+
+        Base.metadata.create_all(connection)
+
+    return applied_now
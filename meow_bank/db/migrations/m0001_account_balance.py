@@ -0,0 +1,22 @@
+from sqlalchemy import Connection, inspect, text
+
+VERSION = 1
+DESCRIPTION = "Materialize account balances"
+
+RECOMPUTE_BALANCES = text("""
+    UPDATE accounts SET balance =
+        (SELECT COALESCE(SUM(amount), 0) FROM transfers
+         WHERE transfers.to_account_id = accounts.id)
+      - (SELECT COALESCE(SUM(amount), 0) FROM transfers
+         WHERE transfers.from_account_id = accounts.id)
+    """)
+
+
+def upgrade(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("accounts")}
+    if "balance" not in columns:
+        connection.execute(
+            text("ALTER TABLE accounts ADD COLUMN balance FLOAT NOT NULL DEFAULT 0")
+        )
+
+    connection.execute(RECOMPUTE_BALANCES)
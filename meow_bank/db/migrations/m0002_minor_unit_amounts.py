@@ -0,0 +1,52 @@
+from sqlalchemy import Connection, text
+
+VERSION = 2
+DESCRIPTION = "Store amounts and balances as integer minor units"
+
+RECOMPUTE_BALANCES = text("""
+    UPDATE accounts SET balance =
+        (SELECT COALESCE(SUM(amount), 0) FROM transfers
+         WHERE transfers.to_account_id = accounts.id)
+      - (SELECT COALESCE(SUM(amount), 0) FROM transfers
+         WHERE transfers.from_account_id = accounts.id)
+    """)
+
+
+def upgrade(connection: Connection) -> None:
+    if connection.dialect.name == "postgresql":
+        connection.execute(
+            text(
+                "ALTER TABLE transfers ALTER COLUMN amount TYPE BIGINT "
+                "USING ROUND(amount * 100)::BIGINT"
+            )
+        )
+        connection.execute(
+            text("ALTER TABLE accounts ALTER COLUMN balance TYPE BIGINT USING 0")
+        )
+    else:
+        # SQLite can't change a column's type in place, so swap in a new column.
+        connection.execute(
+            text(
+                "ALTER TABLE transfers "
+                "ADD COLUMN amount_minor BIGINT NOT NULL DEFAULT 0"
+            )
+        )
+        connection.execute(
+            text(
+                "UPDATE transfers "
+                "SET amount_minor = CAST(ROUND(amount * 100) AS INTEGER)"
+            )
+        )
+        connection.execute(text("ALTER TABLE transfers DROP COLUMN amount"))
+        connection.execute(
+            text("ALTER TABLE transfers RENAME COLUMN amount_minor TO amount")
+        )
+        connection.execute(text("ALTER TABLE accounts DROP COLUMN balance"))
+        connection.execute(
+            text("ALTER TABLE accounts ADD COLUMN balance BIGINT NOT NULL DEFAULT 0")
+        )
+
+    connection.execute(RECOMPUTE_BALANCES)
+
+    # Checkpoints are derived data; recreated empty and rolled forward again.
+    connection.execute(text("DROP TABLE IF EXISTS balance_checkpoints"))
@@ -0,0 +1,10 @@
+from sqlalchemy import Connection, text
+
+VERSION = 3
+DESCRIPTION = "Add account version for optimistic concurrency"
+
+
+def upgrade(connection: Connection) -> None:
+    connection.execute(
+        text("ALTER TABLE accounts ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+    )
@@ -0,0 +1,19 @@
+from sqlalchemy import Connection, text
+
+VERSION = 4
+DESCRIPTION = "Add composite indexes for paginated transfer history"
+
+
+def upgrade(connection: Connection) -> None:
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_transfers_from_account_history "
+            "ON transfers (from_account_id, created_at, id)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_transfers_to_account_history "
+            "ON transfers (to_account_id, created_at, id)"
+        )
+    )
@@ -0,0 +1,34 @@
+from sqlalchemy import Connection, text
+
+VERSION = 5
+DESCRIPTION = "Cover balance aggregation with the transfer history indexes"
+
+# Primary keys are already indexed, and the account columns of transfers are
+# the leading columns of the covering indexes created below.
+REDUNDANT_INDEXES = (
+    "ix_customers_id",
+    "ix_accounts_id",
+    "ix_transfers_id",
+    "ix_transfers_from_account_id",
+    "ix_transfers_to_account_id",
+    "ix_transfers_from_account_history",
+    "ix_transfers_to_account_history",
+)
+
+
+def upgrade(connection: Connection) -> None:
+    # Build the replacements first so lookups never lose their index.
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_transfers_from_account_ledger "
+            "ON transfers (from_account_id, created_at, id, amount)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_transfers_to_account_ledger "
+            "ON transfers (to_account_id, created_at, id, amount)"
+        )
+    )
+    for index in REDUNDANT_INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
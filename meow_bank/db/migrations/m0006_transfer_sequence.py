@@ -0,0 +1,37 @@
+from sqlalchemy import Connection, text
+
+VERSION = 6
+DESCRIPTION = "Number transfers with an append-only ledger sequence"
+
+# Existing transfers are numbered in the order they were created.
+NUMBER_EXISTING_TRANSFERS = text("""
+    UPDATE transfers SET seq = numbered.seq
+    FROM (
+        SELECT id, ROW_NUMBER() OVER (ORDER BY created_at, id) AS seq
+        FROM transfers
+    ) AS numbered
+    WHERE transfers.id = numbered.id
+    """)
+
+
+def upgrade(connection: Connection) -> None:
+    connection.execute(
+        text("ALTER TABLE transfers ADD COLUMN seq BIGINT NOT NULL DEFAULT 0")
+    )
+    connection.execute(NUMBER_EXISTING_TRANSFERS)
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("ALTER TABLE transfers ALTER COLUMN seq DROP DEFAULT"))
+    connection.execute(text("CREATE UNIQUE INDEX ix_transfers_seq ON transfers (seq)"))
+
+    connection.execute(
+        text(
+            "CREATE TABLE ledger_sequence "
+            "(id INTEGER PRIMARY KEY, last_seq BIGINT NOT NULL)"
+        )
+    )
+    connection.execute(
+        text(
+            "INSERT INTO ledger_sequence (id, last_seq) "
+            "SELECT 1, COALESCE(MAX(seq), 0) FROM transfers"
+        )
+    )
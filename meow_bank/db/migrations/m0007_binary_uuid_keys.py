@@ -0,0 +1,96 @@
+import uuid
+
+from sqlalchemy import Connection, inspect, text
+
+VERSION = 7
+DESCRIPTION = "Store ids as native or 16-byte binary UUIDs instead of strings"
+
+ID_COLUMNS = {
+    "customers": ("id",),
+    "accounts": ("id", "customer_id"),
+    "transfers": ("id", "from_account_id", "to_account_id"),
+    "balance_checkpoints": ("account_id",),
+}
+
+
+def upgrade(connection: Connection) -> None:
+    # Tables and columns that don't exist yet are created with the new type.
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    id_columns = {}
+    for table, columns in ID_COLUMNS.items():
+        if table in existing:
+            present = {column["name"] for column in inspector.get_columns(table)}
+            id_columns[table] = tuple(c for c in columns if c in present)
+    if connection.dialect.name == "postgresql":
+        _upgrade_postgresql(connection, id_columns)
+    else:
+        _upgrade_sqlite(connection, id_columns)
+
+
+def _upgrade_postgresql(
+    connection: Connection, id_columns: dict[str, tuple[str, ...]]
+) -> None:
+    # A foreign key can't span a varchar and a uuid column, so the constraints
+    # are dropped while the columns change type and restored afterwards.
+    inspector = inspect(connection)
+    foreign_keys = [
+        (table, foreign_key)
+        for table in id_columns
+        for foreign_key in inspector.get_foreign_keys(table)
+    ]
+    for table, foreign_key in foreign_keys:
+        connection.execute(
+            text(f"ALTER TABLE {table} DROP CONSTRAINT {foreign_key['name']}")
+        )
+
+    for table, columns in id_columns.items():
+        alterations = ", ".join(
+            f"ALTER COLUMN {column} TYPE uuid USING {column}::uuid"
+            for column in columns
+        )
+        connection.execute(text(f"ALTER TABLE {table} {alterations}"))
+
+    for table, foreign_key in foreign_keys:
+        constrained = ", ".join(foreign_key["constrained_columns"])
+        referred = ", ".join(foreign_key["referred_columns"])
+        connection.execute(
+            text(
+                f"ALTER TABLE {table} ADD CONSTRAINT {foreign_key['name']} "
+                f"FOREIGN KEY ({constrained}) "
+                f"REFERENCES {foreign_key['referred_table']} ({referred})"
+            )
+        )
+
+
+def _upgrade_sqlite(
+    connection: Connection, id_columns: dict[str, tuple[str, ...]]
+) -> None:
+    # SQLite stores each value with its own type whatever the column was
+    # declared as, so the ids are rewritten in place as blobs. SQLite before
+    # 3.41 has no unhex(), hence the Python function. The old text is only
+    # given back to the filesystem by a VACUUM.
+    invalid = []
+
+    def uuid_bytes(value):
+        if value is None:
+            return None
+        try:
+            return uuid.UUID(value).bytes
+        except (TypeError, ValueError):
+            invalid.append(value)
+            return value
+
+    connection.connection.driver_connection.create_function(
+        "uuid_bytes", 1, uuid_bytes, deterministic=True
+    )
+    for table, columns in id_columns.items():
+        assignments = ", ".join(
+            f"{column} = uuid_bytes({column})" for column in columns
+        )
+        connection.execute(text(f"UPDATE {table} SET {assignments}"))
+        if invalid:
+            raise ValueError(
+                f"{table} holds {len(invalid)} ids that are not UUIDs, "
+                f"for example {invalid[0]!r}"
+            )
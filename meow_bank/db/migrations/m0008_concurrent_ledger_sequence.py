@@ -0,0 +1,31 @@
+from sqlalchemy import Connection, text
+
+VERSION = 8
+DESCRIPTION = "Number transfers from a database sequence and index them by seq"
+
+
+def upgrade(connection: Connection) -> None:
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("CREATE SEQUENCE transfer_ledger_seq"))
+        connection.execute(
+            text(
+                "SELECT setval('transfer_ledger_seq', COALESCE(MAX(seq), 0) + 1, "
+                "false) FROM transfers"
+            )
+        )
+
+    # Build the replacements first so lookups never lose their index.
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_transfers_from_account_seq "
+            "ON transfers (from_account_id, seq, amount)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_transfers_to_account_seq "
+            "ON transfers (to_account_id, seq, amount)"
+        )
+    )
+    for index in ("ix_transfers_from_account_ledger", "ix_transfers_to_account_ledger"):
+        connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
@@ -1,15 +1,33 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, String, func
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Connection,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    Text,
+    event,
+    func,
+    select,
+    text,
+    update,
+)
 from sqlalchemy.orm import relationship
 
 from .database import Base
+from .types import GUID
 
 
 class Customer(Base):
     __tablename__ = "customers"
 
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -22,8 +40,13 @@ class Customer(Base):
 class Account(Base):
     __tablename__ = "accounts"
 
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
-    customer_id = Column(String, ForeignKey("customers.id"), nullable=False, index=True)
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    customer_id = Column(GUID, ForeignKey("customers.id"), nullable=False, index=True)
+    # Running balance in minor units, kept in step with the ledger in the same
+    # transaction as every Transfer insert (see BalanceService.apply_transfer).
+    balance = Column(BigInteger, nullable=False, default=0, server_default="0")
+    # Bumped on every debit so concurrent debits can compare-and-swap.
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     customer = relationship("Customer", back_populates="accounts")
@@ -39,21 +62,31 @@ class Account(Base):
     )
 
     def __repr__(self):
-        return f"<Account(id={self.id}, customer_id={self.customer_id})>"
+        return (
+            f"<Account(id={self.id}, "
+            f"customer_id={self.customer_id}, "
+            f"balance={self.balance})>"
+        )
 
 
 class Transfer(Base):
     __tablename__ = "transfers"
 
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
-    from_account_id = Column(
-        String, ForeignKey("accounts.id"), nullable=True, index=True
-    )
-    to_account_id = Column(
-        String, ForeignKey("accounts.id"), nullable=False, index=True
-    )
-    amount = Column(Float, nullable=False)
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    from_account_id = Column(GUID, ForeignKey("accounts.id"), nullable=True)
+    to_account_id = Column(GUID, ForeignKey("accounts.id"), nullable=False)
+    amount = Column(BigInteger, nullable=False)  # minor units (cents)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Position in the ledger (see allocate_ledger_seqs). Readers following the
+    # ledger by seq stop at ledger_read_horizon. Bulk inserts number their rows
+    # with assign_ledger_seqs rather than taking one number per row.
+    seq = Column(
+        BigInteger,
+        nullable=False,
+        unique=True,
+        index=True,
+        default=lambda context: allocate_ledger_seqs(context.connection)[0],
+    )
 
     from_account = relationship(
         "Account",
@@ -66,6 +99,16 @@ class Transfer(Base):
         back_populates="received_transfers",
     )
 
+    __table_args__ = (
+        # One index per direction serves every per-account lookup. Keyset
+        # pagination of an account's history is a range scan in seq order, and
+        # summing an account's amounts after its balance checkpoint reads only
+        # the index, never the table. They also index the foreign keys, so the
+        # accounts need no single-column indexes of their own.
+        Index("ix_transfers_from_account_seq", from_account_id, seq, amount),
+        Index("ix_transfers_to_account_seq", to_account_id, seq, amount),
+    )
+
     def __repr__(self):
         return (
             f"<Transfer(id={self.id}, "
@@ -73,3 +116,166 @@ class Transfer(Base):
             f"to_account_id={self.to_account_id}, "
             f"amount={self.amount})>"
         )
+
+
+# Postgres hands out Transfer.seq numbers from this sequence (see
+# allocate_ledger_seqs); backends without sequences use LedgerSequence.
+transfer_ledger_seq = Sequence("transfer_ledger_seq", metadata=Base.metadata)
+
+# Advisory lock keys marking the sequence numbers still in flight are offset
+# by this, to keep them apart from any other advisory lock on the database.
+LEDGER_LOCK_BASE = 0x6D656F77 << 32
+
+# Lock a key no higher than the next number the sequence will hand out. Shared,
+# so concurrent transfers don't wait for each other.
+LOCK_NEXT_LEDGER_SEQ = text(f"""
+    SELECT pg_advisory_xact_lock_shared(
+        {LEDGER_LOCK_BASE} + last_value + CASE WHEN is_called THEN 1 ELSE 0 END
+    )
+    FROM transfer_ledger_seq
+    """)
+
+LAST_LEDGER_SEQ = text("""
+    SELECT last_value - CASE WHEN is_called THEN 0 ELSE 1 END
+    FROM transfer_ledger_seq
+    """)
+
+OLDEST_IN_FLIGHT_LEDGER_SEQ = text(f"""
+    SELECT MIN(((classid::bigint << 32) | objid::bigint) - {LEDGER_LOCK_BASE})
+    FROM pg_locks
+    WHERE locktype = 'advisory' AND objsubid = 1
+      AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND ((classid::bigint << 32) | objid::bigint) >= {LEDGER_LOCK_BASE}
+    """)
+
+
+class LedgerSequence(Base):
+    """Single-row counter that hands out ``Transfer.seq`` numbers without sequences.
+
+    Taking numbers locks the row until the transaction ends. That serializes
+    every transaction writing transfers, which costs nothing on SQLite, where
+    writers are serialized anyway, and makes numbers follow commit order.
+    """
+
+    __tablename__ = "ledger_sequence"
+
+    id = Column(Integer, primary_key=True)
+    last_seq = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<LedgerSequence(last_seq={self.last_seq})>"
+
+
+event.listen(
+    LedgerSequence.__table__,
+    "after_create",
+    DDL("INSERT INTO ledger_sequence (id, last_seq) VALUES (1, 0)"),
+)
+
+
+def allocate_ledger_seqs(connection: Connection, count: int = 1) -> list[int]:
+    """Reserve ``count`` transfer sequence numbers, in increasing order.
+
+    On Postgres they come from ``transfer_ledger_seq``, so transactions don't
+    wait for each other, but they may commit out of order. Each transaction
+    first takes a shared advisory lock on a key at or below its numbers,
+    held until it ends, which is what ledger_read_horizon looks for.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(LOCK_NEXT_LEDGER_SEQ)
+        return sorted(
+            connection.execute(
+                select(transfer_ledger_seq.next_value()).select_from(
+                    func.generate_series(1, count)
+                )
+            ).scalars()
+        )
+
+    ledger_sequence = LedgerSequence.__table__
+    last_seq = connection.execute(
+        update(ledger_sequence)
+        .values(last_seq=ledger_sequence.c.last_seq + count)
+        .returning(ledger_sequence.c.last_seq)
+    ).scalar_one()
+    return list(range(last_seq - count + 1, last_seq + 1))
+
+
+def assign_ledger_seqs(connection: Connection, rows: list[dict]) -> None:
+    """Number transfer rows for a bulk insert, in list order."""
+    if not rows:
+        return
+    for row, seq in zip(rows, allocate_ledger_seqs(connection, len(rows)), strict=True):
+        row["seq"] = seq
+
+
+def ledger_read_horizon(connection: Connection) -> int:
+    """Highest ``seq`` up to which the ledger can no longer change.
+
+    Every transfer numbered at or below it has committed or rolled back, so a
+    reader that follows the ledger by ``seq`` and stops here never skips a
+    transfer that commits later. Read it in its own statement before querying
+    the transfers, so that query sees everything committed by then.
+    """
+    if connection.dialect.name != "postgresql":
+        # Numbers are handed out in commit order, so everything committed is
+        # settled.
+        return connection.execute(
+            select(func.coalesce(func.max(Transfer.seq), 0))
+        ).scalar_one()
+
+    # The sequence is read first: a number handed out after it is above the
+    # horizon anyway, and one handed out before it has its lock taken by then.
+    last_seq = connection.execute(LAST_LEDGER_SEQ).scalar_one()
+    oldest_in_flight = connection.execute(OLDEST_IN_FLIGHT_LEDGER_SEQ).scalar_one()
+    if oldest_in_flight is None:
+        return last_seq
+    return min(last_seq, oldest_in_flight - 1)
+
+
+class BalanceCheckpoint(Base):
+    """Ledger balance of an account up to and including a ledger sequence number.
+
+    Checkpoints let the ledger balance be recomputed by replaying only the
+    transfers numbered after ``last_seq``. They never pass the ledger's read
+    horizon, so no transfer can still commit at or below ``last_seq``.
+    """
+
+    __tablename__ = "balance_checkpoints"
+
+    account_id = Column(GUID, ForeignKey("accounts.id"), primary_key=True)
+    balance = Column(BigInteger, nullable=False, default=0)
+    last_seq = Column(BigInteger, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return (
+            f"<BalanceCheckpoint(account_id={self.account_id}, "
+            f"balance={self.balance}, "
+            f"last_seq={self.last_seq})>"
+        )
+
+
+class IdempotencyKey(Base):
+    """Response stored for a client-supplied ``Idempotency-Key``.
+
+    Keys are scoped to the endpoint they were sent to and kept until
+    ``expires_at``; a retry with the same key replays ``response``.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return (
+            f"<IdempotencyKey(scope={self.scope}, "
+            f"key={self.key}, "
+            f"expires_at={self.expires_at})>"
+        )
@@ -0,0 +1,52 @@
+"""Recompute account balances from the transfers ledger and report any drift.
+
+Usage: ``python -m meow_bank.db.reconcile_balances [--fix]``
+"""
+
+import argparse
+import sys
+
+from meow_bank.core.logging import log
+from meow_bank.services.balance import BalanceService
+
+from .database import SessionLocal
+
+
+def reconcile_balances(fix: bool = False) -> int:
+    """Log every drifted account and return how many were found."""
+    with SessionLocal() as db:
+        balance_service = BalanceService(db)
+        drift = balance_service.find_balance_drift()
+
+        for account_id, stored, ledger in drift:
+            log.warning(
+                f"Balance drift on account {account_id}: "
+                f"stored={stored} ledger={ledger}"
+            )
+
+        if drift and fix:
+            # The fix reads the drifted accounts again under lock, in a fresh
+            # transaction that holds SQLite's write lock from the start.
+            db.rollback()
+            db.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+            corrected = balance_service.fix_balance_drift(drift)
+            db.commit()
+            log.info(f"Corrected {len(corrected)} account balance(s)")
+
+    return len(drift)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="move drifted balances back in line with the ledger",
+    )
+    args = parser.parse_args()
+
+    log.info("Reconciling account balances...")
+    drifted = reconcile_balances(fix=args.fix)
+    if not drifted:
+        log.info("All account balances match the ledger")
+    sys.exit(1 if drifted and not args.fix else 0)
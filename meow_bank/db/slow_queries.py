@@ -0,0 +1,151 @@
+"""Detect slow SQL statements and capture the backend's query plan for them.
+
+Every statement slower than ``SLOW_QUERY_THRESHOLD_MS`` is counted by its
+fingerprint (the statement with literals and parameter lists normalised away)
+and logged to the slow-query log with its parameters. The first time a
+fingerprint is seen, and then at most once per
+``SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS``, the log record also carries the
+backend's ``EXPLAIN`` output, so a plan that stops using an index shows up as
+the data grows.
+"""
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from threading import Lock
+
+from sqlalchemy import Connection
+
+from meow_bank.core.config import settings
+from meow_bank.core.logging import log, slow_query_log
+from meow_bank.core.metrics import metrics
+
+slow_queries = metrics.counter(
+    "meow_bank_slow_queries_total",
+    "SQL statements slower than SLOW_QUERY_THRESHOLD_MS, by fingerprint",
+    labels=("fingerprint",),
+)
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+
+_PLACEHOLDER = re.compile(
+    r"""
+    '(?:[^']|'')*'              # string literal
+    | %\(\w+\)s | %s            # pyformat / format placeholders
+    | \$\d+ | :\w+ | \?         # numeric / named / qmark placeholders
+    | \b\d+(?:\.\d+)?\b         # numeric literal
+    """,
+    re.VERBOSE,
+)
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+# Only read-only statements are explained; EXPLAIN never runs them.
+_EXPLAINABLE = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """Short stable id for a statement shape, whatever its values."""
+    normalized = " ".join(statement.split())
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(...)", normalized)
+    return hashlib.sha1(normalized.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+@dataclass
+class SlowQueryStats:
+    """Slow executions of one statement shape."""
+
+    count: int = 0
+    max_seconds: float = 0.0
+    explained_at: float | None = None
+
+
+_stats: dict[str, SlowQueryStats] = {}
+_stats_lock = Lock()
+
+
+def explain(conn: Connection, statement: str, parameters) -> list[str] | None:
+    """The backend's plan for a SELECT, or None if it can't be explained here.
+
+    Runs on the raw DBAPI connection so it is neither timed nor reported
+    itself. On Postgres it runs inside a savepoint, so a failed EXPLAIN can't
+    abort the caller's transaction.
+    """
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or not _EXPLAINABLE.match(statement):
+        return None
+
+    use_savepoint = conn.dialect.name == "postgresql"
+    cursor = conn.connection.cursor()
+    try:
+        if use_savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            # SQLite and Postgres put the readable plan in the last column.
+            plan = [
+                (
+                    " ".join(str(column) for column in row)
+                    if conn.dialect.name == "mysql"
+                    else str(row[-1])
+                )
+                for row in cursor.fetchall()
+            ]
+        finally:
+            if use_savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except Exception as e:
+        log.debug(f"Could not explain slow query: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+def report_slow_query(
+    conn: Connection,
+    statement: str,
+    parameters,
+    executemany: bool,
+    seconds: float,
+) -> None:
+    """Count a slow statement and write it, with its plan when due, to the log."""
+    key = fingerprint(statement)
+    now = time.monotonic()
+    with _stats_lock:
+        stats = _stats.setdefault(key, SlowQueryStats())
+        stats.count += 1
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        explain_due = not executemany and (
+            stats.explained_at is None
+            or now - stats.explained_at >= settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS
+        )
+        if explain_due:
+            stats.explained_at = now
+        count, max_seconds = stats.count, stats.max_seconds
+    slow_queries.inc(fingerprint=key)
+
+    plan = explain(conn, statement, parameters) if explain_due else None
+    if executemany:
+        # Bulk loads pass thousands of rows; the first shows the shape.
+        rows, parameters = len(parameters), parameters[:1]
+    else:
+        rows = None
+    slow_query_log.warning(
+        f"Slow query {key} took {seconds * 1000:.1f} ms",
+        extra={
+            "fingerprint": key,
+            "duration_ms": round(seconds * 1000, 3),
+            "count": count,
+            "max_duration_ms": round(max_seconds * 1000, 3),
+            "statement": statement,
+            "parameters": parameters,
+            "executemany_rows": rows,
+            "plan": plan,
+        },
+    )
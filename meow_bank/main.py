@@ -1,19 +1,54 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import APIRouter, Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from meow_bank.api.middleware import RequestMetricsMiddleware
 from meow_bank.api.routes import accounts, customers, transfers
 from meow_bank.api.security import get_api_key
-from meow_bank.db.database import init_db
+from meow_bank.core.config import settings
+from meow_bank.core.metrics import metrics
+from meow_bank.db.checkpoints import run_checkpoint_job
+from meow_bank.db.database import SessionLocal, init_db
+from meow_bank.db.idempotency_keys import run_purge_job
+from meow_bank.services.group_commit import TransferGroupCommitter
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Initialize database and background jobs on startup."""
     init_db()
+
+    background_tasks = []
+    if settings.BALANCE_CHECKPOINT_INTERVAL_SECONDS > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_checkpoint_job(settings.BALANCE_CHECKPOINT_INTERVAL_SECONDS)
+            )
+        )
+    if settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_purge_job(settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS)
+            )
+        )
+
+    app.state.transfer_committer = None
+    if settings.TRANSFER_GROUP_COMMIT:
+        app.state.transfer_committer = TransferGroupCommitter(SessionLocal)
+        app.state.transfer_committer.start()
+
     yield
 
+    if app.state.transfer_committer is not None:
+        await app.state.transfer_committer.stop()
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
 
 app = FastAPI(
     title="Meow Bank API",
@@ -29,6 +64,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    RequestMetricsMiddleware, server_timing=settings.SERVER_TIMING_HEADER
+)
 
 router = APIRouter(dependencies=[Depends(get_api_key)], prefix="/api")
 
@@ -37,3 +75,11 @@ router.include_router(accounts.router)
 router.include_router(transfers.router)
 
 app.include_router(router)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint; served without an API key like a health check."""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,15 +1,31 @@
 """Pydantic schemas for the Meow Bank application."""
 
-from .account import AccountCreate, AccountResponse, AccountWithTransfers
+from .account import (
+    AccountBatchCreate,
+    AccountCreate,
+    AccountResponse,
+    AccountWithTransfers,
+)
 from .customer import (
     CustomerCreate,
     CustomerResponse,
     CustomerWithAccountIds,
     CustomerWithAccounts,
 )
-from .transfer import TransferCreate, TransferResponse
+from .ledger import LedgerEntry
+from .transfer import (
+    TransferBatchCreate,
+    TransferBatchItemResult,
+    TransferBatchResponse,
+    TransferCreate,
+    TransferEvent,
+    TransferFeed,
+    TransferFeedEntry,
+    TransferResponse,
+)
 
 __all__ = [
+    "AccountBatchCreate",
     "AccountCreate",
     "AccountResponse",
     "AccountWithTransfers",
@@ -17,6 +33,13 @@ __all__ = [
     "CustomerResponse",
     "CustomerWithAccountIds",
     "CustomerWithAccounts",
+    "LedgerEntry",
+    "TransferBatchCreate",
+    "TransferBatchItemResult",
+    "TransferBatchResponse",
     "TransferCreate",
+    "TransferEvent",
+    "TransferFeed",
+    "TransferFeedEntry",
     "TransferResponse",
 ]
@@ -1,8 +1,9 @@
 from datetime import datetime
 
-from pydantic import Field, NonNegativeFloat
+from pydantic import Field
 
 from meow_bank.core.constants import UUIDStr
+from meow_bank.core.money import NonNegativeMoney
 from meow_bank.schemas.base import ORMBase
 from meow_bank.schemas.transfer import TransferResponse
 
@@ -12,17 +13,28 @@ class AccountBase(ORMBase):
 
 
 class AccountCreate(AccountBase):
-    initial_deposit: NonNegativeFloat = Field(
+    initial_deposit: NonNegativeMoney = Field(
         ..., description="Initial deposit amount (must be non-negative)"
     )
 
 
+class AccountBatchCreate(ORMBase):
+    accounts: list[AccountCreate] = Field(
+        ..., min_length=1, description="Accounts to open, in order"
+    )
+
+
 class AccountResponse(AccountBase):
     id: UUIDStr
     created_at: datetime
-    balance: NonNegativeFloat = Field(..., description="Current account balance")
+    balance: NonNegativeMoney = Field(..., description="Current account balance")
 
 
 class AccountWithTransfers(AccountResponse):
-    sent_transfers: list[TransferResponse] = Field(default_factory=list)
-    received_transfers: list[TransferResponse] = Field(default_factory=list)
+    transfers: list[TransferResponse] = Field(
+        default_factory=list,
+        description="Sent and received transfers, newest first",
+    )
+    next_cursor: str | None = Field(
+        None, description="Pass as `cursor` to fetch the next page, if any"
+    )
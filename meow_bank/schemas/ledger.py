@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from pydantic import Field
+
+from meow_bank.core.constants import UUIDStr
+from meow_bank.core.money import Money
+from meow_bank.schemas.base import ORMBase
+
+
+class LedgerEntry(ORMBase):
+    id: str
+    created_at: datetime
+    from_account_id: UUIDStr | None
+    to_account_id: UUIDStr
+    amount: Money = Field(..., description="Signed change to the account balance")
+    balance: Money = Field(..., description="Account balance after this transfer")
@@ -1,17 +1,15 @@
 from datetime import datetime
 
-from pydantic import (
-    Field,
-    PositiveFloat,
-)
+from pydantic import Field
 
 from meow_bank.core.constants import UUIDStr
+from meow_bank.core.money import Money, PositiveMoney
 from meow_bank.schemas.base import ORMBase
 
 
 class TransferBase(ORMBase):
     to_account_id: UUIDStr
-    amount: PositiveFloat = Field(..., description="Transfer amount (must be positive)")
+    amount: PositiveMoney = Field(..., description="Transfer amount (must be positive)")
 
 
 class TransferCreate(TransferBase):
@@ -22,3 +20,42 @@ class TransferResponse(TransferBase):
     id: str
     from_account_id: UUIDStr | None
     created_at: datetime
+
+
+class TransferBatchCreate(ORMBase):
+    transfers: list[TransferCreate] = Field(
+        ..., min_length=1, description="Transfers to apply, in order"
+    )
+
+
+class TransferBatchItemResult(ORMBase):
+    index: int = Field(..., description="Position of the transfer in the request")
+    transfer: TransferResponse | None = None
+    error: str | None = None
+
+
+class TransferBatchResponse(ORMBase):
+    succeeded: int
+    failed: int
+    results: list[TransferBatchItemResult] = Field(default_factory=list)
+
+
+class TransferFeedEntry(TransferResponse):
+    seq: int = Field(..., description="Position of the transfer in the ledger")
+
+
+class TransferFeed(ORMBase):
+    transfers: list[TransferFeedEntry] = Field(
+        default_factory=list, description="Transfers after `after_seq`, in order"
+    )
+    last_seq: int = Field(
+        ..., description="Pass as `after_seq` to fetch the transfers that follow"
+    )
+
+
+class TransferEvent(ORMBase):
+    account_id: UUIDStr = Field(..., description="Account the event was sent to")
+    transfer: TransferFeedEntry
+    balance: Money = Field(
+        ..., description="Account balance once the transfer was committed"
+    )
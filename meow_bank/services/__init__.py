@@ -1,11 +1,18 @@
-from .account import AccountService
-from .balance import BalanceService
-from .customer import CustomerService
-from .transfer import TransferService
+from .account import AccountService, AsyncAccountService
+from .balance import AsyncBalanceService, BalanceService
+from .customer import AsyncCustomerService, CustomerService
+from .ledger import AsyncLedgerService, LedgerService
+from .transfer import AsyncTransferService, TransferService
 
 __all__ = [
     "AccountService",
+    "AsyncAccountService",
+    "AsyncBalanceService",
+    "AsyncCustomerService",
+    "AsyncLedgerService",
+    "AsyncTransferService",
     "BalanceService",
     "CustomerService",
+    "LedgerService",
     "TransferService",
 ]
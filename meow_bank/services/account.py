@@ -1,18 +1,27 @@
-from traceback import format_exc
+import uuid
+from datetime import datetime, timezone
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
 
-from meow_bank.api.exceptions import BusinessLogicError, ResourceNotFoundError
+from meow_bank.api.exceptions import (
+    BusinessLogicError,
+    ConflictError,
+    ResourceNotFoundError,
+)
+from meow_bank.core.config import settings
 from meow_bank.core.constants import UUIDStr
 from meow_bank.core.logging import log
-from meow_bank.db.models import Account, Customer
+from meow_bank.core.money import from_minor_units, to_minor_units
+from meow_bank.db.models import Account, Customer, Transfer, assign_ledger_seqs
 from meow_bank.schemas import (
     AccountCreate,
     AccountResponse,
     AccountWithTransfers,
 )
 from meow_bank.services.balance import BalanceService
+from meow_bank.services.base import AsyncService
+from meow_bank.services.idempotency import IdempotencyService
 from meow_bank.services.transfer import TransferService
 
 
@@ -21,47 +30,130 @@ class AccountService:
         self.db = db
         self.transfer_service = TransferService(db)
         self.balance_service = BalanceService(db)
+        self.idempotency_service = IdempotencyService(db)
+
+    def _create_account(self, account_data: AccountCreate) -> AccountResponse:
+        customer = self.db.get(Customer, account_data.customer_id)
+        if not customer:
+            raise ResourceNotFoundError("Customer not found")
+
+        account = Account(customer_id=account_data.customer_id)
+        self.db.add(account)
+        self.db.flush()
+
+        # Create initial deposit as a system transfer
+        if account_data.initial_deposit > 0:
+            self.transfer_service.create_system_transfer(
+                account.id,
+                to_minor_units(account_data.initial_deposit),
+            )
 
-    def create_account(self, account_data: AccountCreate) -> AccountResponse:
-        """Create a new account with an initial deposit."""
-        try:
-            customer = self.db.get(Customer, account_data.customer_id)
-            if not customer:
-                raise ResourceNotFoundError("Customer not found")
-
-            account = Account(customer_id=account_data.customer_id)
-            self.db.add(account)
-            self.db.flush()
-
-            # Create initial deposit as a system transfer
-            if account_data.initial_deposit > 0:
-                self.transfer_service.create_system_transfer(
-                    account.id,
-                    account_data.initial_deposit,
-                )
+        balance = self.balance_service.get_balance_by_account_id(account.id)
 
-            self.db.commit()
+        return AccountResponse(
+            id=account.id,
+            customer_id=account.customer_id,
+            created_at=account.created_at,
+            balance=from_minor_units(balance),
+        )
 
-            balance = self.balance_service.get_balance_by_account_id(account.id)
+    def create_account(
+        self, account_data: AccountCreate, idempotency_key: str | None = None
+    ) -> AccountResponse:
+        """Create a new account with an initial deposit.
 
-            return AccountResponse(
-                id=account.id,
-                customer_id=account.customer_id,
-                created_at=account.created_at,
-                balance=balance,
+        A retry carrying the same ``idempotency_key`` gets the original
+        response back instead of opening a second account.
+        """
+        try:
+            return self.idempotency_service.run_once(
+                "accounts",
+                idempotency_key,
+                account_data,
+                AccountResponse,
+                lambda: self._create_account(account_data),
             )
-        except ResourceNotFoundError:
+        except (ResourceNotFoundError, ConflictError):
             raise
         except Exception as e:
-            log.error(
+            log.exception(
                 "Failed to create account",
                 extra={
-                    "error": str(format_exc()),
                     "account_data": account_data.model_dump(),
                 },
             )
             raise BusinessLogicError(f"Failed to create account: {str(e)}") from e
 
+    def create_accounts_batch(
+        self, accounts_data: list[AccountCreate]
+    ) -> list[AccountResponse]:
+        """Open many accounts, with their initial deposits, in one transaction.
+
+        The customers are checked with a single query and the accounts and
+        their deposit transfers are written with one bulk insert each. New
+        accounts start from their deposit, so balances are returned without
+        reading them back. Nothing is created if any customer is unknown.
+        """
+        try:
+            customer_ids = {account.customer_id for account in accounts_data}
+            found = self.db.execute(
+                select(Customer.id).where(Customer.id.in_(customer_ids))
+            ).scalars()
+            missing = customer_ids.difference(found)
+            if missing:
+                raise ResourceNotFoundError(
+                    f"Customers not found: {', '.join(sorted(missing))}"
+                )
+
+            created_at = datetime.now(timezone.utc)
+            accounts = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "customer_id": account.customer_id,
+                    "balance": to_minor_units(account.initial_deposit),
+                    "created_at": created_at,
+                }
+                for account in accounts_data
+            ]
+            deposits = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "from_account_id": None,  # System account
+                    "to_account_id": account["id"],
+                    "amount": account["balance"],
+                    "created_at": created_at,
+                }
+                for account in accounts
+                if account["balance"] > 0
+            ]
+
+            self.db.execute(insert(Account), accounts)
+            if deposits:
+                assign_ledger_seqs(self.db.connection(), deposits)
+                self.db.execute(insert(Transfer), deposits)
+            self.db.commit()
+        except ResourceNotFoundError:
+            raise
+        except Exception as e:
+            log.exception(
+                "Failed to create account batch", extra={"size": len(accounts_data)}
+            )
+            raise BusinessLogicError(f"Failed to create accounts: {str(e)}") from e
+
+        log.info(
+            "Account batch created",
+            extra={"accounts": len(accounts), "deposits": len(deposits)},
+        )
+        return [
+            AccountResponse(
+                id=account["id"],
+                customer_id=account["customer_id"],
+                created_at=created_at,
+                balance=from_minor_units(account["balance"]),
+            )
+            for account in accounts
+        ]
+
     def get_account_by_id(self, account_id: UUIDStr) -> AccountResponse | None:
         """Get account details by ID."""
         account = self.db.get(Account, account_id)
@@ -73,35 +165,31 @@ class AccountService:
             id=account.id,
             customer_id=account.customer_id,
             created_at=account.created_at,
-            balance=balance,
+            balance=from_minor_units(balance),
         )
 
     def get_account_with_transfers_by_id(
-        self, account_id: UUIDStr
+        self,
+        account_id: UUIDStr,
+        limit: int = settings.TRANSFER_HISTORY_PAGE_SIZE,
+        cursor: UUIDStr | None = None,
     ) -> AccountWithTransfers | None:
-        """Get account details with transfer history."""
-
-        stmt = (
-            select(Account)
-            .options(
-                selectinload(Account.sent_transfers),
-                selectinload(Account.received_transfers),
-            )
-            .where(Account.id == account_id)
-        )
-        account = self.db.execute(stmt).scalars().first()
+        """Get account details with a page of its transfer history."""
+        account = self.db.get(Account, account_id)
         if not account:
             return None
 
-        balance = self.balance_service.get_balance_by_account_id(account_id)
+        transfers, next_cursor = self.transfer_service.get_transfer_history(
+            account_id, limit, cursor
+        )
 
         return AccountWithTransfers(
             id=account.id,
             customer_id=account.customer_id,
             created_at=account.created_at,
-            balance=balance,
-            sent_transfers=account.sent_transfers,
-            received_transfers=account.received_transfers,
+            balance=from_minor_units(account.balance),
+            transfers=transfers,
+            next_cursor=next_cursor,
         )
 
     def get_accounts_by_ids(self, account_ids: list[UUIDStr]) -> list[AccountResponse]:
@@ -121,7 +209,39 @@ class AccountService:
                 id=account.id,
                 customer_id=account.customer_id,
                 created_at=account.created_at,
-                balance=balance_map.get(account.id, 0),
+                balance=from_minor_units(balance_map.get(account.id, 0)),
             )
             for account in accounts
         ]
+
+
+class AsyncAccountService(AsyncService):
+    service_class = AccountService
+
+    async def create_account(
+        self, account_data: AccountCreate, idempotency_key: str | None = None
+    ) -> AccountResponse:
+        return await self._run("create_account", account_data, idempotency_key)
+
+    async def create_accounts_batch(
+        self, accounts_data: list[AccountCreate]
+    ) -> list[AccountResponse]:
+        return await self._run("create_accounts_batch", accounts_data)
+
+    async def get_account_by_id(self, account_id: UUIDStr) -> AccountResponse | None:
+        return await self._run("get_account_by_id", account_id)
+
+    async def get_account_with_transfers_by_id(
+        self,
+        account_id: UUIDStr,
+        limit: int = settings.TRANSFER_HISTORY_PAGE_SIZE,
+        cursor: UUIDStr | None = None,
+    ) -> AccountWithTransfers | None:
+        return await self._run(
+            "get_account_with_transfers_by_id", account_id, limit, cursor
+        )
+
+    async def get_accounts_by_ids(
+        self, account_ids: list[UUIDStr]
+    ) -> list[AccountResponse]:
+        return await self._run("get_accounts_by_ids", account_ids)
@@ -1,8 +1,71 @@
-from sqlalchemy import Column, func, select
-from sqlalchemy.orm import Session
+from collections.abc import Iterable
+from importlib import import_module
 
+from sqlalchemy import (
+    Column,
+    Select,
+    Subquery,
+    Update,
+    bindparam,
+    delete,
+    event,
+    func,
+    insert,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session, SessionTransaction
+
+from meow_bank.core.cache import CacheBackend, TTLCache
+from meow_bank.core.config import settings
 from meow_bank.core.constants import UUIDStr
-from meow_bank.db.models import Account, Transfer
+from meow_bank.core.metrics import metrics
+from meow_bank.db.database import on_commit
+from meow_bank.db.models import (
+    Account,
+    BalanceCheckpoint,
+    Transfer,
+    ledger_read_horizon,
+)
+from meow_bank.services.base import AsyncService
+
+balance_cache_requests = metrics.counter(
+    "meow_bank_balance_cache_requests_total",
+    "Balance lookups answered from the balance cache (hit) or the database (miss)",
+    labels=("outcome",),
+)
+
+
+def _build_balance_cache() -> CacheBackend[int] | None:
+    if settings.BALANCE_CACHE_BACKEND:
+        module, _, factory = settings.BALANCE_CACHE_BACKEND.partition(":")
+        return getattr(import_module(module), factory)()
+    if settings.BALANCE_CACHE_SIZE > 0:
+        return TTLCache(
+            settings.BALANCE_CACHE_SIZE,
+            settings.BALANCE_CACHE_TTL_SECONDS,
+            name="balance",
+        )
+    return None
+
+
+# Committed balances in minor units, keyed by account id; None when disabled.
+balance_cache = _build_balance_cache()
+
+
+class BalanceConflictError(Exception):
+    """An account was debited concurrently after its balance was read."""
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_uncommitted_balances(
+    session: Session, transaction: SessionTransaction
+) -> None:
+    # Whether the transaction committed or rolled back, the session's next
+    # one has changed no balances yet.
+    if transaction.parent is None:
+        session.info.pop("uncommitted_balances", None)
 
 
 class BalanceService:
@@ -10,47 +73,246 @@ class BalanceService:
         self.db = db
 
     def _aggregate_transfers_by_direction(
-        self, account_id: UUIDStr | list[UUIDStr], column: Column[UUIDStr]
-    ) -> float:
-        """Helper method to aggregate transfers by direction."""
-        if isinstance(account_id, list):
-            return (
-                select(
-                    column,
-                    func.sum(Transfer.amount).label("total"),
-                )
-                .filter(column.in_(account_id))
-                .group_by(column)
-                .subquery()
+        self,
+        account_ids: list[UUIDStr] | None,
+        column: Column[UUIDStr],
+        until_seq: int | None = None,
+    ) -> Subquery:
+        """Sum each account's transfers in one direction since its checkpoint.
+
+        Only transfers numbered after the account's balance checkpoint (or all
+        of them, if it has none) are replayed. ``until_seq`` caps the replay
+        window.
+        """
+        stmt = (
+            select(
+                column,
+                func.sum(Transfer.amount).label("total"),
             )
-        else:
-            return (
-                select(func.sum(Transfer.amount).label("total"))
-                .filter(column == account_id)
-                .scalar_subquery()
+            .outerjoin(BalanceCheckpoint, BalanceCheckpoint.account_id == column)
+            .filter(
+                column.is_not(None),
+                or_(
+                    BalanceCheckpoint.last_seq.is_(None),
+                    Transfer.seq > BalanceCheckpoint.last_seq,
+                ),
             )
-
-    def get_balance_by_account_id(self, account_id: UUIDStr) -> float:
-        """Calculate the current balance of an account."""
-        incoming = self._aggregate_transfers_by_direction(
-            account_id, Transfer.to_account_id
         )
+        if account_ids is not None:
+            stmt = stmt.filter(column.in_(account_ids))
+        if until_seq is not None:
+            stmt = stmt.filter(Transfer.seq <= until_seq)
+        return stmt.group_by(column).subquery()
 
-        outgoing = self._aggregate_transfers_by_direction(
-            account_id, Transfer.from_account_id
-        )
+    def _uncommitted_balances(self) -> set[UUIDStr]:
+        """Accounts whose balance this session has changed but not committed."""
+        return self.db.info.setdefault("uncommitted_balances", set())
+
+    def _invalidate_cached_balances(self, account_ids: Iterable[UUIDStr]) -> None:
+        """Drop the accounts from the balance cache once this transaction commits.
+
+        Until then the session reads their balances straight from the database,
+        so values it has not committed never reach the cache.
+        """
+        cache = balance_cache
+        if cache is None:
+            return
+        account_ids = set(account_ids)
+        self._uncommitted_balances().update(account_ids)
+        on_commit(self.db, lambda: cache.delete_many(account_ids))
+
+    def _load_balances(self, account_ids: list[UUIDStr]) -> dict[UUIDStr, int]:
+        stmt = select(Account.id, Account.balance).filter(Account.id.in_(account_ids))
+        balances = self.db.execute(stmt).all()
+        return {account_id: int(balance) for account_id, balance in balances}
 
-        stmt = select(func.coalesce(incoming, 0) - func.coalesce(outgoing, 0))
-        result = self.db.execute(stmt).scalar_one()
-        return float(result)
+    def get_balance_by_account_id(self, account_id: UUIDStr) -> int:
+        """Get the current balance of an account, in minor units."""
+        return self.get_balances_by_account_ids([account_id]).get(account_id, 0)
 
     def get_balances_by_account_ids(
         self, account_ids: list[UUIDStr]
-    ) -> dict[UUIDStr, float]:
-        """Get balances for multiple accounts in a single query."""
+    ) -> dict[UUIDStr, int]:
+        """Get balances for multiple accounts in a single query, in minor units.
+
+        Balances are read through the balance cache when it is enabled; only
+        the accounts it misses are queried.
+        """
         if not account_ids:
             return {}
 
+        cache = balance_cache
+        if cache is None:
+            return self._load_balances(account_ids)
+
+        uncommitted = self._uncommitted_balances()
+        cacheable = [a for a in account_ids if a not in uncommitted]
+        balances = cache.get_many(cacheable)
+        balance_cache_requests.inc(len(balances), outcome="hit")
+        balance_cache_requests.inc(len(cacheable) - len(balances), outcome="miss")
+
+        missing = [a for a in account_ids if a not in balances]
+        if missing:
+            loaded = self._load_balances(missing)
+            cache.set_many(
+                {a: balance for a, balance in loaded.items() if a not in uncommitted}
+            )
+            balances.update(loaded)
+        return balances
+
+    def get_account_states(
+        self, account_ids: list[UUIDStr], lock: bool = False
+    ) -> dict[UUIDStr, tuple[int, int]]:
+        """Read ``(balance, version)`` for each existing account in one query.
+
+        With ``lock`` the rows are locked with ``SELECT ... FOR UPDATE`` in id
+        order, so concurrent transfers touching the same accounts cannot
+        deadlock. Backends without row locks (SQLite) ignore it.
+        """
+        stmt = (
+            select(Account.id, Account.balance, Account.version)
+            .filter(Account.id.in_(account_ids))
+            .order_by(Account.id)
+        )
+        if lock:
+            stmt = stmt.with_for_update()
+        return {
+            account_id: (int(balance), version)
+            for account_id, balance, version in self.db.execute(stmt)
+        }
+
+    def _update_balance(self, stmt: Update) -> int | None:
+        """Run a single-account balance UPDATE; the new balance, if it matched."""
+        balance = self.db.execute(stmt.returning(Account.balance)).scalar()
+        return None if balance is None else int(balance)
+
+    def _debit(
+        self, account_id: UUIDStr, amount: int, expected_version: int | None
+    ) -> int:
+        """Take ``amount`` from an account and bump its version.
+
+        With ``expected_version`` the debit only applies if nobody else has
+        debited the account since it was read. Returns the new balance.
+        """
+        stmt = (
+            update(Account)
+            .where(Account.id == account_id)
+            .values(balance=Account.balance - amount, version=Account.version + 1)
+        )
+        if expected_version is not None:
+            stmt = stmt.where(Account.version == expected_version)
+        balance = self._update_balance(stmt)
+        if balance is None:
+            raise BalanceConflictError(account_id)
+        return balance
+
+    def debit_if_funded(self, account_id: UUIDStr, amount: int) -> int | None:
+        """Take ``amount`` from an account only if its balance covers it.
+
+        The funds check is part of the UPDATE, so it needs no prior read and
+        cannot race a concurrent debit. Returns the new balance, or None if
+        the account does not exist or is short of funds.
+        """
+        self._invalidate_cached_balances([account_id])
+        return self._update_balance(
+            update(Account)
+            .where(Account.id == account_id, Account.balance >= amount)
+            .values(balance=Account.balance - amount, version=Account.version + 1)
+        )
+
+    def credit(self, account_id: UUIDStr, amount: int) -> int | None:
+        """Add ``amount`` to an account.
+
+        Returns the new balance, or None if the account does not exist.
+        """
+        self._invalidate_cached_balances([account_id])
+        return self._update_balance(
+            update(Account)
+            .where(Account.id == account_id)
+            .values(balance=Account.balance + amount)
+        )
+
+    def apply_transfer(
+        self,
+        from_account_id: UUIDStr | None,
+        to_account_id: UUIDStr,
+        amount: int,
+        expected_version: int | None = None,
+    ) -> dict[UUIDStr, int]:
+        """Move ``amount`` minor units between the materialized account balances.
+
+        Must run in the same transaction as the matching Transfer insert so the
+        stored balances never diverge from the ledger. Raises
+        BalanceConflictError if ``expected_version`` no longer matches the
+        source account. Returns the accounts' new balances.
+        """
+        self._invalidate_cached_balances(
+            a for a in (from_account_id, to_account_id) if a is not None
+        )
+        balances = {}
+        if from_account_id is not None:
+            balances[from_account_id] = self._debit(
+                from_account_id, amount, expected_version
+            )
+        credited = self._update_balance(
+            update(Account)
+            .where(Account.id == to_account_id)
+            .values(balance=Account.balance + amount)
+        )
+        if credited is not None:
+            balances[to_account_id] = credited
+        return balances
+
+    def apply_balance_deltas(
+        self,
+        deltas: dict[UUIDStr, int],
+        expected_versions: dict[UUIDStr, int] | None = None,
+    ) -> None:
+        """Apply net balance changes for a batch of transfers.
+
+        Accounts with a net debit and an entry in ``expected_versions`` are
+        compare-and-swapped one by one; the other debits, and all net
+        credits, are applied in one executemany each.
+        """
+        self._invalidate_cached_balances(deltas)
+        debits = []
+        credits = []
+        for account_id, delta in deltas.items():
+            expected_version = (
+                expected_versions.get(account_id) if expected_versions else None
+            )
+            if delta < 0 and expected_version is not None:
+                self._debit(account_id, -delta, expected_version)
+            elif delta < 0:
+                debits.append({"account_id_": account_id, "delta_": delta})
+            elif delta > 0:
+                credits.append({"account_id_": account_id, "delta_": delta})
+
+        accounts = Account.__table__
+        if debits:
+            result = self.db.execute(
+                update(accounts)
+                .where(accounts.c.id == bindparam("account_id_"))
+                .values(
+                    balance=accounts.c.balance + bindparam("delta_"),
+                    version=accounts.c.version + 1,
+                ),
+                debits,
+            )
+            if result.rowcount != len(debits):
+                raise BalanceConflictError(
+                    f"{len(debits) - result.rowcount} debited account(s) not found"
+                )
+        if credits:
+            self.db.execute(
+                update(accounts)
+                .where(accounts.c.id == bindparam("account_id_"))
+                .values(balance=accounts.c.balance + bindparam("delta_")),
+                credits,
+            )
+
+    def _ledger_balances_query(self, account_ids: list[UUIDStr] | None) -> Select:
+        """``(id, balance, ledger_balance)`` of each account, in one statement."""
         incoming = self._aggregate_transfers_by_direction(
             account_ids, Transfer.to_account_id
         )
@@ -59,17 +321,150 @@ class BalanceService:
             account_ids, Transfer.from_account_id
         )
 
+        ledger_balance = (
+            func.coalesce(BalanceCheckpoint.balance, 0)
+            + func.coalesce(incoming.c.total, 0)
+            - func.coalesce(outgoing.c.total, 0)
+        ).label("ledger_balance")
+        stmt = (
+            select(Account.id, Account.balance, ledger_balance)
+            .outerjoin(BalanceCheckpoint, Account.id == BalanceCheckpoint.account_id)
+            .outerjoin(incoming, Account.id == incoming.c.to_account_id)
+            .outerjoin(outgoing, Account.id == outgoing.c.from_account_id)
+        )
+        if account_ids is not None:
+            stmt = stmt.filter(Account.id.in_(account_ids))
+        return stmt
+
+    def get_ledger_balances(
+        self, account_ids: list[UUIDStr] | None = None
+    ) -> dict[UUIDStr, int]:
+        """Recompute balances from the transfers ledger, in minor units.
+
+        This is the authoritative path used for reconciliation: each balance is
+        the account's checkpoint plus the transfers numbered after it. Pass
+        ``None`` to recompute every account.
+        """
+        rows = self.db.execute(self._ledger_balances_query(account_ids))
+        return {account_id: int(ledger) for account_id, _, ledger in rows}
+
+    def roll_forward_checkpoints(self) -> int:
+        """Advance balance checkpoints over the transfers settled since the last run.
+
+        Checkpoints stop at the ledger's read horizon, up to which every
+        transfer has committed or rolled back, whatever its ``created_at``. Only
+        accounts with new transfers (or no checkpoint yet) are written.
+        Returns the number of checkpoints created or updated.
+        """
+        horizon = ledger_read_horizon(self.db.connection())
+        if horizon == 0:
+            return 0
+
+        incoming = self._aggregate_transfers_by_direction(
+            None, Transfer.to_account_id, until_seq=horizon
+        )
+        outgoing = self._aggregate_transfers_by_direction(
+            None, Transfer.from_account_id, until_seq=horizon
+        )
+
         stmt = (
             select(
                 Account.id,
+                BalanceCheckpoint.balance,
                 (
                     func.coalesce(incoming.c.total, 0)
                     - func.coalesce(outgoing.c.total, 0)
-                ).label("balance"),
+                ).label("delta"),
             )
+            .outerjoin(BalanceCheckpoint, Account.id == BalanceCheckpoint.account_id)
             .outerjoin(incoming, Account.id == incoming.c.to_account_id)
             .outerjoin(outgoing, Account.id == outgoing.c.from_account_id)
-            .filter(Account.id.in_(account_ids))
+            .filter(
+                or_(
+                    BalanceCheckpoint.account_id.is_(None),
+                    incoming.c.total.is_not(None),
+                    outgoing.c.total.is_not(None),
+                )
+            )
         )
-        balances = self.db.execute(stmt).all()
-        return {account_id: float(balance) for account_id, balance in balances}
+
+        created, updated = [], []
+        for account_id, checkpoint_balance, delta in self.db.execute(stmt):
+            row = {
+                "account_id": account_id,
+                "balance": int(checkpoint_balance or 0) + int(delta),
+                "last_seq": horizon,
+            }
+            (created if checkpoint_balance is None else updated).append(row)
+
+        if created:
+            self.db.execute(insert(BalanceCheckpoint), created)
+        if updated:
+            self.db.execute(update(BalanceCheckpoint), updated)
+        return len(created) + len(updated)
+
+    def rebuild_checkpoints(self) -> int:
+        """Discard every checkpoint and rebuild them from the full ledger."""
+        self.db.execute(delete(BalanceCheckpoint))
+        return self.roll_forward_checkpoints()
+
+    def find_balance_drift(
+        self, account_ids: list[UUIDStr] | None = None
+    ) -> list[tuple[UUIDStr, int, int]]:
+        """Compare stored balances with the ledger.
+
+        Returns ``(account_id, stored_balance, ledger_balance)`` for every
+        account (or every one of ``account_ids``) whose materialized balance
+        has drifted. Both sides are read by one statement, so they come from
+        the same snapshot of the database.
+        """
+        stmt = self._ledger_balances_query(account_ids)
+        ledger_balance = stmt.selected_columns.ledger_balance
+        drifted = self.db.execute(stmt.filter(Account.balance != ledger_balance))
+        return [
+            (account_id, int(balance), int(ledger))
+            for account_id, balance, ledger in drifted
+        ]
+
+    def fix_balance_drift(
+        self, drift: list[tuple[UUIDStr, int, int]]
+    ) -> list[tuple[UUIDStr, int, int]]:
+        """Bring the drifted accounts' balances back in line with the ledger.
+
+        ``drift`` only says which accounts to look at. They are locked with
+        ``SELECT ... FOR UPDATE`` and their drift is measured again under the
+        lock, so a transfer committed since the drift was reported is not
+        undone. Each balance is then moved by its difference from the ledger.
+        Returns the drift that was corrected.
+        """
+        account_ids = [account_id for account_id, _, _ in drift]
+        if not account_ids:
+            return []
+        self.get_account_states(account_ids, lock=True)
+        corrected = self.find_balance_drift(account_ids)
+
+        self._invalidate_cached_balances(account_id for account_id, _, _ in corrected)
+        for account_id, stored, ledger in corrected:
+            self.db.execute(
+                update(Account)
+                .where(Account.id == account_id)
+                .values(balance=Account.balance + (ledger - stored))
+            )
+        return corrected
+
+
+class AsyncBalanceService(AsyncService):
+    service_class = BalanceService
+
+    async def get_balance_by_account_id(self, account_id: UUIDStr) -> int:
+        return await self._run("get_balance_by_account_id", account_id)
+
+    async def get_balances_by_account_ids(
+        self, account_ids: list[UUIDStr]
+    ) -> dict[UUIDStr, int]:
+        return await self._run("get_balances_by_account_ids", account_ids)
+
+    async def get_ledger_balances(
+        self, account_ids: list[UUIDStr] | None = None
+    ) -> dict[UUIDStr, int]:
+        return await self._run("get_ledger_balances", account_ids)
@@ -0,0 +1,38 @@
+from collections.abc import Callable
+from typing import Any, ClassVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from meow_bank.db.database import DBSession
+
+
+class AsyncService:
+    """Awaitable facade over one of the sync services.
+
+    With an ``AsyncSession`` the sync service runs through
+    ``AsyncSession.run_sync``, so waiting on the database yields to the event
+    loop instead of holding a worker thread. With a plain ``Session`` it runs
+    in the threadpool, exactly as the sync route handlers used to.
+    """
+
+    service_class: ClassVar[Callable[[Session], Any]]
+
+    def __init__(self, db: DBSession):
+        self.db = db
+
+    async def _run(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        def call(session: Session) -> Any:
+            return getattr(self.service_class(session), method)(*args, **kwargs)
+
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(call)
+        return await run_in_threadpool(call, self.db)
+
+    async def close(self) -> None:
+        """End the session's transaction and hand its connection back to the pool."""
+        if isinstance(self.db, AsyncSession):
+            await self.db.close()
+        else:
+            await run_in_threadpool(self.db.close)
@@ -1,16 +1,18 @@
-from traceback import format_exc
-
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from meow_bank.core.constants import UUIDStr
 from meow_bank.core.logging import log
+from meow_bank.core.money import from_minor_units
 from meow_bank.db.models import Account, Customer
 from meow_bank.schemas import (
+    AccountResponse,
     CustomerCreate,
     CustomerResponse,
     CustomerWithAccountIds,
+    CustomerWithAccounts,
 )
+from meow_bank.services.base import AsyncService
 
 
 class CustomerService:
@@ -31,10 +33,9 @@ class CustomerService:
                 created_at=customer.created_at,
             )
         except Exception as e:
-            log.error(
+            log.exception(
                 "Failed to create customer",
                 extra={
-                    "error": str(format_exc()),
                     "customer_data": customer_data.model_dump(),
                 },
             )
@@ -55,3 +56,73 @@ class CustomerService:
             created_at=customer.created_at,
             account_ids=account_ids,
         )
+
+    def get_customers_with_accounts(
+        self, customer_ids: list[UUIDStr]
+    ) -> list[CustomerWithAccounts]:
+        """Get customers with their accounts and balances in a single query.
+
+        Customers are returned in the order requested; unknown ids are skipped.
+        """
+        if not customer_ids:
+            return []
+
+        stmt = (
+            select(
+                Customer.id,
+                Customer.name,
+                Customer.created_at,
+                Account.id.label("account_id"),
+                Account.created_at.label("account_created_at"),
+                Account.balance,
+            )
+            .outerjoin(Account, Account.customer_id == Customer.id)
+            .filter(Customer.id.in_(customer_ids))
+            .order_by(Account.created_at.desc())
+        )
+
+        customers: dict[UUIDStr, CustomerWithAccounts] = {}
+        for row in self.db.execute(stmt):
+            customer = customers.get(row.id)
+            if customer is None:
+                customer = customers[row.id] = CustomerWithAccounts(
+                    id=row.id, name=row.name, created_at=row.created_at
+                )
+            if row.account_id is not None:
+                customer.accounts.append(
+                    AccountResponse(
+                        id=row.account_id,
+                        customer_id=row.id,
+                        created_at=row.account_created_at,
+                        balance=from_minor_units(row.balance),
+                    )
+                )
+
+        return [customers[c] for c in dict.fromkeys(customer_ids) if c in customers]
+
+    def get_customer_with_accounts(
+        self, customer_id: UUIDStr
+    ) -> CustomerWithAccounts | None:
+        """Get customer details with their accounts and balances."""
+        customers = self.get_customers_with_accounts([customer_id])
+        return customers[0] if customers else None
+
+
+class AsyncCustomerService(AsyncService):
+    service_class = CustomerService
+
+    async def create_customer(self, customer_data: CustomerCreate) -> CustomerResponse:
+        return await self._run("create_customer", customer_data)
+
+    async def get_customer(self, customer_id: UUIDStr) -> CustomerWithAccountIds | None:
+        return await self._run("get_customer", customer_id)
+
+    async def get_customer_with_accounts(
+        self, customer_id: UUIDStr
+    ) -> CustomerWithAccounts | None:
+        return await self._run("get_customer_with_accounts", customer_id)
+
+    async def get_customers_with_accounts(
+        self, customer_ids: list[UUIDStr]
+    ) -> list[CustomerWithAccounts]:
+        return await self._run("get_customers_with_accounts", customer_ids)
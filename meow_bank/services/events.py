@@ -0,0 +1,125 @@
+from collections.abc import AsyncIterator, Iterable
+from importlib import import_module
+
+from sqlalchemy.orm import Session
+
+from meow_bank.core.config import settings
+from meow_bank.core.constants import UUIDStr
+from meow_bank.core.events import EventHub, Subscription
+from meow_bank.core.logging import log
+from meow_bank.core.money import from_minor_units
+from meow_bank.db.database import on_commit
+from meow_bank.db.models import Transfer
+from meow_bank.schemas import AccountResponse, TransferEvent, TransferFeedEntry
+from meow_bank.services.balance import BalanceService
+
+
+def _build_event_hub() -> EventHub:
+    backend = None
+    if settings.EVENTS_BACKEND:
+        module, _, factory = settings.EVENTS_BACKEND.partition(":")
+        backend = getattr(import_module(module), factory)()
+    return EventHub(backend, queue_size=settings.EVENTS_QUEUE_SIZE)
+
+
+# Carries new transfers to the clients following GET /api/accounts/{id}/events.
+event_hub = _build_event_hub()
+
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+
+def account_channel(account_id: UUIDStr) -> str:
+    return f"account:{account_id}"
+
+
+def publish_transfers_on_commit(
+    db: Session,
+    transfers: Iterable[Transfer],
+    balances: dict[UUIDStr, int] | None = None,
+) -> None:
+    """Announce ``transfers`` to their accounts' subscribers once ``db`` commits.
+
+    ``balances`` are the accounts' balances as this transaction leaves them,
+    as returned by the balance UPDATEs. Any account missing from it has its
+    balance read after the commit, and only if its channel has subscribers by
+    then, so transfers nobody follows cost no extra query; a balance read
+    that late may already include transfers committed since. Only the events
+    for channels that have subscribers after the commit are encoded and sent.
+    """
+    entries = [
+        TransferFeedEntry(
+            id=transfer.id,
+            from_account_id=transfer.from_account_id,
+            to_account_id=transfer.to_account_id,
+            amount=from_minor_units(transfer.amount),
+            created_at=transfer.created_at,
+            seq=transfer.seq,
+        )
+        for transfer in transfers
+    ]
+    balances = dict(balances or {})
+    bind = db.get_bind()
+
+    def publish() -> None:
+        # The transfers are already committed, so a failing backend only
+        # costs their events.
+        try:
+            subscribed = {
+                account_id
+                for entry in entries
+                for account_id in (entry.from_account_id, entry.to_account_id)
+                if account_id is not None
+                and event_hub.has_subscribers([account_channel(account_id)])
+            }
+            if missing := sorted(subscribed - balances.keys()):
+                with Session(bind) as reader:
+                    balances.update(
+                        BalanceService(reader).get_balances_by_account_ids(missing)
+                    )
+            for entry in entries:
+                for account_id in (entry.from_account_id, entry.to_account_id):
+                    if account_id not in subscribed or account_id not in balances:
+                        continue
+                    event = TransferEvent(
+                        account_id=account_id,
+                        transfer=entry,
+                        balance=from_minor_units(balances[account_id]),
+                    )
+                    event_hub.publish(
+                        account_channel(account_id), event.model_dump_json()
+                    )
+        except Exception:
+            log.exception("Failed to publish transfer events")
+
+    on_commit(db, publish)
+
+
+def _sse_message(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def encode_account_events(
+    subscription: Subscription, account: AccountResponse
+) -> AsyncIterator[str]:
+    """Render an account's events as a server-sent event stream.
+
+    The stream opens with an ``account`` event carrying the account as it was
+    when the subscription started, then sends a ``transfer`` event for each
+    transfer committed after that. Idle streams get a comment every
+    ``EVENTS_KEEPALIVE_SECONDS`` so proxies keep them open. The stream ends
+    if the client falls too far behind; reconnecting starts it afresh.
+    """
+    try:
+        yield _sse_message("account", account.model_dump_json())
+        while True:
+            try:
+                message = await subscription.get(settings.EVENTS_KEEPALIVE_SECONDS)
+            except StopAsyncIteration:
+                return
+            if message is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield _sse_message("transfer", message)
+    finally:
+        subscription.close()
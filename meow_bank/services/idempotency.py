@@ -0,0 +1,131 @@
+import hashlib
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from meow_bank.api.exceptions import ConflictError
+from meow_bank.core.cache import TTLCache
+from meow_bank.core.config import settings
+from meow_bank.db.models import IdempotencyKey
+
+M = TypeVar("M", bound=BaseModel)
+
+# (scope, key) -> (request_hash, response JSON) of recently committed requests,
+# so hot retries are answered without a database round trip.
+_recent_responses: TTLCache[tuple[str, str]] = TTLCache(
+    settings.IDEMPOTENCY_CACHE_SIZE,
+    settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+    name="idempotency",
+)
+
+
+def _request_hash(request: BaseModel) -> str:
+    return hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+
+
+class IdempotencyService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _stored_response(self, scope: str, key: str, request_hash: str) -> str | None:
+        """Response JSON stored for ``key``, or None if it is new or expired.
+
+        Raises ConflictError if the key was used for a different request.
+        """
+        stored = _recent_responses.get((scope, key))
+        if stored is None:
+            row = self.db.execute(
+                select(IdempotencyKey.request_hash, IdempotencyKey.response).where(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.expires_at > datetime.now(timezone.utc),
+                )
+            ).first()
+            if row is None:
+                return None
+            stored = (row.request_hash, row.response)
+
+        stored_hash, response = stored
+        if stored_hash != request_hash:
+            raise ConflictError(
+                "Idempotency-Key was already used for a different request"
+            )
+        return response
+
+    def _record(self, scope: str, key: str, request_hash: str, response: str) -> None:
+        """Store the response in the current transaction, replacing an expired key."""
+        now = datetime.now(timezone.utc)
+        self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at <= now,
+            )
+        )
+        self.db.add(
+            IdempotencyKey(
+                scope=scope,
+                key=key,
+                request_hash=request_hash,
+                response=response,
+                expires_at=now
+                + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+            )
+        )
+
+    def run_once(
+        self,
+        scope: str,
+        key: str | None,
+        request: BaseModel,
+        response_model: type[M],
+        operation: Callable[[], M],
+    ) -> M:
+        """Run ``operation`` and commit, at most once per idempotency ``key``.
+
+        ``operation`` must leave its changes uncommitted: the stored response
+        is written in the same transaction, so a request and its key are
+        committed together or not at all. A repeated key replays the stored
+        response without running ``operation`` again. Without a key the
+        operation simply runs and commits.
+        """
+        if key is None:
+            response = operation()
+            self.db.commit()
+            return response
+
+        request_hash = _request_hash(request)
+        stored = self._stored_response(scope, key, request_hash)
+        if stored is not None:
+            return response_model.model_validate_json(stored)
+
+        response = operation()
+        response_json = response.model_dump_json()
+        self._record(scope, key, request_hash, response_json)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # A concurrent request with the same key committed first; undo
+            # ours and answer with its response.
+            self.db.rollback()
+            stored = self._stored_response(scope, key, request_hash)
+            if stored is None:
+                raise
+            return response_model.model_validate_json(stored)
+
+        _recent_responses.set((scope, key), (request_hash, response_json))
+        return response
+
+    def purge_expired(self) -> int:
+        """Delete expired keys and return how many were removed."""
+        result = self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.expires_at <= datetime.now(timezone.utc)
+            )
+        )
+        return result.rowcount
@@ -0,0 +1,116 @@
+import csv
+import io
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import Literal
+
+from sqlalchemy import Row, Select, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import iterate_in_threadpool
+
+from meow_bank.core.config import settings
+from meow_bank.core.constants import UUIDStr
+from meow_bank.core.money import from_minor_units
+from meow_bank.db.models import Transfer
+from meow_bank.schemas import LedgerEntry
+from meow_bank.services.base import AsyncService
+
+LedgerFormat = Literal["ndjson", "csv"]
+
+LEDGER_MEDIA_TYPES: dict[LedgerFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _ledger_query(account_id: UUIDStr) -> Select:
+    """Every transfer touching an account, in ledger order, as plain rows."""
+    return (
+        select(
+            Transfer.id,
+            Transfer.created_at,
+            Transfer.from_account_id,
+            Transfer.to_account_id,
+            Transfer.amount,
+        )
+        .where(
+            or_(
+                Transfer.from_account_id == account_id,
+                Transfer.to_account_id == account_id,
+            )
+        )
+        .order_by(Transfer.seq)
+        .execution_options(yield_per=settings.LEDGER_EXPORT_BATCH_SIZE)
+    )
+
+
+class _RunningBalance:
+    """Turns ledger rows into entries carrying the balance after each one."""
+
+    def __init__(self, account_id: UUIDStr):
+        self.account_id = account_id
+        self.balance = 0
+
+    def entry(self, row: Row) -> LedgerEntry:
+        amount = -row.amount if row.from_account_id == self.account_id else row.amount
+        self.balance += amount
+        return LedgerEntry(
+            id=row.id,
+            created_at=row.created_at,
+            from_account_id=row.from_account_id,
+            to_account_id=row.to_account_id,
+            amount=from_minor_units(amount),
+            balance=from_minor_units(self.balance),
+        )
+
+
+class LedgerService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def iter_ledger(self, account_id: UUIDStr) -> Iterator[LedgerEntry]:
+        """Stream an account's full ledger with a running balance.
+
+        Rows are fetched ``LEDGER_EXPORT_BATCH_SIZE`` at a time through a
+        server-side cursor, so memory use does not grow with the history.
+        """
+        running = _RunningBalance(account_id)
+        for row in self.db.execute(_ledger_query(account_id)):
+            yield running.entry(row)
+
+
+class AsyncLedgerService(AsyncService):
+    service_class = LedgerService
+
+    async def iter_ledger(self, account_id: UUIDStr) -> AsyncIterator[LedgerEntry]:
+        if not isinstance(self.db, AsyncSession):
+            async for entry in iterate_in_threadpool(
+                LedgerService(self.db).iter_ledger(account_id)
+            ):
+                yield entry
+            return
+
+        running = _RunningBalance(account_id)
+        result = await self.db.stream(_ledger_query(account_id))
+        async for row in result:
+            yield running.entry(row)
+
+
+def _csv_line(values: Iterable) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+async def encode_ledger(
+    entries: AsyncIterator[LedgerEntry], fmt: LedgerFormat
+) -> AsyncIterator[str]:
+    """Render ledger entries as NDJSON or CSV (with a header), one line at a time."""
+    if fmt == "csv":
+        yield _csv_line(LedgerEntry.model_fields)
+        async for entry in entries:
+            yield _csv_line(entry.model_dump().values())
+        return
+
+    async for entry in entries:
+        yield entry.model_dump_json() + "\n"
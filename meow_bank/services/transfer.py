@@ -1,89 +1,410 @@
-from traceback import format_exc
+import uuid
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from typing import TypeVar
 
-from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from sqlalchemy import Row, Select, insert, select, union_all
+from sqlalchemy.exc import StatementError
+from sqlalchemy.orm import InstrumentedAttribute, Session
 
 from meow_bank.api.exceptions import (
     BusinessLogicError,
+    ConflictError,
     ResourceNotFoundError,
     ValidationError,
 )
+from meow_bank.core.config import settings
 from meow_bank.core.constants import UUIDStr
 from meow_bank.core.logging import log
-from meow_bank.db.models import Account, Transfer
-from meow_bank.schemas import TransferCreate, TransferResponse
-from meow_bank.services.balance import BalanceService
+from meow_bank.core.metrics import metrics
+from meow_bank.core.money import from_minor_units, to_minor_units
+from meow_bank.db.database import is_transient_error
+from meow_bank.db.models import Transfer, assign_ledger_seqs, ledger_read_horizon
+from meow_bank.schemas import (
+    TransferBatchItemResult,
+    TransferBatchResponse,
+    TransferCreate,
+    TransferFeed,
+    TransferFeedEntry,
+    TransferResponse,
+)
+from meow_bank.services.balance import BalanceConflictError, BalanceService
+from meow_bank.services.base import AsyncService
+from meow_bank.services.events import publish_transfers_on_commit
+from meow_bank.services.idempotency import IdempotencyService
+
+T = TypeVar("T")
+
+transfer_conflicts = metrics.counter(
+    "meow_bank_transfer_conflicts_total",
+    "Transfers that lost a concurrent debit of the same account",
+    labels=("mode", "outcome"),
+)
+
+
+def to_transfer_response(transfer: Transfer) -> TransferResponse:
+    """Build the API representation of a stored transfer."""
+    return TransferResponse(
+        id=transfer.id,
+        from_account_id=transfer.from_account_id,
+        to_account_id=transfer.to_account_id,
+        amount=from_minor_units(transfer.amount),
+        created_at=transfer.created_at,
+    )
+
+
+# Columns read by to_transfer_responses, in order.
+TRANSFER_COLUMNS = (
+    Transfer.id,
+    Transfer.from_account_id,
+    Transfer.to_account_id,
+    Transfer.amount,
+    Transfer.created_at,
+)
+
+_transfer_list = TypeAdapter(list[TransferResponse])
+_transfer_feed_entries = TypeAdapter(list[TransferFeedEntry])
+
+
+def to_transfer_responses(rows: Iterable[Row]) -> list[TransferResponse]:
+    """Build the API representation of many ``TRANSFER_COLUMNS`` rows.
+
+    Plain rows skip ORM object loading, and the whole list is validated in
+    one call into pydantic-core rather than constructing each model in Python,
+    which is most of the cost of a large history page.
+    """
+    return _transfer_list.validate_python(
+        [
+            {
+                "id": transfer_id,
+                "from_account_id": from_account_id,
+                "to_account_id": to_account_id,
+                "amount": from_minor_units(amount),
+                "created_at": created_at,
+            }
+            for transfer_id, from_account_id, to_account_id, amount, created_at in rows
+        ]
+    )
 
 
 class TransferService:
     def __init__(self, db: Session):
         self.db = db
         self.balance_service = BalanceService(db)
+        self.idempotency_service = IdempotencyService(db)
 
-    def create_transfer(self, transfer_data: TransferCreate) -> TransferResponse:
-        """Create a new transfer between accounts."""
-        try:
-            with self.db.begin_nested():
-                source_account = self.db.get(Account, transfer_data.from_account_id)
-                if not source_account:
+    def _with_retries(self, operation: Callable[[], T]) -> T:
+        """Run ``operation`` in a savepoint, retrying if it loses a race.
+
+        A lost debit race only undoes the savepoint. A lock or serialization
+        error from the database rolls back the whole transaction, so
+        ``operation`` must be the first write of it. SQLite transactions are
+        begun with ``BEGIN IMMEDIATE``, taking the write lock before the first
+        read, in pessimistic mode and when retrying after such an error.
+        """
+        lock_up_front = settings.TRANSFER_CONCURRENCY_MODE == "pessimistic"
+        for attempt in range(settings.TRANSFER_MAX_RETRIES + 1):
+            if lock_up_front and not self.db.in_transaction():
+                self.db.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+            try:
+                with self.db.begin_nested():
+                    return operation()
+            except BalanceConflictError:
+                pass
+            except StatementError as e:
+                if not is_transient_error(e):
+                    raise
+                self.db.rollback()
+                lock_up_front = True
+            transfer_conflicts.inc(
+                mode=settings.TRANSFER_CONCURRENCY_MODE,
+                outcome=(
+                    "retried"
+                    if attempt < settings.TRANSFER_MAX_RETRIES
+                    else "exhausted"
+                ),
+            )
+        raise ConflictError("Account is busy, please retry the transfer")
+
+    def _lock_accounts(
+        self, account_ids: list[UUIDStr]
+    ) -> dict[UUIDStr, tuple[int, int]]:
+        """Read account balances and versions under the configured concurrency mode."""
+        return self.balance_service.get_account_states(
+            account_ids, lock=settings.TRANSFER_CONCURRENCY_MODE == "pessimistic"
+        )
+
+    def _expected_version(self, version: int) -> int | None:
+        """Version to compare-and-swap against, or None when rows are locked."""
+        if settings.TRANSFER_CONCURRENCY_MODE == "pessimistic":
+            return None
+        return version
+
+    def _apply_guarded_transfer(
+        self, transfer_data: TransferCreate, amount: int
+    ) -> tuple[Transfer, dict[UUIDStr, int]]:
+        """Apply a transfer whose funds check is done by the debit itself.
+
+        No account is read up front: the debit only matches a funded sender
+        and the credit only matches an existing recipient, and both return the
+        new balances. A successful transfer costs the two UPDATEs, numbering
+        it (the ledger_sequence UPDATE on SQLite, the advisory lock and
+        ``nextval`` on Postgres) and the INSERT. Accounts are updated in id
+        order so opposing transfers cannot deadlock; on failure the caller's
+        savepoint undoes whichever update already ran.
+        """
+        from_account_id = transfer_data.from_account_id
+        to_account_id = transfer_data.to_account_id
+
+        def sender_exists() -> bool:
+            # Only failures pay for a read, to report the right error.
+            return bool(self.balance_service.get_account_states([from_account_id]))
+
+        if from_account_id == to_account_id:
+            if not sender_exists():
+                raise ResourceNotFoundError("Sender account not found")
+            raise ValidationError("Cannot transfer to the same account")
+
+        credit_first = to_account_id < from_account_id
+        if credit_first:
+            credited = self.balance_service.credit(to_account_id, amount)
+            if credited is None:
+                if not sender_exists():
                     raise ResourceNotFoundError("Sender account not found")
+                raise ResourceNotFoundError("Recipient account not found")
 
-                if transfer_data.from_account_id == transfer_data.to_account_id:
-                    raise ValidationError("Cannot transfer to the same account")
+        debited = self.balance_service.debit_if_funded(from_account_id, amount)
+        if debited is None:
+            if not sender_exists():
+                raise ResourceNotFoundError("Sender account not found")
+            raise BusinessLogicError("Insufficient funds")
 
-                dest_account = self.db.get(Account, transfer_data.to_account_id)
-                if not dest_account:
-                    raise ResourceNotFoundError("Recipient account not found")
+        if not credit_first:
+            credited = self.balance_service.credit(to_account_id, amount)
+            if credited is None:
+                raise ResourceNotFoundError("Recipient account not found")
 
-                source_balance = self.balance_service.get_balance_by_account_id(
-                    transfer_data.from_account_id
-                )
+        transfer = Transfer(
+            from_account_id=from_account_id,
+            to_account_id=to_account_id,
+            amount=amount,
+        )
+        self.db.add(transfer)
+        self.db.flush()
+        return transfer, {from_account_id: debited, to_account_id: credited}
 
-                if source_balance < transfer_data.amount:
-                    raise BusinessLogicError("Insufficient funds")
+    def _apply_transfer(
+        self, transfer_data: TransferCreate, amount: int
+    ) -> tuple[Transfer, dict[UUIDStr, int]]:
+        if settings.TRANSFER_CONCURRENCY_MODE == "guarded":
+            return self._apply_guarded_transfer(transfer_data, amount)
 
-                transfer = Transfer(
-                    from_account_id=transfer_data.from_account_id,
-                    to_account_id=transfer_data.to_account_id,
-                    amount=transfer_data.amount,
-                )
-                self.db.add(transfer)
-                self.db.flush()
-
-                log.info(
-                    "Transfer created",
-                    extra={
-                        "transfer_id": transfer.id,
-                        "from_account_id": transfer.from_account_id,
-                        "to_account_id": transfer.to_account_id,
-                        "amount": transfer.amount,
-                    },
-                )
+        accounts = self._lock_accounts(
+            [transfer_data.from_account_id, transfer_data.to_account_id]
+        )
+        if transfer_data.from_account_id not in accounts:
+            raise ResourceNotFoundError("Sender account not found")
 
-                return TransferResponse(
-                    id=transfer.id,
-                    from_account_id=transfer.from_account_id,
-                    to_account_id=transfer.to_account_id,
-                    amount=transfer.amount,
-                    created_at=transfer.created_at,
-                )
-        except (ValidationError, ResourceNotFoundError, BusinessLogicError):
+        if transfer_data.from_account_id == transfer_data.to_account_id:
+            raise ValidationError("Cannot transfer to the same account")
+
+        if transfer_data.to_account_id not in accounts:
+            raise ResourceNotFoundError("Recipient account not found")
+
+        source_balance, source_version = accounts[transfer_data.from_account_id]
+        if source_balance < amount:
+            raise BusinessLogicError("Insufficient funds")
+
+        transfer = Transfer(
+            from_account_id=transfer_data.from_account_id,
+            to_account_id=transfer_data.to_account_id,
+            amount=amount,
+        )
+        self.db.add(transfer)
+        self.db.flush()
+
+        balances = self.balance_service.apply_transfer(
+            transfer.from_account_id,
+            transfer.to_account_id,
+            transfer.amount,
+            expected_version=self._expected_version(source_version),
+        )
+        return transfer, balances
+
+    def _create_transfer(
+        self, transfer_data: TransferCreate, amount: int
+    ) -> TransferResponse:
+        transfer, balances = self._with_retries(
+            lambda: self._apply_transfer(transfer_data, amount)
+        )
+        publish_transfers_on_commit(self.db, [transfer], balances)
+
+        log.info(
+            "Transfer created",
+            extra={
+                "transfer_id": transfer.id,
+                "from_account_id": transfer.from_account_id,
+                "to_account_id": transfer.to_account_id,
+                "amount": transfer.amount,
+            },
+        )
+
+        return to_transfer_response(transfer)
+
+    def create_transfer(
+        self, transfer_data: TransferCreate, idempotency_key: str | None = None
+    ) -> TransferResponse:
+        """Create a new transfer between accounts.
+
+        A retry carrying the same ``idempotency_key`` gets the original
+        response back instead of moving the money twice.
+        """
+        amount = to_minor_units(transfer_data.amount)
+        try:
+            return self.idempotency_service.run_once(
+                "transfers",
+                idempotency_key,
+                transfer_data,
+                TransferResponse,
+                lambda: self._create_transfer(transfer_data, amount),
+            )
+        except (
+            ValidationError,
+            ResourceNotFoundError,
+            BusinessLogicError,
+            ConflictError,
+        ):
             raise
         except Exception as e:
-            log.error(
+            log.exception(
                 "Failed to create transfer",
                 extra={
-                    "error": str(format_exc()),
                     "from_account_id": transfer_data.from_account_id,
                     "to_account_id": transfer_data.to_account_id,
-                    "amount": transfer_data.amount,
+                    "amount": amount,
                 },
             )
             raise BusinessLogicError(f"Failed to create transfer: {str(e)}") from e
 
+    def _apply_batch(
+        self, transfers: list[TransferCreate]
+    ) -> tuple[dict[int, TransferResponse], dict[int, HTTPException]]:
+        account_ids = {t.from_account_id for t in transfers} | {
+            t.to_account_id for t in transfers
+        }
+        accounts = self._lock_accounts(list(account_ids))
+        balances = {account_id: state[0] for account_id, state in accounts.items()}
+
+        errors: dict[int, HTTPException] = {}
+        accepted: list[tuple[int, dict]] = []
+        deltas: dict[UUIDStr, int] = defaultdict(int)
+        for index, transfer_data in enumerate(transfers):
+            amount = to_minor_units(transfer_data.amount)
+            if transfer_data.from_account_id not in balances:
+                errors[index] = ResourceNotFoundError("Sender account not found")
+            elif transfer_data.from_account_id == transfer_data.to_account_id:
+                errors[index] = ValidationError("Cannot transfer to the same account")
+            elif transfer_data.to_account_id not in balances:
+                errors[index] = ResourceNotFoundError("Recipient account not found")
+            elif balances[transfer_data.from_account_id] < amount:
+                errors[index] = BusinessLogicError("Insufficient funds")
+            else:
+                balances[transfer_data.from_account_id] -= amount
+                balances[transfer_data.to_account_id] += amount
+                deltas[transfer_data.from_account_id] -= amount
+                deltas[transfer_data.to_account_id] += amount
+                accepted.append(
+                    (
+                        index,
+                        {
+                            "id": str(uuid.uuid4()),
+                            "from_account_id": transfer_data.from_account_id,
+                            "to_account_id": transfer_data.to_account_id,
+                            "amount": amount,
+                        },
+                    )
+                )
+
+        if not accepted:
+            return {}, errors
+
+        assign_ledger_seqs(self.db.connection(), [row for _, row in accepted])
+        rows = self.db.scalars(
+            insert(Transfer).returning(Transfer, sort_by_parameter_order=True),
+            [row for _, row in accepted],
+        ).all()
+        self.balance_service.apply_balance_deltas(
+            deltas,
+            expected_versions={
+                account_id: version
+                for account_id, (_, version) in accounts.items()
+                if self._expected_version(version) is not None
+            },
+        )
+        publish_transfers_on_commit(self.db, rows)
+        created = {
+            index: to_transfer_response(transfer)
+            for (index, _), transfer in zip(accepted, rows, strict=True)
+        }
+        return created, errors
+
+    def commit_batch(
+        self, transfers: list[TransferCreate]
+    ) -> tuple[dict[int, TransferResponse], dict[int, HTTPException]]:
+        """Apply many transfers in order within a single transaction.
+
+        Every referenced account is loaded with one query, balances are tracked
+        in memory as the batch is applied, and all accepted transfers are
+        written with one bulk insert. Rejected items do not affect the rest.
+        Returns the created transfers and the rejections, keyed by position.
+        """
+        try:
+            created, errors = self._with_retries(lambda: self._apply_batch(transfers))
+            self.db.commit()
+        except ConflictError:
+            raise
+        except Exception as e:
+            log.exception(
+                "Failed to create transfer batch",
+                extra={"size": len(transfers)},
+            )
+            raise BusinessLogicError(
+                f"Failed to create transfer batch: {str(e)}"
+            ) from e
+
+        log.info(
+            "Transfer batch created",
+            extra={"succeeded": len(created), "failed": len(errors)},
+        )
+        return created, errors
+
+    def create_transfers_batch(
+        self, transfers: list[TransferCreate]
+    ) -> TransferBatchResponse:
+        """Apply many transfers in order, reporting success or failure per item."""
+        created, errors = self.commit_batch(transfers)
+        return TransferBatchResponse(
+            succeeded=len(created),
+            failed=len(errors),
+            results=[
+                TransferBatchItemResult(
+                    index=index,
+                    transfer=created.get(index),
+                    error=errors[index].detail if index in errors else None,
+                )
+                for index in range(len(transfers))
+            ],
+        )
+
     def create_system_transfer(
-        self, to_account_id: UUIDStr, amount: float
+        self, to_account_id: UUIDStr, amount: int
     ) -> TransferResponse:
-        """Create a system transfer (e.g., for initial deposits)."""
+        """Create a system transfer (e.g., for initial deposits).
+
+        ``amount`` is in minor units.
+        """
         try:
             transfer = Transfer(
                 from_account_id=None,  # System account
@@ -93,6 +414,9 @@ class TransferService:
             self.db.add(transfer)
             self.db.flush()
 
+            balances = self.balance_service.apply_transfer(None, to_account_id, amount)
+            publish_transfers_on_commit(self.db, [transfer], balances)
+
             log.info(
                 "System transfer created",
                 extra={
@@ -102,18 +426,11 @@ class TransferService:
                 },
             )
 
-            return TransferResponse(
-                id=transfer.id,
-                from_account_id=None,
-                to_account_id=transfer.to_account_id,
-                amount=transfer.amount,
-                created_at=transfer.created_at,
-            )
+            return to_transfer_response(transfer)
         except Exception as e:
-            log.error(
+            log.exception(
                 "Failed to create system transfer",
                 extra={
-                    "error": str(format_exc()),
                     "to_account_id": to_account_id,
                     "amount": amount,
                 },
@@ -122,18 +439,127 @@ class TransferService:
                 f"Failed to create system transfer: {str(e)}"
             ) from e
 
+    def _history_direction(
+        self,
+        column: InstrumentedAttribute,
+        account_id: UUIDStr,
+        cursor: UUIDStr | None,
+        limit: int,
+    ) -> Select:
+        """Newest-first page of one direction of an account's transfers."""
+        stmt = select(*TRANSFER_COLUMNS, Transfer.seq).where(column == account_id)
+        if cursor is not None:
+            cursor_seq = (
+                select(Transfer.seq).where(Transfer.id == cursor).scalar_subquery()
+            )
+            stmt = stmt.where(Transfer.seq < cursor_seq)
+        page = stmt.order_by(Transfer.seq.desc()).limit(limit).subquery()
+        # Wrapped so the ORDER BY/LIMIT survive inside a UNION on SQLite.
+        return select(page)
+
+    def get_transfer_history(
+        self, account_id: UUIDStr, limit: int, cursor: UUIDStr | None = None
+    ) -> tuple[list[TransferResponse], UUIDStr | None]:
+        """Get a page of an account's sent and received transfers, newest first.
+
+        Pages are keyed on ``seq``: ``cursor`` is the id of the last transfer
+        of the previous page. Each direction is an index range scan on its
+        ``(account, seq)`` index, merged in the database.
+        Returns the page and the cursor for the next one (None on the last).
+        """
+        merged = union_all(
+            self._history_direction(
+                Transfer.from_account_id, account_id, cursor, limit + 1
+            ),
+            self._history_direction(
+                Transfer.to_account_id, account_id, cursor, limit + 1
+            ),
+        ).subquery()
+        stmt = (
+            select(*(merged.c[column.key] for column in TRANSFER_COLUMNS))
+            .order_by(merged.c.seq.desc())
+            .limit(limit + 1)
+        )
+        rows = self.db.execute(stmt).all()
+
+        next_cursor = rows[limit - 1].id if len(rows) > limit else None
+        return to_transfer_responses(rows[:limit]), next_cursor
+
+    def get_transfers_after(self, after_seq: int, limit: int) -> TransferFeed:
+        """Get up to ``limit`` transfers following ``after_seq``, in ledger order.
+
+        This is a range scan of the ``seq`` index. Only transfers up to the
+        ledger's read horizon are returned, so a consumer resuming from
+        ``last_seq`` never skips a transfer that commits later with a lower
+        number.
+        """
+        horizon = ledger_read_horizon(self.db.connection())
+        stmt = (
+            select(*TRANSFER_COLUMNS, Transfer.seq)
+            .where(Transfer.seq > after_seq, Transfer.seq <= horizon)
+            .order_by(Transfer.seq)
+            .limit(limit)
+        )
+        rows = self.db.execute(stmt).all()
+        transfers = _transfer_feed_entries.validate_python(
+            [
+                {
+                    "id": transfer_id,
+                    "from_account_id": from_account_id,
+                    "to_account_id": to_account_id,
+                    "amount": from_minor_units(amount),
+                    "created_at": created_at,
+                    "seq": seq,
+                }
+                for (
+                    transfer_id,
+                    from_account_id,
+                    to_account_id,
+                    amount,
+                    created_at,
+                    seq,
+                ) in rows
+            ]
+        )
+        return TransferFeed(
+            transfers=transfers,
+            last_seq=transfers[-1].seq if transfers else after_seq,
+        )
+
     def get_transfer_by_id(self, transfer_id: UUIDStr) -> TransferResponse | None:
         """Get transfer details by ID."""
         transfer = self.db.get(Transfer, transfer_id)
         if not transfer:
             return None
 
-        return TransferResponse(
-            id=transfer.id,
-            from_account_id=(
-                transfer.from_account_id if transfer.from_account_id else None
-            ),
-            to_account_id=transfer.to_account_id,
-            amount=transfer.amount,
-            created_at=transfer.created_at,
-        )
+        return to_transfer_response(transfer)
+
+
+class AsyncTransferService(AsyncService):
+    service_class = TransferService
+
+    async def create_transfer(
+        self, transfer_data: TransferCreate, idempotency_key: str | None = None
+    ) -> TransferResponse:
+        return await self._run("create_transfer", transfer_data, idempotency_key)
+
+    async def create_transfers_batch(
+        self, transfers: list[TransferCreate]
+    ) -> TransferBatchResponse:
+        return await self._run("create_transfers_batch", transfers)
+
+    async def create_system_transfer(
+        self, to_account_id: UUIDStr, amount: int
+    ) -> TransferResponse:
+        return await self._run("create_system_transfer", to_account_id, amount)
+
+    async def get_transfer_history(
+        self, account_id: UUIDStr, limit: int, cursor: UUIDStr | None = None
+    ) -> tuple[list[TransferResponse], UUIDStr | None]:
+        return await self._run("get_transfer_history", account_id, limit, cursor)
+
+    async def get_transfers_after(self, after_seq: int, limit: int) -> TransferFeed:
+        return await self._run("get_transfers_after", after_seq, limit)
+
+    async def get_transfer_by_id(self, transfer_id: UUIDStr) -> TransferResponse | None:
+        return await self._run("get_transfer_by_id", transfer_id)
@@ -1,6 +1,11 @@
+import csv
+import io
+import json
+from datetime import datetime
+
 from fastapi import status
 
-from meow_bank.db.models import Account, Customer
+from meow_bank.db.models import Account, Customer, Transfer
 
 
 def test_create_account(test_client, db_session):
@@ -31,6 +36,45 @@ def test_create_account_invalid_customer(test_client):
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+def test_create_accounts_batch(test_client, db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    response = test_client.post(
+        "/api/accounts/batch",
+        json={
+            "accounts": [
+                {"customer_id": customer.id, "initial_deposit": 100.0},
+                {"customer_id": customer.id, "initial_deposit": 0},
+            ]
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [account["balance"] for account in data] == [100.0, 0]
+    for account in data:
+        fetched = test_client.get(f"/api/accounts/{account['id']}").json()
+        assert fetched["balance"] == account["balance"]
+
+
+def test_create_accounts_batch_invalid_customer(test_client):
+    response = test_client.post(
+        "/api/accounts/batch",
+        json={
+            "accounts": [
+                {
+                    "customer_id": "00000000-0000-0000-0000-000000000000",
+                    "initial_deposit": 100.0,
+                }
+            ]
+        },
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 def test_get_account(test_client, db_session):
     customer = Customer(name="Test Customer")
     db_session.add(customer)
@@ -71,7 +115,127 @@ def test_get_account_with_transfers(test_client, db_session):
     assert data["id"] == str(account.id)
     assert data["customer_id"] == str(customer.id)
     assert "balance" in data
-    assert "sent_transfers" in data
-    assert "received_transfers" in data
-    assert isinstance(data["sent_transfers"], list)
-    assert isinstance(data["received_transfers"], list)
+    assert data["transfers"] == []
+    assert data["next_cursor"] is None
+
+
+def test_get_account_with_transfers_limit_out_of_range(test_client, db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    account = Account(customer_id=customer.id)
+    db_session.add(account)
+    db_session.commit()
+
+    response = test_client.get(f"/api/accounts/{account.id}/transfers?limit=0")
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def _account_with_history(db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    account = Account(customer_id=customer.id)
+    other_account = Account(customer_id=customer.id)
+    db_session.add_all([account, other_account])
+    db_session.commit()
+
+    db_session.add_all(
+        [
+            Transfer(
+                to_account_id=account.id,
+                amount=10_000,
+                created_at=datetime(2024, 1, 1),
+            ),
+            Transfer(
+                from_account_id=account.id,
+                to_account_id=other_account.id,
+                amount=3_025,
+                created_at=datetime(2024, 1, 2),
+            ),
+        ]
+    )
+    db_session.commit()
+    return account
+
+
+def test_export_account_ledger_ndjson(test_client, db_session):
+    account = _account_with_history(db_session)
+
+    response = test_client.get(f"/api/accounts/{account.id}/ledger")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    entries = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["amount"] for e in entries] == [100.0, -30.25]
+    assert [e["balance"] for e in entries] == [100.0, 69.75]
+
+
+def test_export_account_ledger_csv(test_client, db_session):
+    account = _account_with_history(db_session)
+
+    response = test_client.get(f"/api/accounts/{account.id}/ledger?format=csv")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["balance"] for row in rows] == ["100.00", "69.75"]
+
+
+def test_export_account_ledger_follows_the_ledger_within_a_second(
+    test_client, db_session
+):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+    account = Account(customer_id=customer.id)
+    other_account = Account(customer_id=customer.id)
+    db_session.add_all([account, other_account])
+    db_session.commit()
+
+    # Same timestamp, and the withdrawal has the lower id.
+    same_second = datetime(2024, 1, 1, 12, 0, 0)
+    db_session.add(
+        Transfer(
+            id="ffffffff-ffff-4fff-bfff-ffffffffffff",
+            to_account_id=account.id,
+            amount=5_000,
+            created_at=same_second,
+        )
+    )
+    db_session.flush()
+    db_session.add(
+        Transfer(
+            id="00000000-0000-4000-8000-000000000001",
+            from_account_id=account.id,
+            to_account_id=other_account.id,
+            amount=5_000,
+            created_at=same_second,
+        )
+    )
+    db_session.commit()
+
+    response = test_client.get(f"/api/accounts/{account.id}/ledger")
+
+    entries = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["amount"] for e in entries] == [50.0, -50.0]
+    assert [e["balance"] for e in entries] == [50.0, 0.0]
+
+
+def test_export_account_ledger_not_found(test_client):
+    response = test_client.get(
+        "/api/accounts/00000000-0000-0000-0000-000000000000/ledger"
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_stream_account_events_not_found(test_client):
+    response = test_client.get(
+        "/api/accounts/00000000-0000-0000-0000-000000000000/events"
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
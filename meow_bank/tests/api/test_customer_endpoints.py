@@ -1,6 +1,6 @@
 from fastapi import status
 
-from meow_bank.db.models import Customer
+from meow_bank.db.models import Account, Customer
 
 
 def test_create_customer(test_client):
@@ -56,3 +56,22 @@ def test_get_customer_with_accounts(test_client, db_session):
     assert data["id"] == str(customer.id)
     assert "accounts" in data
     assert isinstance(data["accounts"], list)
+
+
+def test_get_customers_with_accounts_batch(test_client, db_session):
+    customers = [Customer(name="First"), Customer(name="Second")]
+    db_session.add_all(customers)
+    db_session.commit()
+    db_session.add(Account(customer_id=customers[0].id, balance=1_000))
+    db_session.commit()
+
+    response = test_client.get(
+        "/api/customers/",
+        params={"ids": [customers[0].id, customers[1].id]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [c["id"] for c in data] == [customers[0].id, customers[1].id]
+    assert [a["balance"] for a in data[0]["accounts"]] == [10.0]
+    assert data[1]["accounts"] == []
@@ -0,0 +1,55 @@
+import re
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from meow_bank.api.middleware import http_request_queries, http_requests
+from meow_bank.db.models import Account, Customer
+from meow_bank.main import app
+
+
+def test_server_timing_reports_sql_queries(test_client, db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.flush()
+    account = Account(customer_id=customer.id, balance=100)
+    db_session.add(account)
+    db_session.commit()
+    route = {"method": "GET", "route": "/api/accounts/{account_id}"}
+    before = http_request_queries.sum(**route)
+
+    response = test_client.get(f"/api/accounts/{account.id}")
+
+    assert response.status_code == status.HTTP_200_OK
+    match = re.fullmatch(
+        r'app;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries"',
+        response.headers["Server-Timing"],
+    )
+    assert match
+    queries = int(match.group(1))
+    assert queries > 0
+    assert http_request_queries.sum(**route) - before == queries
+
+
+def test_metrics_endpoint_renders_prometheus_text(test_client):
+    test_client.get("/api/accounts/00000000-0000-0000-0000-000000000000")
+
+    # Scrapers don't send an API key.
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE meow_bank_http_request_duration_seconds histogram" in response.text
+    assert (
+        'meow_bank_http_requests_total{method="GET",'
+        'route="/api/accounts/{account_id}",status="404"}'
+    ) in response.text
+
+
+def test_metrics_route_is_the_template_even_when_a_value_repeats(test_client):
+    labels = {"method": "GET", "route": "/api/accounts/{account_id}/ledger"}
+    before = http_requests.value(**labels, status="422")
+
+    test_client.get("/api/accounts/ledger/ledger")
+
+    assert http_requests.value(**labels, status="422") == before + 1
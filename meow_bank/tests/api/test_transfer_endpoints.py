@@ -1,3 +1,5 @@
+import uuid
+
 from fastapi import status
 
 from meow_bank.db.models import Account, Customer
@@ -15,7 +17,7 @@ def test_create_transfer(test_client, db_session):
     db_session.commit()
 
     transfer_service = TransferService(db_session)
-    transfer_service.create_system_transfer(source_account.id, 100.0)
+    transfer_service.create_system_transfer(source_account.id, 10_000)
 
     transfer_data = {
         "from_account_id": str(source_account.id),
@@ -79,7 +81,7 @@ def test_get_transfer(test_client, db_session):
     db_session.commit()
 
     transfer_service = TransferService(db_session)
-    transfer_service.create_system_transfer(source_account.id, 100.0)
+    transfer_service.create_system_transfer(source_account.id, 10_000)
 
     transfer_data = {
         "from_account_id": str(source_account.id),
@@ -104,3 +106,148 @@ def test_get_transfer_not_found(test_client):
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert "Transfer not found" in response.json()["detail"]
+
+
+def test_create_transfers_batch(test_client, db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    source_account = Account(customer_id=customer.id)
+    dest_account = Account(customer_id=customer.id)
+    db_session.add_all([source_account, dest_account])
+    db_session.commit()
+
+    transfer_service = TransferService(db_session)
+    transfer_service.create_system_transfer(source_account.id, 10_000)
+
+    batch_data = {
+        "transfers": [
+            {
+                "from_account_id": str(source_account.id),
+                "to_account_id": str(dest_account.id),
+                "amount": 30.0,
+            },
+            {
+                "from_account_id": str(source_account.id),
+                "to_account_id": str(source_account.id),
+                "amount": 10.0,
+            },
+        ]
+    }
+
+    response = test_client.post("/api/transfers/batch", json=batch_data)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["succeeded"] == 1
+    assert data["failed"] == 1
+    assert data["results"][0]["transfer"]["amount"] == 30.0  # noqa: PLR2004
+    assert data["results"][1]["error"] == "Cannot transfer to the same account"
+
+
+def test_get_transfers_after(test_client, db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+    account = Account(customer_id=customer.id)
+    db_session.add(account)
+    db_session.commit()
+    transfer_service = TransferService(db_session)
+    first = transfer_service.create_system_transfer(account.id, 100)
+    second = transfer_service.create_system_transfer(account.id, 200)
+
+    response = test_client.get("/api/transfers/", params={"limit": 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [transfer["id"] for transfer in data["transfers"]] == [first.id]
+    assert data["last_seq"] == data["transfers"][0]["seq"]
+
+    response = test_client.get(
+        "/api/transfers/", params={"after_seq": data["last_seq"]}
+    )
+
+    data = response.json()
+    assert [transfer["id"] for transfer in data["transfers"]] == [second.id]
+
+    response = test_client.get("/api/transfers/", params={"after_seq": -1})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_create_transfers_batch_empty(test_client):
+    response = test_client.post("/api/transfers/batch", json={"transfers": []})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_create_transfer_amounts_are_exact(test_client, db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    source_account = Account(customer_id=customer.id)
+    dest_account = Account(customer_id=customer.id)
+    db_session.add_all([source_account, dest_account])
+    db_session.commit()
+
+    TransferService(db_session).create_system_transfer(source_account.id, 30)
+
+    for amount in (0.1, 0.2):
+        response = test_client.post(
+            "/api/transfers/",
+            json={
+                "from_account_id": str(source_account.id),
+                "to_account_id": str(dest_account.id),
+                "amount": amount,
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    response = test_client.get(f"/api/accounts/{dest_account.id}")
+    assert response.json()["balance"] == 0.3  # noqa: PLR2004
+
+    response = test_client.get(f"/api/accounts/{source_account.id}")
+    assert response.json()["balance"] == 0
+
+
+def test_create_transfer_rejects_fractional_cents(test_client):
+    transfer_data = {
+        "from_account_id": "00000000-0000-0000-0000-000000000000",
+        "to_account_id": "00000000-0000-0000-0000-000000000001",
+        "amount": 0.001,
+    }
+
+    response = test_client.post("/api/transfers/", json=transfer_data)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_create_transfer_idempotency_key(test_client, db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    source_account = Account(customer_id=customer.id)
+    dest_account = Account(customer_id=customer.id)
+    db_session.add_all([source_account, dest_account])
+    db_session.commit()
+
+    TransferService(db_session).create_system_transfer(source_account.id, 10_000)
+
+    transfer_data = {
+        "from_account_id": str(source_account.id),
+        "to_account_id": str(dest_account.id),
+        "amount": 50.0,
+    }
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = test_client.post("/api/transfers/", json=transfer_data, headers=headers)
+    retry = test_client.post("/api/transfers/", json=transfer_data, headers=headers)
+    transfer_data["amount"] = 60.0
+    changed = test_client.post("/api/transfers/", json=transfer_data, headers=headers)
+
+    assert first.status_code == status.HTTP_200_OK
+    assert retry.status_code == status.HTTP_200_OK
+    assert retry.json() == first.json()
+    assert changed.status_code == status.HTTP_409_CONFLICT
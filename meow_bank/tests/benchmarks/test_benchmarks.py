@@ -0,0 +1,86 @@
+import random
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from meow_bank.benchmarks.baseline import describe_storage_changes, find_regressions
+from meow_bank.benchmarks.runner import SCENARIOS, run_in_process
+from meow_bank.benchmarks.seed import load_dataset, seed_database
+from meow_bank.benchmarks.storage import relation_sizes
+from meow_bank.db.database import create_db_engine
+from meow_bank.db.migrations import run_migrations
+from meow_bank.db.models import Account, Customer, Transfer
+from meow_bank.services.balance import BalanceService
+
+CUSTOMERS, ACCOUNTS, TRANSFERS = 20, 60, 500
+
+
+def test_seed_database_is_consistent_and_skewed(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    run_migrations(engine)
+
+    with sessionmaker(bind=engine)() as db:
+        dataset = seed_database(db, CUSTOMERS, ACCOUNTS, TRANSFERS)
+
+        def count(model) -> int:
+            return db.scalar(select(func.count()).select_from(model))
+
+        assert count(Customer) == CUSTOMERS
+        assert count(Account) == ACCOUNTS
+        # One funding transfer per account, then the synthetic ones.
+        assert count(Transfer) == ACCOUNTS + TRANSFERS
+        assert BalanceService(db).find_balance_drift() == []
+        assert sorted(load_dataset(db).account_ids) == sorted(dataset.account_ids)
+
+    # The busiest account sees several times its uniform share of traffic.
+    rng = random.Random(0)
+    picks = [dataset.pick_account(rng) for _ in range(1000)]
+    busiest = max(picks.count(account_id) for account_id in set(picks))
+    assert busiest > 3 * len(picks) / ACCOUNTS
+
+
+def test_run_in_process_reports_percentiles(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    run_migrations(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    with session_factory() as db:
+        dataset = seed_database(db, 5, 10, 50)
+
+    for scenario in SCENARIOS:
+        summary = run_in_process(
+            session_factory, dataset, scenario, concurrency=1, duration=0.05
+        ).summary()
+        assert summary["operations"] > 0
+        assert summary["errors"] == 0
+        assert 0 < summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+
+
+def test_find_regressions():
+    baseline = {
+        "results": {
+            "get_account_by_id": {"throughput": 100.0, "p95_ms": 10.0, "p99_ms": 20.0}
+        }
+    }
+    within = {"get_account_by_id": {"throughput": 90.0, "p95_ms": 11.0, "p99_ms": 20.0}}
+    slower = {"get_account_by_id": {"throughput": 70.0, "p95_ms": 13.0, "p99_ms": 20.0}}
+
+    assert find_regressions(baseline, within, tolerance=0.2) == []
+    assert len(find_regressions(baseline, slower, tolerance=0.2)) == 2  # noqa: PLR2004
+
+
+def test_relation_sizes_cover_tables_and_indexes(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    run_migrations(engine)
+    with sessionmaker(bind=engine)() as db:
+        seed_database(db, 5, 10, 50)
+
+    with engine.connect() as connection:
+        storage = relation_sizes(connection)
+
+    assert {"transfers", "ix_transfers_to_account_seq"} <= storage.keys()
+    assert list(storage.values()) == sorted(storage.values(), reverse=True)
+    (change,) = describe_storage_changes(
+        {"storage": {"transfers": storage["transfers"] * 2}},
+        {"transfers": storage["transfers"]},
+    )
+    assert change.startswith("transfers: ") and "(-50% against" in change
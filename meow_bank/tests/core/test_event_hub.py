@@ -0,0 +1,49 @@
+import asyncio
+
+from meow_bank.core.events import EventHub, dropped_subscriptions
+
+
+def test_hub_delivers_to_the_channels_subscribers():
+    async def scenario():
+        hub = EventHub()
+        first = hub.subscribe(["a"])
+        both = hub.subscribe(["a", "b"])
+        assert hub.has_subscribers(["b", "c"])
+        assert not hub.has_subscribers(["c"])
+
+        hub.publish("a", "1")
+        hub.publish("b", "2")
+        hub.publish("c", "3")
+        received = (
+            [await first.get(1)],
+            [await both.get(1), await both.get(1)],
+        )
+
+        first.close()
+        both.close()
+        assert not hub.has_subscribers(["a", "b"])
+        return received
+
+    assert asyncio.run(scenario()) == (["1"], ["1", "2"])
+
+
+def test_idle_subscription_times_out():
+    async def scenario():
+        subscription = EventHub().subscribe(["a"])
+        return await subscription.get(0.01)
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_subscriber_that_falls_behind_is_closed():
+    async def scenario():
+        hub = EventHub(queue_size=2)
+        subscription = hub.subscribe(["a"])
+        for i in range(3):
+            hub.publish("a", str(i))
+        await asyncio.sleep(0)
+        return subscription.overflowed, [message async for message in subscription]
+
+    before = dropped_subscriptions.value()
+    assert asyncio.run(scenario()) == (True, ["0", "1"])
+    assert dropped_subscriptions.value() == before + 1
@@ -0,0 +1,65 @@
+import json
+import threading
+
+from loguru import logger
+
+from meow_bank.core.logging import BufferedSink, SerializedSink, dropped_log_records
+
+
+def _only(name: str):
+    return lambda record: record["extra"].get("test_sink") == name
+
+
+def test_buffered_sink_writes_batches():
+    batches = []
+    sink = BufferedSink("batches", batches.append, batch_size=3, flush_interval=1)
+    handler_id = logger.add(sink, format="{message}", filter=_only("batches"))
+
+    test_log = logger.bind(test_sink="batches")
+    for i in range(5):
+        test_log.info(f"message {i}")
+    logger.remove(handler_id)  # stops the sink once the backlog is written
+
+    assert "".join(batches) == "".join(f"message {i}\n" for i in range(5))
+    assert all(batch.count("\n") <= 3 for batch in batches)  # noqa: PLR2004
+
+
+def test_buffered_sink_drops_records_when_full():
+    release = threading.Event()
+    written = []
+
+    def slow_write(text):
+        release.wait()
+        written.append(text)
+
+    sink = BufferedSink("full", slow_write, maxsize=1, batch_size=1)
+    handler_id = logger.add(sink, format="{message}", filter=_only("full"))
+    before = dropped_log_records.value(sink="full")
+
+    test_log = logger.bind(test_sink="full")
+    for i in range(10):
+        test_log.info(f"message {i}")
+    release.set()
+    logger.remove(handler_id)
+
+    dropped = dropped_log_records.value(sink="full") - before
+    assert dropped > 0
+    assert len(written) + dropped == 10  # noqa: PLR2004
+
+
+def test_serialized_sink_matches_loguru_serialize():
+    written, expected = [], []
+    sink_id = logger.add(
+        SerializedSink("json", written.append),
+        format="{message}",
+        filter=_only("json"),
+    )
+    reference_id = logger.add(
+        expected.append, format="{message}", serialize=True, filter=_only("json")
+    )
+
+    logger.bind(test_sink="json").warning("hello")
+    logger.remove(sink_id)
+    logger.remove(reference_id)
+
+    assert json.loads(written[0]) == json.loads(expected[0])
@@ -0,0 +1,107 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from meow_bank.core.config import settings
+from meow_bank.db.database import (
+    create_db_engine,
+    is_transient_error,
+    on_commit,
+    track_queries,
+)
+
+
+def test_sqlite_connections_are_tuned(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+
+    with engine.connect() as connection:
+        journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+        busy_timeout = connection.execute(text("PRAGMA busy_timeout")).scalar()
+
+    assert journal_mode == settings.SQLITE_JOURNAL_MODE.lower()
+    assert busy_timeout == settings.SQLITE_BUSY_TIMEOUT_MS
+    assert engine.pool.size() == settings.DB_POOL_SIZE
+
+
+def test_sqlite_transactions_can_take_the_write_lock_up_front(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'locks.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    with engine.connect().execution_options(sqlite_begin="IMMEDIATE") as writer:
+        writer.execute(text("SELECT x FROM t"))  # a read, yet the lock is held
+        with engine.connect() as other:
+            other.exec_driver_sql("PRAGMA busy_timeout=0")
+            with pytest.raises(OperationalError) as locked:
+                other.execute(text("INSERT INTO t VALUES (1)"))
+        writer.rollback()
+
+    assert is_transient_error(locked.value)
+
+
+def test_transient_errors_are_recognized():
+    class PostgresError(Exception):
+        def __init__(self, sqlstate):
+            self.sqlstate = sqlstate
+
+    def error(cls, orig):
+        return cls("UPDATE accounts ...", {}, orig)
+
+    assert is_transient_error(error(OperationalError, PostgresError("40001")))
+    assert is_transient_error(error(DBAPIError, PostgresError("40P01")))
+    assert not is_transient_error(error(DBAPIError, PostgresError("23505")))
+    assert not is_transient_error(
+        error(OperationalError, sqlite3.OperationalError("no such table: t"))
+    )
+    assert not is_transient_error(
+        error(IntegrityError, sqlite3.IntegrityError("database is locked"))
+    )
+
+
+def test_in_memory_sqlite_skips_pool_sizing():
+    engine = create_db_engine("sqlite:///:memory:")
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_on_commit_skips_rolled_back_savepoints():
+    session = Session(create_db_engine("sqlite:///:memory:"))
+    committed = []
+
+    session.execute(text("SELECT 1"))
+    on_commit(session, lambda: committed.append("outer"))
+    try:
+        with session.begin_nested():
+            on_commit(session, lambda: committed.append("rolled back"))
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    with session.begin_nested():
+        on_commit(session, lambda: committed.append("released"))
+    assert committed == []
+
+    session.commit()
+    assert committed == ["outer", "released"]
+
+    session.execute(text("SELECT 1"))
+    on_commit(session, lambda: committed.append("discarded"))
+    session.rollback()
+    session.commit()
+    assert committed == ["outer", "released"]
+
+
+def test_track_queries_counts_statements_in_context(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'queries.db'}")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))  # outside tracking
+        with track_queries() as stats:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+
+    assert stats.count == 2  # noqa: PLR2004
+    assert stats.seconds > 0
@@ -0,0 +1,167 @@
+import csv
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from meow_bank.db.database import Base, create_db_engine
+from meow_bank.db.import_ledger import import_ledger, read_rows
+from meow_bank.db.models import Account, BalanceCheckpoint, Customer, Transfer
+from meow_bank.services.balance import BalanceService
+
+A, B, C = (str(uuid.uuid4()) for _ in range(3))
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    engine.echo = False
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        customer = Customer(name="Test Customer")
+        session.add(customer)
+        session.flush()
+        session.add_all(
+            Account(id=account_id, customer_id=customer.id) for account_id in (A, B, C)
+        )
+        session.commit()
+        yield session
+
+
+def write_csv(path, rows):
+    with path.open("w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["from_account_id", "to_account_id", "amount", "created_at"])
+        writer.writerows(rows)
+    return path
+
+
+def balances(db):
+    return dict(db.execute(select(Account.id, Account.balance)).all())
+
+
+def test_import_updates_balances_and_rolls_checkpoints_forward(db, tmp_path):
+    path = write_csv(
+        tmp_path / "ledger.csv",
+        [
+            ("", A, "100.00", "2020-01-01T00:00:00Z"),
+            (A, B, "25.50", "2020-01-02T00:00:00"),
+            (B, C, "0.50", "2020-01-03T00:00:00+02:00"),
+            ("", C, "1", "2020-01-04T00:00:00Z"),
+        ],
+    )
+
+    result = import_ledger(db, read_rows(path), batch_size=3)
+
+    assert (result.imported, result.skipped) == (4, 0)
+    assert balances(db) == {A: 7_450, B: 2_500, C: 150}
+    assert BalanceService(db).find_balance_drift() == []
+    checkpoints = db.execute(select(func.count()).select_from(BalanceCheckpoint))
+    assert checkpoints.scalar_one() == 3  # noqa: PLR2004
+
+
+def test_checkpoints_refreshed_during_an_import_stay_valid(db, tmp_path):
+    path = write_csv(
+        tmp_path / "ledger.csv",
+        [
+            ("", A, "100.00", "2020-01-01T00:00:00Z"),
+            (A, B, "25.00", "2020-01-02T00:00:00Z"),
+            (B, C, "5.00", "2019-01-01T00:00:00Z"),
+            ("", C, "0.001", "2019-01-02T00:00:00Z"),
+        ],
+    )
+
+    def rows_with_a_refresh_between_chunks():
+        # As the background job would, once the first chunk is committed.
+        for row_number, row in enumerate(read_rows(path)):
+            if row_number == 2:  # noqa: PLR2004
+                with Session(db.get_bind()) as other:
+                    BalanceService(other).roll_forward_checkpoints()
+                    other.commit()
+            yield row
+
+    with pytest.raises(ValueError, match="Row 4: invalid amount"):
+        import_ledger(db, rows_with_a_refresh_between_chunks(), batch_size=2)
+    db.rollback()
+    import_ledger(db, read_rows(path), start_row=2, skip_invalid=True)
+
+    assert db.get(BalanceCheckpoint, A).balance == 7_500  # noqa: PLR2004
+    assert balances(db) == {A: 7_500, B: 2_000, C: 500}
+    assert BalanceService(db).find_balance_drift() == []
+
+
+def test_import_resumes_from_an_offset(db, tmp_path):
+    path = write_csv(
+        tmp_path / "ledger.csv",
+        [
+            ("", A, "1.00", "2020-01-01T00:00:00Z"),
+            ("", B, "2.00", "2020-01-02T00:00:00Z"),
+            ("", C, "3.00", "2020-01-03T00:00:00Z"),
+        ],
+    )
+
+    result = import_ledger(db, read_rows(path), start_row=2)
+
+    assert result.imported == 1
+    assert balances(db) == {A: 0, B: 0, C: 300}
+
+
+def test_invalid_rows_stop_the_import_after_the_committed_chunks(db, tmp_path):
+    path = write_csv(
+        tmp_path / "ledger.csv",
+        [
+            ("", A, "1.00", "2020-01-01T00:00:00Z"),
+            ("", B, "2.00", "2020-01-02T00:00:00Z"),
+            (A, "missing", "1.00", "2020-01-03T00:00:00Z"),
+            ("", C, "0.001", "2020-01-04T00:00:00Z"),
+        ],
+    )
+
+    with pytest.raises(ValueError, match="Row 3: invalid to_account_id missing"):
+        import_ledger(db, read_rows(path), batch_size=2)
+    db.rollback()
+    assert balances(db) == {A: 100, B: 200, C: 0}
+
+    result = import_ledger(db, read_rows(path), start_row=2, skip_invalid=True)
+
+    assert (result.imported, result.skipped) == (0, 2)
+    transfers = db.execute(select(func.count()).select_from(Transfer)).scalar_one()
+    assert transfers == 2  # noqa: PLR2004
+
+
+def test_account_ids_are_matched_however_they_are_spelled(db, tmp_path):
+    path = write_csv(
+        tmp_path / "ledger.csv",
+        [
+            ("", A.upper(), "10.00", "2020-01-01T00:00:00Z"),
+            (f"{{{A}}}", B.replace("-", ""), "4.00", "2020-01-02T00:00:00Z"),
+        ],
+    )
+
+    import_ledger(db, read_rows(path))
+
+    assert balances(db) == {A: 600, B: 400, C: 0}
+    assert set(db.execute(select(Transfer.from_account_id)).scalars()) == {None, A}
+
+
+def test_rows_that_would_overdraw_are_rejected(db, tmp_path):
+    path = write_csv(
+        tmp_path / "ledger.csv",
+        [
+            ("", A, "10.00", "2020-01-01T00:00:00Z"),
+            (A, B, "6.00", "2020-01-02T00:00:00Z"),
+            (A, C, "6.00", "2020-01-03T00:00:00Z"),
+            (B, C, "6.00", "2020-01-04T00:00:00Z"),
+        ],
+    )
+
+    with pytest.raises(ValueError, match=f"Row 3: insufficient funds in .*{A}"):
+        import_ledger(db, read_rows(path))
+    db.rollback()
+    assert balances(db) == {A: 0, B: 0, C: 0}
+
+    result = import_ledger(db, read_rows(path), skip_invalid=True)
+
+    assert (result.imported, result.skipped) == (3, 1)
+    assert balances(db) == {A: 400, B: 0, C: 600}
@@ -0,0 +1,149 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+
+from meow_bank.db.migrations import MIGRATIONS, run_migrations, schema_migrations
+from meow_bank.db.models import Transfer
+
+A, B, C, T1, T2 = (str(uuid.UUID(int=i)) for i in range(1, 6))
+
+
+def _by_id(rows):
+    return {str(uuid.UUID(bytes=key)): value for key, value in rows}
+
+
+def test_fresh_database_is_stamped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    assert run_migrations(engine) == []
+
+    with engine.connect() as connection:
+        versions = connection.execute(select(schema_migrations.c.version)).scalars()
+        assert set(versions) == {migration.VERSION for migration in MIGRATIONS}
+        assert inspect(connection).has_table("transfers")
+
+
+def test_existing_database_is_migrated(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE customers (id VARCHAR PRIMARY KEY)"))
+        connection.execute(
+            text(
+                "CREATE TABLE accounts (id VARCHAR PRIMARY KEY, "
+                "customer_id VARCHAR NOT NULL, created_at DATETIME)"
+            )
+        )
+        connection.execute(
+            text(
+                "CREATE TABLE transfers (id VARCHAR PRIMARY KEY, "
+                "from_account_id VARCHAR, to_account_id VARCHAR NOT NULL, "
+                "amount FLOAT NOT NULL, created_at DATETIME)"
+            )
+        )
+        connection.execute(text("INSERT INTO customers (id) VALUES (:c)"), {"c": C})
+        connection.execute(
+            text("INSERT INTO accounts (id, customer_id) VALUES (:a, :c), (:b, :c)"),
+            {"a": A, "b": B, "c": C},
+        )
+        connection.execute(
+            text(
+                "INSERT INTO transfers (id, from_account_id, to_account_id, amount) "
+                "VALUES (:t1, NULL, :a, 100.1), (:t2, :a, :b, 40.07)"
+            ),
+            {"t1": T1, "t2": T2, "a": A, "b": B},
+        )
+
+    assert run_migrations(engine) == [migration.VERSION for migration in MIGRATIONS]
+
+    with engine.connect() as connection:
+        balances = _by_id(connection.execute(text("SELECT id, balance FROM accounts")))
+        amounts = _by_id(connection.execute(text("SELECT id, amount FROM transfers")))
+        seqs = _by_id(connection.execute(text("SELECT id, seq FROM transfers")))
+        last_seq = connection.execute(
+            text("SELECT last_seq FROM ledger_sequence")
+        ).scalar_one()
+    assert balances == {A: 6_003, B: 4_007}
+    assert amounts == {T1: 10_010, T2: 4_007}
+    assert seqs == {T1: 1, T2: 2}
+    assert last_seq == 2  # noqa: PLR2004
+    assert all(
+        isinstance(value, int) for value in [*balances.values(), *amounts.values()]
+    )
+
+    with Session(engine) as session:
+        transfer = session.get(Transfer, T2)
+        assert (transfer.from_account_id, transfer.to_account_id) == (A, B)
+        stored = session.execute(
+            text(
+                "SELECT typeof(id), length(id), length(to_account_id) "
+                "FROM transfers WHERE id = :id"
+            ),
+            {"id": uuid.UUID(T2).bytes},
+        ).one()
+        assert tuple(stored) == ("blob", 16, 16)
+
+
+def test_ids_that_are_not_uuids_stop_the_migration(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE customers (id VARCHAR PRIMARY KEY)"))
+        connection.execute(
+            text(
+                "CREATE TABLE transfers (id VARCHAR PRIMARY KEY, "
+                "from_account_id VARCHAR, to_account_id VARCHAR NOT NULL, "
+                "amount FLOAT NOT NULL, created_at DATETIME)"
+            )
+        )
+        connection.execute(
+            text(
+                "CREATE TABLE accounts (id VARCHAR PRIMARY KEY, "
+                "customer_id VARCHAR NOT NULL, created_at DATETIME)"
+            )
+        )
+        connection.execute(text("INSERT INTO customers (id) VALUES ('c1')"))
+
+    with pytest.raises(ValueError, match="customers holds 1 ids that are not UUIDs"):
+        run_migrations(engine)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT id FROM customers")).scalar() == "c1"
+
+
+def test_migrated_indexes_match_the_models(tmp_path):
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as connection:
+        connection.execute(text("CREATE TABLE customers (id VARCHAR PRIMARY KEY)"))
+        connection.execute(text("CREATE INDEX ix_customers_id ON customers (id)"))
+        connection.execute(
+            text(
+                "CREATE TABLE transfers (id VARCHAR PRIMARY KEY, "
+                "from_account_id VARCHAR, to_account_id VARCHAR NOT NULL, "
+                "amount FLOAT NOT NULL, created_at DATETIME)"
+            )
+        )
+        for column in ("id", "from_account_id", "to_account_id"):
+            connection.execute(
+                text(f"CREATE INDEX ix_transfers_{column} ON transfers ({column})")
+            )
+        connection.execute(
+            text("CREATE TABLE accounts (id VARCHAR PRIMARY KEY, created_at DATETIME)")
+        )
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    run_migrations(legacy)
+    run_migrations(fresh)
+
+    def indexes(engine, table):
+        return {
+            (index["name"], tuple(index["column_names"]))
+            for index in inspect(engine).get_indexes(table)
+        }
+
+    assert indexes(legacy, "transfers") == indexes(fresh, "transfers")
+    assert indexes(legacy, "customers") == set()
+    assert (
+        "ix_transfers_to_account_seq",
+        ("to_account_id", "seq", "amount"),
+    ) in indexes(fresh, "transfers")
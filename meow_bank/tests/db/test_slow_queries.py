@@ -0,0 +1,75 @@
+from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from meow_bank.core.config import settings
+from meow_bank.db.database import Base, create_db_engine
+from meow_bank.db.models import Account, Customer
+from meow_bank.db.slow_queries import fingerprint, slow_queries
+from meow_bank.services.balance import BalanceService
+
+
+def test_fingerprint_ignores_values_and_list_lengths():
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?) AND n > 5") == fingerprint(
+        "SELECT *\n  FROM t WHERE id IN (?, ?, ?, ?) AND n > 10"
+    )
+    assert fingerprint("SELECT a FROM t WHERE x = 'cat'") == fingerprint(
+        "SELECT a FROM t WHERE x = :x_1"
+    )
+    assert fingerprint("SELECT a FROM t") != fingerprint("SELECT b FROM t")
+
+
+def test_slow_balance_aggregation_is_logged_with_its_plan(tmp_path, monkeypatch):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        customer = Customer(name="Test Customer")
+        db.add(customer)
+        db.flush()
+        account = Account(customer_id=customer.id)
+        db.add(account)
+        db.commit()
+
+        records = []
+        handler_id = logger.add(
+            lambda message: records.append(message.record["extra"]["extra"]),
+            filter=lambda record: "slow_query" in record["extra"],
+        )
+        monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 1e-9)
+        try:
+            BalanceService(db).get_ledger_balances([account.id])
+            BalanceService(db).get_ledger_balances([account.id])
+        finally:
+            logger.remove(handler_id)
+
+    ledger_queries = [r for r in records if "sum(transfers.amount)" in r["statement"]]
+    first, second = ledger_queries
+    assert first["fingerprint"] == second["fingerprint"]
+    assert second["count"] == first["count"] + 1
+    assert slow_queries.value(fingerprint=first["fingerprint"]) >= 2  # noqa: PLR2004
+    # The plan is captured the first time a statement shape is seen.
+    assert any("transfers" in line for line in first["plan"])
+    assert second["plan"] is None
+
+
+def test_slow_executemany_logs_only_its_first_row(tmp_path, monkeypatch):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    Base.metadata.create_all(engine)
+    records = []
+    handler_id = logger.add(
+        lambda message: records.append(message.record["extra"]["extra"]),
+        filter=lambda record: "slow_query" in record["extra"],
+    )
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 1e-9)
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                insert(Customer),
+                [{"name": f"Customer {i}"} for i in range(100)],
+            )
+    finally:
+        logger.remove(handler_id)
+
+    (record,) = [r for r in records if r["statement"].startswith("INSERT")]
+    assert [row[1] for row in record["parameters"]] == ["Customer 0"]
+    assert record["executemany_rows"] == 100  # noqa: PLR2004
@@ -0,0 +1,29 @@
+import uuid
+
+import pytest
+from sqlalchemy import Column, MetaData, Table, create_engine, insert, select
+from sqlalchemy.exc import StatementError
+
+from meow_bank.db.types import GUID
+
+ids = Table("ids", MetaData(), Column("id", GUID, primary_key=True))
+
+
+def test_guid_stores_16_bytes_and_reads_canonical_strings():
+    engine = create_engine("sqlite:///:memory:")
+    ids.metadata.create_all(engine)
+    value = uuid.uuid4()
+
+    with engine.begin() as connection:
+        connection.execute(insert(ids), [{"id": str(value).upper()}])
+        stored = connection.exec_driver_sql("SELECT id FROM ids").scalar_one()
+        loaded = connection.execute(select(ids.c.id)).scalar_one()
+        found = connection.execute(
+            select(ids.c.id).where(ids.c.id == str(value))
+        ).scalar_one_or_none()
+
+        with pytest.raises(StatementError, match="badly formed"):
+            connection.execute(insert(ids), [{"id": "not-a-uuid"}])
+
+    assert stored == value.bytes
+    assert loaded == found == str(value)
@@ -4,9 +4,11 @@ from uuid import UUID
 import pytest
 
 from meow_bank.api.exceptions import ResourceNotFoundError
-from meow_bank.db.models import Account, Customer
+from meow_bank.db.database import track_queries
+from meow_bank.db.models import Account, Customer, Transfer
 from meow_bank.schemas import AccountCreate
 from meow_bank.services.account import AccountService
+from meow_bank.services.balance import BalanceService
 
 
 def test_create_account(db_session):
@@ -40,6 +42,47 @@ def test_create_account_invalid_customer(db_session):
         account_service.create_account(account_data)
 
 
+def test_create_accounts_batch(db_session):
+    customers = [Customer(name="First"), Customer(name="Second")]
+    db_session.add_all(customers)
+    db_session.commit()
+    accounts_data = [
+        AccountCreate(customer_id=customers[0].id, initial_deposit=100),
+        AccountCreate(customer_id=customers[1].id, initial_deposit=0),
+        AccountCreate(customer_id=customers[0].id, initial_deposit=12.5),
+    ]
+
+    with track_queries() as queries:
+        result = AccountService(db_session).create_accounts_batch(accounts_data)
+
+    # One customer lookup, one insert each for accounts and deposits, and one
+    # update reserving the deposits' ledger sequence numbers.
+    assert queries.count == 4  # noqa: PLR2004
+    assert [(a.customer_id, a.balance) for a in result] == [
+        (customers[0].id, 100),
+        (customers[1].id, 0),
+        (customers[0].id, 12.5),
+    ]
+    assert BalanceService(db_session).find_balance_drift() == []
+    deposits = db_session.query(Transfer).filter(Transfer.from_account_id.is_(None))
+    assert sorted(t.amount for t in deposits) == [1_250, 10_000]
+
+
+def test_create_accounts_batch_invalid_customer(db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+    accounts_data = [
+        AccountCreate(customer_id=customer.id, initial_deposit=100),
+        AccountCreate(customer_id=str(UUID(int=0)), initial_deposit=100),
+    ]
+
+    with pytest.raises(ResourceNotFoundError, match=str(UUID(int=0))):
+        AccountService(db_session).create_accounts_batch(accounts_data)
+
+    assert db_session.query(Account).count() == 0
+
+
 def test_get_account_by_id(db_session):
     customer = Customer(name="Test Customer")
     db_session.add(customer)
@@ -82,5 +125,5 @@ def test_get_account_with_transfers(db_session):
     assert result is not None
     assert result.id == str(account.id)
     assert result.customer_id == str(customer.id)
-    assert isinstance(result.sent_transfers, list)
-    assert isinstance(result.received_transfers, list)
+    assert result.transfers == []
+    assert result.next_cursor is None
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from meow_bank.db.database import Base
+from meow_bank.schemas import AccountCreate, CustomerCreate, TransferCreate
+from meow_bank.services import (
+    AsyncAccountService,
+    AsyncBalanceService,
+    AsyncCustomerService,
+    AsyncLedgerService,
+    AsyncTransferService,
+)
+
+pytest.importorskip("aiosqlite")
+
+
+def test_services_over_async_session(tmp_path):
+    database = tmp_path / "async.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{database}"))
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+    async_session = async_sessionmaker(async_engine, autoflush=False)
+
+    async def scenario():
+        async with async_session() as db:
+            customer = await AsyncCustomerService(db).create_customer(
+                CustomerCreate(name="Test Customer")
+            )
+            account_service = AsyncAccountService(db)
+            source = await account_service.create_account(
+                AccountCreate(customer_id=customer.id, initial_deposit=100.0)
+            )
+            dest = await account_service.create_account(
+                AccountCreate(customer_id=customer.id, initial_deposit=0)
+            )
+            transfer = await AsyncTransferService(db).create_transfer(
+                TransferCreate(
+                    from_account_id=source.id, to_account_id=dest.id, amount=25.0
+                )
+            )
+            balances = await AsyncBalanceService(db).get_balances_by_account_ids(
+                [source.id, dest.id]
+            )
+            ledger = [
+                entry async for entry in AsyncLedgerService(db).iter_ledger(dest.id)
+            ]
+            return source, dest, transfer, balances, ledger
+
+    source, dest, transfer, balances, ledger = asyncio.run(scenario())
+    asyncio.run(async_engine.dispose())
+
+    assert transfer.amount == 25.0  # noqa: PLR2004
+    assert balances == {source.id: 7_500, dest.id: 2_500}
+    assert [entry.balance for entry in ledger] == [25]
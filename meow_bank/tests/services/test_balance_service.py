@@ -0,0 +1,239 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import update
+
+from meow_bank.core.cache import TTLCache, cache_evictions
+from meow_bank.db.models import Account, BalanceCheckpoint, Customer, Transfer
+from meow_bank.schemas import TransferCreate
+from meow_bank.services.balance import BalanceService, balance_cache_requests
+from meow_bank.services.transfer import TransferService
+
+
+def _create_accounts(db_session, count=2):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    accounts = [Account(customer_id=customer.id) for _ in range(count)]
+    db_session.add_all(accounts)
+    db_session.commit()
+    return accounts
+
+
+def test_transfers_update_materialized_balances(db_session):
+    source_account, dest_account = _create_accounts(db_session)
+
+    transfer_service = TransferService(db_session)
+    transfer_service.create_system_transfer(source_account.id, 10_000)
+    transfer_service.create_transfer(
+        TransferCreate(
+            from_account_id=source_account.id,
+            to_account_id=dest_account.id,
+            amount=30.0,
+        )
+    )
+
+    balance_service = BalanceService(db_session)
+    source_balance = balance_service.get_balance_by_account_id(source_account.id)
+    assert source_balance == 7_000  # noqa: PLR2004
+    assert balance_service.get_balances_by_account_ids(
+        [source_account.id, dest_account.id]
+    ) == {source_account.id: 7_000, dest_account.id: 3_000}
+    assert balance_service.get_ledger_balances() == {
+        source_account.id: 7_000,
+        dest_account.id: 3_000,
+    }
+
+
+def test_find_and_fix_balance_drift(db_session):
+    (account,) = _create_accounts(db_session, count=1)
+    TransferService(db_session).create_system_transfer(account.id, 10_000)
+
+    balance_service = BalanceService(db_session)
+    assert balance_service.find_balance_drift() == []
+
+    db_session.execute(
+        update(Account).where(Account.id == account.id).values(balance=500)
+    )
+    drift = balance_service.find_balance_drift()
+    assert drift == [(account.id, 500, 10_000)]
+
+    balance_service.fix_balance_drift(drift)
+    balance = balance_service.get_balance_by_account_id(account.id)
+    assert balance == 10_000  # noqa: PLR2004
+    assert balance_service.find_balance_drift() == []
+
+
+def test_fixing_drift_keeps_transfers_committed_since_it_was_found(db_session):
+    (account,) = _create_accounts(db_session, count=1)
+    transfer_service = TransferService(db_session)
+    transfer_service.create_system_transfer(account.id, 10_000)
+    db_session.execute(
+        update(Account).where(Account.id == account.id).values(balance=500)
+    )
+    balance_service = BalanceService(db_session)
+    drift = balance_service.find_balance_drift()
+
+    transfer_service.create_system_transfer(account.id, 2_000)
+    db_session.commit()
+
+    assert balance_service.fix_balance_drift(drift) == [(account.id, 2_500, 12_000)]
+    balance = balance_service.get_balance_by_account_id(account.id)
+    assert balance == 12_000  # noqa: PLR2004
+    assert balance_service.find_balance_drift() == []
+
+
+def test_checkpoints_roll_forward_over_settled_transfers(db_session):
+    source_account, dest_account = _create_accounts(db_session)
+    start = datetime(2024, 1, 1)
+    transfers = [
+        Transfer(to_account_id=source_account.id, amount=10_000, created_at=start),
+        Transfer(
+            from_account_id=source_account.id,
+            to_account_id=dest_account.id,
+            amount=4_000,
+            created_at=start + timedelta(seconds=1),
+        ),
+        Transfer(
+            from_account_id=source_account.id,
+            to_account_id=dest_account.id,
+            amount=1_000,
+            created_at=start + timedelta(seconds=2),
+        ),
+    ]
+    db_session.add_all(transfers)
+    db_session.commit()
+
+    balance_service = BalanceService(db_session)
+    assert balance_service.roll_forward_checkpoints() == 2  # noqa: PLR2004
+
+    checkpoint = db_session.get(BalanceCheckpoint, source_account.id)
+    assert checkpoint.balance == 5_000  # noqa: PLR2004
+    assert checkpoint.last_seq == transfers[-1].seq
+    assert balance_service.roll_forward_checkpoints() == 0
+
+    db_session.add(
+        Transfer(
+            from_account_id=dest_account.id,
+            to_account_id=source_account.id,
+            amount=500,
+            created_at=start + timedelta(seconds=3),
+        )
+    )
+    db_session.commit()
+
+    # The new transfer is replayed on top of the checkpoints until they move.
+    assert balance_service.get_ledger_balances() == {
+        source_account.id: 5_500,
+        dest_account.id: 4_500,
+    }
+    assert balance_service.roll_forward_checkpoints() == 2  # noqa: PLR2004
+    assert balance_service.get_ledger_balances() == {
+        source_account.id: 5_500,
+        dest_account.id: 4_500,
+    }
+
+    assert balance_service.rebuild_checkpoints() == 2  # noqa: PLR2004
+    assert balance_service.get_ledger_balances() == {
+        source_account.id: 5_500,
+        dest_account.id: 4_500,
+    }
+
+
+def test_checkpoints_replay_transfers_committed_after_them(db_session):
+    (account,) = _create_accounts(db_session, count=1)
+    transfer_service = TransferService(db_session)
+    transfer_service.create_system_transfer(account.id, 10_000)
+    db_session.commit()
+    balance_service = BalanceService(db_session)
+    balance_service.roll_forward_checkpoints()
+    db_session.commit()
+
+    # Stamped when its transaction began, before the checkpoint was taken,
+    # but committed after it.
+    late = Transfer(
+        to_account_id=account.id, amount=2_500, created_at=datetime(2000, 1, 1)
+    )
+    db_session.add(late)
+    db_session.flush()
+    balance_service.apply_transfer(None, account.id, 2_500)
+    db_session.commit()
+
+    assert balance_service.get_ledger_balances([account.id]) == {account.id: 12_500}
+    assert balance_service.find_balance_drift() == []
+    balance_service.roll_forward_checkpoints()
+    checkpoint = db_session.get(BalanceCheckpoint, account.id)
+    assert (checkpoint.balance, checkpoint.last_seq) == (12_500, late.seq)
+
+
+def test_balance_cache_is_invalidated_on_commit(db_session, monkeypatch):
+    monkeypatch.setattr("meow_bank.services.balance.balance_cache", TTLCache(100, 60))
+    source_account, dest_account = _create_accounts(db_session)
+    transfer_service = TransferService(db_session)
+    transfer_service.create_system_transfer(source_account.id, 10_000)
+    db_session.commit()
+
+    balance_service = BalanceService(db_session)
+    hits = balance_cache_requests.value(outcome="hit")
+    misses = balance_cache_requests.value(outcome="miss")
+    for _ in range(2):
+        balance = balance_service.get_balance_by_account_id(source_account.id)
+        assert balance == 10_000  # noqa: PLR2004
+    assert balance_cache_requests.value(outcome="hit") == hits + 1
+    assert balance_cache_requests.value(outcome="miss") == misses + 1
+
+    transfer_service.create_transfer(
+        TransferCreate(
+            from_account_id=source_account.id,
+            to_account_id=dest_account.id,
+            amount=30.0,
+        )
+    )
+    assert balance_service.get_balances_by_account_ids(
+        [source_account.id, dest_account.id]
+    ) == {source_account.id: 7_000, dest_account.id: 3_000}
+
+
+def test_balance_cache_skips_uncommitted_balances(db_session, monkeypatch):
+    cache = TTLCache(100, 60)
+    monkeypatch.setattr("meow_bank.services.balance.balance_cache", cache)
+    (account,) = _create_accounts(db_session, count=1)
+    account_id = account.id
+
+    TransferService(db_session).create_system_transfer(account_id, 10_000)
+    balance_service = BalanceService(db_session)
+    balance = balance_service.get_balance_by_account_id(account_id)
+    assert balance == 10_000  # noqa: PLR2004
+    assert cache.get(account_id) is None
+
+    db_session.commit()
+    balance_service.get_balance_by_account_id(account_id)
+    assert cache.get(account_id) == 10_000  # noqa: PLR2004
+
+
+def test_balance_cache_is_used_again_after_a_rollback(db_session, monkeypatch):
+    cache = TTLCache(100, 60)
+    monkeypatch.setattr("meow_bank.services.balance.balance_cache", cache)
+    account_id = str(uuid4())
+    BalanceService(db_session).credit(account_id, 10_000)
+    db_session.rollback()
+
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.flush()
+    db_session.add(Account(id=account_id, customer_id=customer.id))
+    db_session.commit()
+    BalanceService(db_session).get_balance_by_account_id(account_id)
+    assert cache.get(account_id) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(2, 60, name="test")
+    evictions = cache_evictions.value(cache="test", reason="capacity")
+    cache.set_many({"a": 1, "b": 2})
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert cache_evictions.value(cache="test", reason="capacity") == evictions + 1
@@ -3,8 +3,9 @@ from uuid import UUID
 
 import pytest
 from pydantic import ValidationError
+from sqlalchemy import event
 
-from meow_bank.db.models import Customer
+from meow_bank.db.models import Account, Customer
 from meow_bank.schemas import CustomerCreate
 from meow_bank.services.customer import CustomerService
 
@@ -55,3 +56,31 @@ def test_get_customer_not_found(db_session):
     result = customer_service.get_customer(non_existent_id)
 
     assert result is None
+
+
+def test_get_customers_with_accounts_single_query(db_session):
+    customers = [Customer(name="First"), Customer(name="Second")]
+    db_session.add_all(customers)
+    db_session.commit()
+    db_session.add_all(
+        [
+            Account(customer_id=customers[0].id, balance=1_250),
+            Account(customer_id=customers[0].id, balance=0),
+        ]
+    )
+    db_session.commit()
+    customer_ids = [customers[1].id, str(UUID(int=0)), customers[0].id]
+
+    statements = []
+    connection = db_session.connection()
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(connection, "before_cursor_execute", listener)
+    try:
+        result = CustomerService(db_session).get_customers_with_accounts(customer_ids)
+    finally:
+        event.remove(connection, "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert [c.name for c in result] == ["Second", "First"]
+    assert result[0].accounts == []
+    assert sorted(a.balance for a in result[1].accounts) == [0, 12.5]
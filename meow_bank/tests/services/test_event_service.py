@@ -0,0 +1,152 @@
+import asyncio
+import json
+from uuid import uuid4
+
+from meow_bank.core.config import settings
+from meow_bank.db.database import track_queries
+from meow_bank.db.models import Account, Customer, Transfer
+from meow_bank.schemas import AccountResponse, TransferCreate
+from meow_bank.services.events import (
+    account_channel,
+    encode_account_events,
+    event_hub,
+)
+from meow_bank.services.transfer import TransferService
+
+
+def _create_accounts(db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.flush()
+    source_account = Account(customer_id=customer.id)
+    dest_account = Account(customer_id=customer.id)
+    db_session.add_all([source_account, dest_account])
+    db_session.commit()
+    return source_account, dest_account
+
+
+def test_committed_transfers_are_published_with_balances(db_session):
+    source_account, dest_account = _create_accounts(db_session)
+    transfer_service = TransferService(db_session)
+    transfer_service.create_system_transfer(source_account.id, 10_000)
+    db_session.commit()
+
+    async def scenario():
+        subscription = event_hub.subscribe([account_channel(dest_account.id)])
+        try:
+            transfer = transfer_service.create_transfer(
+                TransferCreate(
+                    from_account_id=source_account.id,
+                    to_account_id=dest_account.id,
+                    amount=25.5,
+                )
+            )
+            return transfer, await subscription.get(1), await subscription.get(0.01)
+        finally:
+            subscription.close()
+
+    transfer, message, nothing_else = asyncio.run(scenario())
+
+    event = json.loads(message)
+    assert event["account_id"] == dest_account.id
+    assert event["transfer"]["id"] == transfer.id
+    assert event["transfer"]["seq"] == db_session.get(Transfer, transfer.id).seq
+    assert event["balance"] == 25.5  # noqa: PLR2004
+    assert nothing_else is None
+
+
+def test_subscribers_joining_before_the_commit_get_the_transfer(db_session):
+    account, _ = _create_accounts(db_session)
+    transfer_service = TransferService(db_session)
+
+    async def scenario():
+        transfer = transfer_service.create_system_transfer(account.id, 10_000)
+        subscription = event_hub.subscribe([account_channel(account.id)])
+        try:
+            db_session.commit()
+            return transfer, await subscription.get(1)
+        finally:
+            subscription.close()
+
+    transfer, message = asyncio.run(scenario())
+
+    event = json.loads(message)
+    assert event["transfer"]["id"] == transfer.id
+    assert event["balance"] == 100.0  # noqa: PLR2004
+
+
+def test_unfollowed_transfers_cost_no_balance_read(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "TRANSFER_CONCURRENCY_MODE", "guarded")
+    source_account, dest_account = _create_accounts(db_session)
+    source_id, dest_id = source_account.id, dest_account.id
+    transfer_service = TransferService(db_session)
+    transfer_service.create_system_transfer(source_id, 10_000)
+    db_session.commit()
+
+    with track_queries() as queries:
+        transfer_service.create_transfer(
+            TransferCreate(from_account_id=source_id, to_account_id=dest_id, amount=1)
+        )
+
+    # The savepoint and its release, the two balance UPDATEs, the ledger
+    # sequence UPDATE and the INSERT.
+    assert queries.count == 6  # noqa: PLR2004
+
+
+def test_batch_subscribers_get_balances_read_after_the_commit(db_session):
+    source_account, dest_account = _create_accounts(db_session)
+    transfer_service = TransferService(db_session)
+    transfer_service.create_system_transfer(source_account.id, 10_000)
+    db_session.commit()
+
+    async def scenario():
+        subscription = event_hub.subscribe([account_channel(source_account.id)])
+        try:
+            transfer_service.create_transfers_batch(
+                [
+                    TransferCreate(
+                        from_account_id=source_account.id,
+                        to_account_id=dest_account.id,
+                        amount=amount,
+                    )
+                    for amount in (10, 15)
+                ]
+            )
+            return [await subscription.get(1), await subscription.get(1)]
+        finally:
+            subscription.close()
+
+    messages = asyncio.run(scenario())
+
+    events = [json.loads(message) for message in messages]
+    assert [event["transfer"]["amount"] for event in events] == [10, 15]
+    assert [event["balance"] for event in events] == [75, 75]
+
+
+def test_encode_account_events(monkeypatch):
+    monkeypatch.setattr("meow_bank.core.config.settings.EVENTS_KEEPALIVE_SECONDS", 0.01)
+    account = AccountResponse(
+        id=str(uuid4()),
+        customer_id=str(uuid4()),
+        created_at="2024-01-01T00:00:00",
+        balance=1.5,
+    )
+
+    async def scenario():
+        subscription = event_hub.subscribe([account_channel(account.id)])
+        stream = encode_account_events(subscription, account)
+        chunks = [await anext(stream), await anext(stream)]
+        event_hub.publish(account_channel(account.id), '{"seq": 1}')
+        await asyncio.sleep(0)
+        chunks.append(await anext(stream))
+        await stream.aclose()
+        return chunks, event_hub.has_subscribers([account_channel(account.id)])
+
+    chunks, still_subscribed = asyncio.run(scenario())
+
+    assert chunks == [
+        f"event: account\ndata: {account.model_dump_json()}\n\n",
+        ": keep-alive\n\n",
+        'event: transfer\ndata: {"seq": 1}\n\n',
+    ]
+    assert not still_subscribed
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from meow_bank.api.exceptions import BusinessLogicError, ResourceNotFoundError
+from meow_bank.db.database import Base
+from meow_bank.db.models import Account, Customer, Transfer
+from meow_bank.schemas import TransferCreate
+from meow_bank.services.group_commit import TransferGroupCommitter, group_commits
+from meow_bank.services.transfer import TransferService
+
+
+def test_group_commit_resolves_each_transfer(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'group.db'}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    with session_factory() as db:
+        customer = Customer(name="Test Customer")
+        db.add(customer)
+        db.flush()
+        source = Account(customer_id=customer.id)
+        dest = Account(customer_id=customer.id)
+        db.add_all([source, dest])
+        db.flush()
+        TransferService(db).create_system_transfer(source.id, 10_000)
+        db.commit()
+        source_id, dest_id = source.id, dest.id
+
+    async def scenario():
+        committer = TransferGroupCommitter(
+            session_factory, max_batch_size=10, max_delay_seconds=0.05
+        )
+        committer.start()
+        results = await asyncio.gather(
+            *[
+                committer.submit(
+                    TransferCreate(
+                        from_account_id=source_id, to_account_id=dest_id, amount=40.0
+                    )
+                )
+                for _ in range(3)
+            ],
+            committer.submit(
+                TransferCreate(
+                    from_account_id=dest_id,
+                    to_account_id="00000000-0000-0000-0000-000000000000",
+                    amount=1.0,
+                )
+            ),
+            return_exceptions=True,
+        )
+        await committer.stop()
+        return results
+
+    commits = group_commits.value()
+    results = asyncio.run(scenario())
+
+    assert group_commits.value() == commits + 1
+    assert [r.amount for r in results[:2]] == [40.0, 40.0]
+    # The third debit overdraws the account, the fourth names a missing account.
+    assert isinstance(results[2], BusinessLogicError)
+    assert isinstance(results[3], ResourceNotFoundError)
+
+    with session_factory() as db:
+        assert db.get(Account, source_id).balance == 2_000  # noqa: PLR2004
+        transfers = db.scalar(select(func.count()).select_from(Transfer))
+        assert transfers == 3  # noqa: PLR2004
+
+
+def test_group_commit_requires_running_writer():
+    committer = TransferGroupCommitter(sessionmaker())
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(
+            committer.submit(
+                TransferCreate(
+                    from_account_id="00000000-0000-0000-0000-000000000000",
+                    to_account_id="00000000-0000-0000-0000-000000000001",
+                    amount=1.0,
+                )
+            )
+        )
@@ -0,0 +1,124 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from meow_bank.api.exceptions import ConflictError
+from meow_bank.db.models import Account, Customer, IdempotencyKey, Transfer
+from meow_bank.schemas import AccountCreate, TransferCreate
+from meow_bank.services.account import AccountService
+from meow_bank.services.idempotency import IdempotencyService, _recent_responses
+from meow_bank.services.transfer import TransferService
+
+
+def _funded_accounts(db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    source_account = Account(customer_id=customer.id)
+    dest_account = Account(customer_id=customer.id)
+    db_session.add_all([source_account, dest_account])
+    db_session.commit()
+
+    TransferService(db_session).create_system_transfer(source_account.id, 10_000)
+    db_session.commit()
+    return source_account, dest_account
+
+
+def test_create_transfer_replays_idempotency_key(db_session):
+    source_account, dest_account = _funded_accounts(db_session)
+    transfer_service = TransferService(db_session)
+    transfer_data = TransferCreate(
+        from_account_id=source_account.id,
+        to_account_id=dest_account.id,
+        amount=25.0,
+    )
+    key = str(uuid.uuid4())
+
+    first = transfer_service.create_transfer(transfer_data, idempotency_key=key)
+    _recent_responses.clear()  # force the replay through the database
+    second = transfer_service.create_transfer(transfer_data, idempotency_key=key)
+    third = transfer_service.create_transfer(transfer_data, idempotency_key=key)
+
+    assert first == second == third
+    transfers = db_session.scalar(
+        select(func.count()).where(Transfer.from_account_id == source_account.id)
+    )
+    assert transfers == 1
+    db_session.refresh(source_account)
+    assert source_account.balance == 7_500  # noqa: PLR2004
+
+
+def test_idempotency_key_reused_for_different_request(db_session):
+    source_account, dest_account = _funded_accounts(db_session)
+    transfer_service = TransferService(db_session)
+    key = str(uuid.uuid4())
+    transfer_service.create_transfer(
+        TransferCreate(
+            from_account_id=source_account.id,
+            to_account_id=dest_account.id,
+            amount=25.0,
+        ),
+        idempotency_key=key,
+    )
+
+    with pytest.raises(ConflictError):
+        transfer_service.create_transfer(
+            TransferCreate(
+                from_account_id=source_account.id,
+                to_account_id=dest_account.id,
+                amount=30.0,
+            ),
+            idempotency_key=key,
+        )
+
+
+def test_create_account_replays_idempotency_key(db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    account_service = AccountService(db_session)
+    account_data = AccountCreate(customer_id=customer.id, initial_deposit=10.0)
+    key = str(uuid.uuid4())
+
+    first = account_service.create_account(account_data, idempotency_key=key)
+    second = account_service.create_account(account_data, idempotency_key=key)
+
+    assert first == second
+    accounts = db_session.scalar(
+        select(func.count()).where(Account.customer_id == customer.id)
+    )
+    assert accounts == 1
+
+
+def test_expired_idempotency_keys(db_session):
+    source_account, dest_account = _funded_accounts(db_session)
+    transfer_service = TransferService(db_session)
+    transfer_data = TransferCreate(
+        from_account_id=source_account.id,
+        to_account_id=dest_account.id,
+        amount=25.0,
+    )
+    key = str(uuid.uuid4())
+    first = transfer_service.create_transfer(transfer_data, idempotency_key=key)
+
+    db_session.execute(
+        IdempotencyKey.__table__.update().values(
+            expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+        )
+    )
+    _recent_responses.clear()
+
+    # An expired key no longer replays; it is taken over by the new request.
+    second = transfer_service.create_transfer(transfer_data, idempotency_key=key)
+    assert second.id != first.id
+
+    db_session.execute(
+        IdempotencyKey.__table__.update().values(
+            expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+        )
+    )
+    assert IdempotencyService(db_session).purge_expired() == 1
@@ -1,16 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from uuid import UUID
 
 import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from meow_bank.api.exceptions import (
     BusinessLogicError,
+    ConflictError,
     ResourceNotFoundError,
     ValidationError,
 )
+from meow_bank.core.config import settings
+from meow_bank.db.database import Base, create_db_engine
 from meow_bank.db.models import Account, Customer, Transfer
 from meow_bank.schemas import TransferCreate
-from meow_bank.services.transfer import TransferService
+from meow_bank.services.balance import BalanceService
+from meow_bank.services.transfer import (
+    TRANSFER_COLUMNS,
+    TransferService,
+    to_transfer_response,
+    to_transfer_responses,
+    transfer_conflicts,
+)
 
 
 def test_create_transfer(db_session):
@@ -24,7 +37,7 @@ def test_create_transfer(db_session):
     db_session.commit()
 
     transfer_service = TransferService(db_session)
-    transfer_service.create_system_transfer(source_account.id, 100.0)
+    transfer_service.create_system_transfer(source_account.id, 10_000)
 
     transfer_data = TransferCreate(
         from_account_id=str(source_account.id),
@@ -44,7 +57,7 @@ def test_create_transfer(db_session):
     assert db_transfer is not None
     assert db_transfer.from_account_id == source_account.id
     assert db_transfer.to_account_id == dest_account.id
-    assert db_transfer.amount == 50.0  # noqa: PLR2004
+    assert db_transfer.amount == 5_000  # noqa: PLR2004
 
 
 def test_create_transfer_same_account(db_session):
@@ -57,7 +70,7 @@ def test_create_transfer_same_account(db_session):
     db_session.commit()
 
     transfer_service = TransferService(db_session)
-    transfer_service.create_system_transfer(account.id, 100.0)
+    transfer_service.create_system_transfer(account.id, 10_000)
 
     transfer_data = TransferCreate(
         from_account_id=str(account.id),
@@ -82,7 +95,7 @@ def test_create_transfer_insufficient_funds(db_session):
     db_session.commit()
 
     transfer_service = TransferService(db_session)
-    transfer_service.create_system_transfer(source_account.id, 25.0)
+    transfer_service.create_system_transfer(source_account.id, 2_500)
 
     transfer_data = TransferCreate(
         from_account_id=str(source_account.id),
@@ -120,7 +133,7 @@ def test_create_system_transfer(db_session):
     db_session.commit()
 
     transfer_service = TransferService(db_session)
-    result = transfer_service.create_system_transfer(account.id, 100.0)
+    result = transfer_service.create_system_transfer(account.id, 10_000)
 
     assert result.from_account_id is None
     assert result.to_account_id == str(account.id)
@@ -132,7 +145,7 @@ def test_create_system_transfer(db_session):
     assert db_transfer is not None
     assert db_transfer.from_account_id is None
     assert db_transfer.to_account_id == account.id
-    assert db_transfer.amount == 100.0  # noqa: PLR2004
+    assert db_transfer.amount == 10_000  # noqa: PLR2004
 
 
 def test_get_transfer_by_id(db_session):
@@ -145,7 +158,7 @@ def test_get_transfer_by_id(db_session):
     db_session.commit()
 
     transfer_service = TransferService(db_session)
-    transfer = transfer_service.create_system_transfer(account.id, 100.0)
+    transfer = transfer_service.create_system_transfer(account.id, 10_000)
 
     result = transfer_service.get_transfer_by_id(transfer.id)
 
@@ -163,3 +176,338 @@ def test_get_transfer_by_id_not_found(db_session):
     result = transfer_service.get_transfer_by_id(non_existent_id)
 
     assert result is None
+
+
+def test_create_transfers_batch(db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    source_account = Account(customer_id=customer.id)
+    dest_account = Account(customer_id=customer.id)
+    db_session.add_all([source_account, dest_account])
+    db_session.commit()
+
+    transfer_service = TransferService(db_session)
+    transfer_service.create_system_transfer(source_account.id, 10_000)
+
+    result = transfer_service.create_transfers_batch(
+        [
+            TransferCreate(
+                from_account_id=source_account.id,
+                to_account_id=dest_account.id,
+                amount=60.0,
+            ),
+            # Only 40 left after the first item is applied
+            TransferCreate(
+                from_account_id=source_account.id,
+                to_account_id=dest_account.id,
+                amount=50.0,
+            ),
+            TransferCreate(
+                from_account_id=dest_account.id,
+                to_account_id=str(UUID(int=0)),
+                amount=10.0,
+            ),
+            TransferCreate(
+                from_account_id=dest_account.id,
+                to_account_id=source_account.id,
+                amount=20.0,
+            ),
+        ]
+    )
+
+    assert result.succeeded == 2  # noqa: PLR2004
+    assert result.failed == 2  # noqa: PLR2004
+    assert [item.error for item in result.results] == [
+        None,
+        "Insufficient funds",
+        "Recipient account not found",
+        None,
+    ]
+    assert result.results[0].transfer.amount == 60.0  # noqa: PLR2004
+    assert result.results[3].transfer.from_account_id == dest_account.id
+
+    db_session.refresh(source_account)
+    db_session.refresh(dest_account)
+    assert source_account.balance == 6_000  # noqa: PLR2004
+    assert dest_account.balance == 4_000  # noqa: PLR2004
+    assert db_session.query(Transfer).count() == 3  # noqa: PLR2004
+
+
+def _funded_account_pair(db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    source_account = Account(customer_id=customer.id)
+    dest_account = Account(customer_id=customer.id)
+    db_session.add_all([source_account, dest_account])
+    db_session.commit()
+
+    TransferService(db_session).create_system_transfer(source_account.id, 10_000)
+    return source_account, dest_account
+
+
+def _stale_account_states(monkeypatch, stale_reads):
+    """Report an outdated version for the first ``stale_reads`` account reads."""
+    real_get_account_states = BalanceService.get_account_states
+    calls = {"count": 0}
+
+    def get_account_states(self, account_ids, lock=False):
+        states = real_get_account_states(self, account_ids, lock)
+        calls["count"] += 1
+        if calls["count"] <= stale_reads:
+            return {
+                account_id: (balance, version - 1)
+                for account_id, (balance, version) in states.items()
+            }
+        return states
+
+    monkeypatch.setattr(BalanceService, "get_account_states", get_account_states)
+
+
+def test_create_transfer_retries_after_concurrent_debit(db_session, monkeypatch):
+    source_account, dest_account = _funded_account_pair(db_session)
+    _stale_account_states(monkeypatch, stale_reads=1)
+    retried = transfer_conflicts.value(mode="optimistic", outcome="retried")
+
+    result = TransferService(db_session).create_transfer(
+        TransferCreate(
+            from_account_id=source_account.id,
+            to_account_id=dest_account.id,
+            amount=40.0,
+        )
+    )
+
+    assert result.amount == 40.0  # noqa: PLR2004
+    assert transfer_conflicts.value(mode="optimistic", outcome="retried") == (
+        retried + 1
+    )
+    db_session.refresh(source_account)
+    assert source_account.balance == 6_000  # noqa: PLR2004
+    assert source_account.version == 1
+    assert db_session.query(Transfer).count() == 2  # noqa: PLR2004
+
+
+def test_create_transfer_gives_up_after_max_retries(db_session, monkeypatch):
+    source_account, dest_account = _funded_account_pair(db_session)
+    _stale_account_states(monkeypatch, stale_reads=settings.TRANSFER_MAX_RETRIES + 1)
+
+    with pytest.raises(ConflictError):
+        TransferService(db_session).create_transfer(
+            TransferCreate(
+                from_account_id=source_account.id,
+                to_account_id=dest_account.id,
+                amount=40.0,
+            )
+        )
+
+    db_session.refresh(source_account)
+    assert source_account.balance == 10_000  # noqa: PLR2004
+    assert db_session.query(Transfer).count() == 1
+
+
+def test_create_transfer_pessimistic_mode(db_session, monkeypatch):
+    source_account, dest_account = _funded_account_pair(db_session)
+    monkeypatch.setattr(settings, "TRANSFER_CONCURRENCY_MODE", "pessimistic")
+    # Locked rows are never compared-and-swapped, so stale versions don't matter.
+    _stale_account_states(monkeypatch, stale_reads=1)
+
+    TransferService(db_session).create_transfer(
+        TransferCreate(
+            from_account_id=source_account.id,
+            to_account_id=dest_account.id,
+            amount=40.0,
+        )
+    )
+
+    db_session.refresh(source_account)
+    assert source_account.balance == 6_000  # noqa: PLR2004
+
+
+def test_create_transfer_guarded_mode(db_session, monkeypatch):
+    source_account, dest_account = _funded_account_pair(db_session)
+    monkeypatch.setattr(settings, "TRANSFER_CONCURRENCY_MODE", "guarded")
+    transfer_service = TransferService(db_session)
+
+    transfer_service.create_transfer(
+        TransferCreate(
+            from_account_id=source_account.id,
+            to_account_id=dest_account.id,
+            amount=40.0,
+        )
+    )
+    with pytest.raises(BusinessLogicError, match="Insufficient funds"):
+        transfer_service.create_transfer(
+            TransferCreate(
+                from_account_id=source_account.id,
+                to_account_id=dest_account.id,
+                amount=60.01,
+            )
+        )
+    with pytest.raises(ResourceNotFoundError, match="Recipient account not found"):
+        transfer_service.create_transfer(
+            TransferCreate(
+                from_account_id=source_account.id,
+                to_account_id=str(UUID(int=0)),
+                amount=1.0,
+            )
+        )
+
+    db_session.refresh(source_account)
+    db_session.refresh(dest_account)
+    assert source_account.balance == 6_000  # noqa: PLR2004
+    assert dest_account.balance == 4_000  # noqa: PLR2004
+    assert db_session.query(Transfer).count() == 2  # noqa: PLR2004
+
+
+def test_get_transfer_history_pages(db_session):
+    customer = Customer(name="Test Customer")
+    db_session.add(customer)
+    db_session.commit()
+
+    account = Account(customer_id=customer.id)
+    other_account = Account(customer_id=customer.id)
+    db_session.add_all([account, other_account])
+    db_session.commit()
+
+    # Timestamps repeat and run backwards, and pages of three split a pair, so
+    # the order must come from the ledger sequence alone.
+    transfers = []
+    for i in range(6):
+        sent = i % 2 == 0
+        transfers.append(
+            Transfer(
+                from_account_id=account.id if sent else other_account.id,
+                to_account_id=other_account.id if sent else account.id,
+                amount=100 + i,
+                created_at=datetime(2024, 1, 3 - i // 2),
+            )
+        )
+    db_session.add_all(transfers)
+    db_session.commit()
+
+    transfer_service = TransferService(db_session)
+    expected = [t.id for t in sorted(transfers, key=lambda t: t.seq, reverse=True)]
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = transfer_service.get_transfer_history(account.id, 3, cursor)
+        seen.extend(t.id for t in page)
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert len(page) == 3  # noqa: PLR2004
+
+
+def test_to_transfer_responses_matches_single_conversion(db_session):
+    source_account, dest_account = _funded_account_pair(db_session)
+    TransferService(db_session).create_transfer(
+        TransferCreate(
+            from_account_id=source_account.id,
+            to_account_id=dest_account.id,
+            amount=12.34,
+        )
+    )
+
+    transfers = db_session.query(Transfer).order_by(Transfer.id).all()
+    rows = db_session.execute(select(*TRANSFER_COLUMNS).order_by(Transfer.id)).all()
+
+    assert to_transfer_responses(rows) == [to_transfer_response(t) for t in transfers]
+
+
+def test_get_transfers_after_pages_through_the_ledger(db_session):
+    source_account, dest_account = _funded_account_pair(db_session)
+    transfer_service = TransferService(db_session)
+    transfer_service.create_transfers_batch(
+        [
+            TransferCreate(
+                from_account_id=source_account.id,
+                to_account_id=dest_account.id,
+                amount=amount,
+            )
+            for amount in (1, 2)
+        ]
+    )
+    transfer_service.create_transfer(
+        TransferCreate(
+            from_account_id=dest_account.id,
+            to_account_id=source_account.id,
+            amount=3,
+        )
+    )
+
+    first = transfer_service.get_transfers_after(0, 2)
+    second = transfer_service.get_transfers_after(first.last_seq, 2)
+    last = transfer_service.get_transfers_after(second.last_seq, 2)
+
+    entries = first.transfers + second.transfers
+    assert [entry.amount for entry in entries] == [100, 1, 2, 3]
+    seqs = [entry.seq for entry in entries]
+    assert seqs == list(range(seqs[0], seqs[0] + 4))
+    assert second.last_seq == seqs[-1]
+    assert last.transfers == []
+    assert last.last_seq == second.last_seq
+
+
+def test_get_transfers_after_stops_at_the_read_horizon(db_session, monkeypatch):
+    source_account, dest_account = _funded_account_pair(db_session)
+    transfer_service = TransferService(db_session)
+    transfer_service.create_transfer(
+        TransferCreate(
+            from_account_id=source_account.id,
+            to_account_id=dest_account.id,
+            amount=1,
+        )
+    )
+    newest = transfer_service.get_transfers_after(0, 10).last_seq
+    # As if the transfer before the newest one were still in flight.
+    monkeypatch.setattr(
+        "meow_bank.services.transfer.ledger_read_horizon",
+        lambda connection: newest - 2,
+    )
+
+    feed = transfer_service.get_transfers_after(0, 10)
+
+    assert [entry.seq for entry in feed.transfers] == list(range(1, newest - 1))
+    assert feed.last_seq == newest - 2
+
+
+@pytest.mark.parametrize("mode", ["optimistic", "pessimistic", "guarded"])
+def test_concurrent_transfers_on_a_sqlite_file_all_succeed(tmp_path, monkeypatch, mode):
+    monkeypatch.setattr(settings, "TRANSFER_CONCURRENCY_MODE", mode)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'contended.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        customer = Customer(name="Test Customer")
+        db.add(customer)
+        db.commit()
+        accounts = [Account(customer_id=customer.id) for _ in range(4)]
+        db.add_all(accounts)
+        db.commit()
+        account_ids = [account.id for account in accounts]
+        for account_id in account_ids:
+            TransferService(db).create_system_transfer(account_id, 1_000_000)
+        db.commit()
+
+    def transfer_around_the_ring(worker: int) -> None:
+        with Session(engine) as db:
+            transfer_service = TransferService(db)
+            for i in range(50):
+                source = (worker + i) % len(account_ids)
+                transfer_service.create_transfer(
+                    TransferCreate(
+                        from_account_id=account_ids[source],
+                        to_account_id=account_ids[(source + 1) % len(account_ids)],
+                        amount=1,
+                    )
+                )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(transfer_around_the_ring, range(8)))
+
+    with Session(engine) as db:
+        assert db.query(Transfer).count() == 4 + 8 * 50
+        assert BalanceService(db).find_balance_drift() == []